@@ -1,3 +1,7 @@
+import json
+from datetime import datetime
+from typing import Iterable, Iterator, List, Union
+
 import requests
 from mlops.config.config import settings
 from mlops.src.mailgun import MailGun
@@ -25,6 +29,27 @@ def get_model_by_name(model_name: str) -> dict:
         raise request_failed_exception(app_response)
 
 
+def get_model_id_by_name(model_name: str) -> str:
+    """
+    Function for retrieving id of mlops monitored model without its predictions, so the response does not grow
+    with the number of stored predictions
+
+    Args:
+        model_name: unique name of the monitored model
+
+    Returns:
+        monitored_model_id: id of monitored model
+    """
+    app_response = requests.get(f"{settings.url}/monitored-models/name/{model_name}",
+                                params={"with_predictions": "false"})
+    response_json = app_response.json()
+
+    if app_response.status_code == 200:
+        return response_json["_id"]
+    else:
+        raise request_failed_exception(app_response)
+
+
 def create_model(model_name: str, model_description: str = None, iteration_dict: dict = None) -> dict:
     """
     Function for creating mlops monitored model
@@ -77,27 +102,35 @@ def set_active_model(model_name: str) -> str:
     return f"Active model set to: {settings.active_model}"
 
 
-def send_prediction(model_name: str, data: pd.DataFrame, send_email: bool = False) -> dict:
+def send_prediction(model_name: str, data: pd.DataFrame, send_email: bool = False,
+                    shadow_model_names: List[str] = None) -> dict:
     """
     Function to invoke a prediction from monitored model. Function takes a pandas dataframe, where every record is
-    taken as a separate prediction.
+    taken as a separate prediction. Shadow monitored models predict the same records on the server without
+    delaying the response and their predictions are stored under their own monitored models.
 
     Args:
         send_email: Email alert flag
         model_name: Name of monitored model that will be used in prediction
         data: Pandas Dataframe containing data for prediction
+        shadow_model_names: Names of shadow monitored models
 
     Returns:
         List of dictionaries containing results for each executed prediction
     """
-    model = get_model_by_name(model_name)
+    model_id = get_model_id_by_name(model_name)
 
     if send_email or settings.send_emails:
         mailgun = MailGun()
 
     data_json = data.to_dict(orient="records")
 
-    app_response = requests.post(f"{settings.url}/monitored-models/{model['_id']}/predict", json=data_json)
+    params = None
+    if shadow_model_names:
+        params = {"shadow": [get_model_id_by_name(shadow_model_name) for shadow_model_name in shadow_model_names]}
+
+    app_response = requests.post(f"{settings.url}/monitored-models/{model_id}/predict", json=data_json,
+                                 params=params)
 
     prediction = app_response.json()
 
@@ -109,3 +142,78 @@ def send_prediction(model_name: str, data: pd.DataFrame, send_email: bool = Fals
         if send_email or settings.send_emails:
             mailgun.send_prediction_failure(request_failed_exception(app_response))
         raise request_failed_exception(app_response)
+
+
+def send_prediction_stream(model_name: str, data: Union[pd.DataFrame, Iterable[pd.DataFrame]],
+                           chunk_size: int = 1000, batch_size: int = None) -> Iterator[dict]:
+    """
+    Function to invoke a streaming prediction from monitored model. Records are sent as newline-delimited JSON
+    with chunked transfer encoding and results are read as they are streamed back, so neither the client
+    nor the server holds all records in memory. Data can be one dataframe or an iterable of dataframes,
+    e.g. pd.read_csv with chunksize.
+
+    Args:
+        model_name: Name of monitored model that will be used in prediction
+        data: Pandas Dataframe or iterable of Pandas Dataframes containing data for prediction
+        chunk_size: Number of records serialized at once
+        batch_size: Number of records predicted together on the server, server setting if None
+
+    Returns:
+        Iterator of dictionaries with result of every record, results of records which could not be predicted
+        contain index of the record and error detail
+    """
+    model_id = get_model_id_by_name(model_name)
+
+    if isinstance(data, pd.DataFrame):
+        data = [data]
+
+    def body() -> Iterator[bytes]:
+        for frame in data:
+            for start in range(0, len(frame), chunk_size):
+                yield frame.iloc[start:start + chunk_size].to_json(orient="records", lines=True).encode("utf-8")
+                yield b"\n"
+
+    params = {"batch_size": batch_size} if batch_size is not None else None
+    app_response = requests.post(f"{settings.url}/monitored-models/{model_id}/predict-stream", data=body(),
+                                 params=params, headers={"Content-Type": "application/x-ndjson"}, stream=True)
+
+    if app_response.status_code != 200:
+        raise request_failed_exception(app_response)
+
+    with app_response:
+        for line in app_response.iter_lines():
+            if line:
+                yield json.loads(line)
+
+
+def export_predictions(model_name: str, from_date: datetime = None, to_date: datetime = None) -> pd.DataFrame:
+    """
+    Function for exporting predictions of monitored model. Predictions are downloaded as Arrow IPC stream
+    and read record batch by record batch straight into a dataframe, without any intermediate JSON.
+    Requires pyarrow.
+
+    Args:
+        model_name: Name of monitored model whose predictions are exported
+        from_date: Only predictions made at or after this date
+        to_date: Only predictions made before this date
+
+    Returns:
+        Pandas Dataframe with prediction id, prediction date, prediction, actual and input data columns
+    """
+    import pyarrow as pa
+
+    model_id = get_model_id_by_name(model_name)
+
+    params = {"format": "arrow"}
+    if from_date is not None:
+        params["from"] = from_date.isoformat()
+    if to_date is not None:
+        params["to"] = to_date.isoformat()
+
+    with requests.get(f"{settings.url}/monitored-models/{model_id}/predictions/export", params=params,
+                      stream=True) as app_response:
+        if app_response.status_code != 200:
+            raise request_failed_exception(app_response)
+
+        app_response.raw.decode_content = True
+        return pa.ipc.open_stream(app_response.raw).read_all().to_pandas()
@@ -28,4 +28,5 @@ setup(
    packages=find_packages(exclude=["tests*"]),
    include_package_data=True,
    install_requires=["requests"],
+   extras_require={"arrow": ["pyarrow"]},
  )
@@ -365,3 +365,43 @@ async def test_create_monitored_model_no_ml_model_to_decode(setup):
     assert "Request failed with status code 400: Monitored model has no iteration. Model status must be 'idle' or " \
            "'archived'." in str(exc_info.value)
 
+
+@pytest.mark.asyncio
+@pytest.mark.skipif(IN_GITHUB_ACTIONS, reason="Test doesn't work in Github Actions.")
+async def test_export_predictions(setup):
+    await drop_database()
+
+    project = mlops.tracking.create_project(title='test_project')
+    experiment = mlops.tracking.create_experiment(name='test_experiment', project_id=project['_id'])
+
+    with mlops.tracking.start_iteration('test_iteration', project_id=project['_id'],
+                                        experiment_id=experiment['id']) as iteration:
+        iteration.log_model_name('test_regression_model')
+        iteration.log_path_to_model(os.path.join(
+            os.path.dirname(__file__), "../test_files/linear_regression_model.pkl"
+        ))
+
+    iteration_dict = iteration.end_iteration()
+    model_name = 'test_model'
+
+    model = mlops.monitoring.create_model(model_name=model_name, iteration_dict=iteration_dict)
+
+    data = pd.DataFrame.from_records(data=[
+        {"X1": 1.0, "X2": 2.0},
+        {"X1": 1.0, "X2": 4.0},
+        {"X1": 1.0, "X2": 3.0}
+    ])
+    predictions = mlops.monitoring.send_prediction(model_name=model_name, data=data)
+
+    assert mlops.monitoring.get_model_id_by_name(model_name=model_name) == model['_id']
+
+    exported = mlops.monitoring.export_predictions(model_name=model_name)
+
+    assert len(exported) == len(data)
+    assert set(exported["id"]) == {prediction["id"] for prediction in predictions}
+    assert list(exported["X2"]) == [2.0, 4.0, 3.0]
+
+    with pytest.raises(Exception) as exc_info:
+        mlops.monitoring.export_predictions(model_name='missing_model')
+
+    assert 'Request failed with status code 404' in str(exc_info.value)
@@ -1,13 +1,21 @@
-from fastapi import FastAPI
+import asyncio
+
+from fastapi import FastAPI, status
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse, Response
 
 from app.config.config import settings
 from app.database.init_mongo_db import init_mongo_db
+from app.database.migrations import run_migrations
 from app.routers.project import router as project_router
 from app.routers.experiment import experiment_router as experiment_router
 from app.routers.iteration import iteration_router as iteration_router
 from app.routers.dataset import dataset_router as dataset_router
-from app.routers.monitored_model import monitored_model_router as monitored_model_router
+from app.routers.monitored_model import monitored_model_router as monitored_model_router, \
+    preload_active_monitored_models, compact_expired_predictions_periodically
+from app.utils.inference import inference_engine
+from app.utils.metrics import MetricsMiddleware, metrics_registry, CONTENT_TYPE
+from app.utils.warmup import model_warmup
 
 app = FastAPI(title=settings.PROJECT_NAME)
 
@@ -19,6 +27,7 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+app.add_middleware(MetricsMiddleware)
 
 app.include_router(project_router, tags=["Project"], prefix="/projects")
 app.include_router(experiment_router, tags=["Experiment"], prefix="/projects/{project_id}/experiments")
@@ -35,8 +44,50 @@ async def app_init():
     Initialize the crucial app components on startup
     """
     await init_mongo_db()
+    await run_migrations()
+
+    # models are preloaded in the background, /ready reports when it is done
+    if settings.MODEL_PRELOAD and not settings.TESTING:
+        model_warmup.start(asyncio.create_task(preload_active_monitored_models()))
+    else:
+        model_warmup.start()
+
+    # predictions older than the retention of monitored models are compacted into rollups
+    app.state.compaction_task = None
+    if settings.PREDICTIONS_COMPACTION_INTERVAL > 0 and not settings.TESTING:
+        app.state.compaction_task = asyncio.create_task(
+            compact_expired_predictions_periodically(settings.PREDICTIONS_COMPACTION_INTERVAL))
+
+
+@app.on_event("shutdown")
+async def app_shutdown():
+    """
+    Release the app components on shutdown
+    """
+    model_warmup.cancel()
+    if app.state.compaction_task is not None:
+        app.state.compaction_task.cancel()
+    inference_engine.shutdown()
 
 
 @app.get("/", tags=["Root"])
 def root():
     return {"message": "Hello mlops"}
+
+
+@app.get("/ready", tags=["Root"])
+def ready():
+    """
+    Readiness probe. Responds with 503 until active monitored models are preloaded after startup.
+    """
+    status_code = status.HTTP_200_OK if model_warmup.is_ready else status.HTTP_503_SERVICE_UNAVAILABLE
+    return JSONResponse(status_code=status_code, content=model_warmup.stats())
+
+
+@app.get("/metrics", tags=["Root"])
+def metrics():
+    """
+    Metrics of request latency, predict phases, model cache, batching and database commands
+    in the Prometheus text format.
+    """
+    return Response(content=metrics_registry.render(), media_type=CONTENT_TYPE)
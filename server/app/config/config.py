@@ -19,6 +19,33 @@ class Settings(BaseSettings):
     TESTING: bool = config("TESTING", cast=bool, default=False)
     MONGODB_TEST_DB_NAME = config("MONGODB_TEST_DB_NAME", cast=str)
 
+    # Artifacts
+    ARTIFACT_STORE_PATH: str = config("ARTIFACT_STORE_PATH", cast=str, default="artifacts")
+
+    # Monitored models
+    MODEL_CACHE_SIZE: int = config("MODEL_CACHE_SIZE", cast=int, default=32)
+    CHART_DATA_CACHE_SIZE: int = config("CHART_DATA_CACHE_SIZE", cast=int, default=256)
+    INFERENCE_EXECUTOR: str = config("INFERENCE_EXECUTOR", cast=str, default="thread")
+    INFERENCE_THREAD_POOL_SIZE: int = config("INFERENCE_THREAD_POOL_SIZE", cast=int, default=4)
+    INFERENCE_PROCESS_POOL_SIZE: int = config("INFERENCE_PROCESS_POOL_SIZE", cast=int, default=2)
+    PREDICT_BATCHING: bool = config("PREDICT_BATCHING", cast=bool, default=False)
+    PREDICT_BATCH_MAX_DELAY_MS: float = config("PREDICT_BATCH_MAX_DELAY_MS", cast=float, default=5.0)
+    PREDICT_BATCH_MAX_SIZE: int = config("PREDICT_BATCH_MAX_SIZE", cast=int, default=1024)
+    PREDICT_STREAM_BATCH_SIZE: int = config("PREDICT_STREAM_BATCH_SIZE", cast=int, default=500)
+    MODEL_PRELOAD: bool = config("MODEL_PRELOAD", cast=bool, default=True)
+    MODEL_WARMUP_PREDICTION: bool = config("MODEL_WARMUP_PREDICTION", cast=bool, default=True)
+    PREDICTIONS_PAGE_MAX_SIZE: int = config("PREDICTIONS_PAGE_MAX_SIZE", cast=int, default=1000)
+    PREDICTIONS_EXPORT_BATCH_SIZE: int = config("PREDICTIONS_EXPORT_BATCH_SIZE", cast=int, default=10000)
+    PREDICTIONS_COMPACTION_INTERVAL: int = config("PREDICTIONS_COMPACTION_INTERVAL", cast=int, default=3600)
+    PREDICTIONS_COMPACTION_LEASE: int = config("PREDICTIONS_COMPACTION_LEASE", cast=int, default=600)
+    SCATTER_SAMPLE_SIZE: int = config("SCATTER_SAMPLE_SIZE", cast=int, default=1000)
+    SCATTER_SAMPLE_MAX_SIZE: int = config("SCATTER_SAMPLE_MAX_SIZE", cast=int, default=10000)
+    DRIFT_DETECTION: bool = config("DRIFT_DETECTION", cast=bool, default=True)
+    DRIFT_REFERENCE_SIZE: int = config("DRIFT_REFERENCE_SIZE", cast=int, default=1000)
+    DRIFT_WINDOW_SIZE: int = config("DRIFT_WINDOW_SIZE", cast=int, default=1000)
+    DRIFT_BINS: int = config("DRIFT_BINS", cast=int, default=10)
+    DRIFT_PSI_THRESHOLD: float = config("DRIFT_PSI_THRESHOLD", cast=float, default=0.2)
+
     class Config:
         case_sensitive = True
 
@@ -1,7 +1,11 @@
 from app.config.config import settings
 from app.models.project import Project
 from app.models.dataset import Dataset
+from app.models.drift import DriftResult
 from app.models.monitored_model import MonitoredModel
+from app.models.prediction_data import PredictionRecord
+from app.models.prediction_rollup import PredictionRollup
+from app.utils.metrics import mongo_command_listener
 
 from beanie import init_beanie
 from motor.motor_asyncio import AsyncIOMotorClient
@@ -12,7 +16,7 @@ async def init_mongo_db():
     """
     Initialize mongoDB database connection using beanie ODM
     """
-    db_client = AsyncIOMotorClient(settings.MONGODB_URL)
+    db_client = AsyncIOMotorClient(settings.MONGODB_URL, event_listeners=[mongo_command_listener])
     db_name = settings.MONGODB_TEST_DB_NAME if settings.TESTING else settings.MONGODB_DB_NAME
 
     await init_beanie(
@@ -20,7 +24,10 @@ async def init_mongo_db():
         document_models=[
             Project,
             Dataset,
-            MonitoredModel
+            MonitoredModel,
+            PredictionRecord,
+            PredictionRollup,
+            DriftResult
         ]
     )
 
@@ -0,0 +1,239 @@
+import base64
+import random
+
+from bson import ObjectId
+from pymongo import ReplaceOne, UpdateOne
+
+from app.models.column_schema import ColumnSchema
+from app.models.monitored_model import MonitoredModel
+from app.models.monitored_model_metrics import RegressionMetricsState, ClassificationMetricsState
+from app.models.prediction_data import PredictionRecord, sample_bucket
+from app.models.project import Project
+from app.utils.artifact_store import artifact_store
+from app.utils.classification_metrics import classification_state_increments
+from app.utils.column_schema import column_schema_update
+from app.utils.regression_metrics import regression_state_update
+
+
+async def run_migrations():
+    """
+    Run data migrations. Every migration is idempotent, so it is safe to run them on every startup.
+    """
+    await move_embedded_predictions_to_collection()
+    await backfill_metrics_states()
+    await backfill_column_schemas()
+    await backfill_sample_keys()
+    await backfill_sample_buckets()
+    await move_ml_models_to_artifact_store()
+
+
+async def move_embedded_predictions_to_collection():
+    """
+    Move predictions embedded in monitored model documents (predictions_data) to the prediction_data collection.
+    Predictions keep their ids, so a migration interrupted in the middle can be run again.
+
+    Returns:
+        Number of moved predictions.
+    """
+    monitored_models = MonitoredModel.get_motor_collection()
+    predictions = PredictionRecord.get_motor_collection()
+    moved = 0
+
+    async for monitored_model in monitored_models.find({"predictions_data.0": {"$exists": True}},
+                                                       {"predictions_data": 1}):
+        records = []
+        for prediction in monitored_model["predictions_data"]:
+            records.append({
+                "_id": prediction.get("id") or ObjectId(),
+                "monitored_model_id": monitored_model["_id"],
+                "prediction_date": prediction.get("prediction_date"),
+                "input_data": prediction.get("input_data", {}),
+                "prediction": prediction.get("prediction"),
+                "actual": prediction.get("actual"),
+                "sample_key": random.random(),
+                "sample_bucket": sample_bucket(prediction["prediction_date"])
+                if prediction.get("prediction_date") else None
+            })
+
+        await predictions.bulk_write([ReplaceOne({"_id": record["_id"]}, record, upsert=True) for record in records],
+                                     ordered=False)
+        await monitored_models.update_one({"_id": monitored_model["_id"]}, {"$set": {"predictions_data": []}})
+        moved += len(records)
+
+    return moved
+
+
+async def backfill_metrics_states():
+    """
+    Build regression metrics accumulators and confusion matrix counts of monitored models created before they
+    existed from their predictions with actual value.
+
+    Returns:
+        Number of updated metrics states.
+    """
+    updated = await backfill_metrics_state("regression_metrics_state", RegressionMetricsState().dict(),
+                                           "regression_metrics_state", regression_state_update)
+    updated += await backfill_metrics_state("classification_metrics_state", ClassificationMetricsState().dict(),
+                                            "classification_metrics_state.counts",
+                                            lambda changes: {"$inc": classification_state_increments(changes)})
+    return updated
+
+
+async def backfill_metrics_state(field: str, empty_state: dict, update_prefix: str, state_update) -> int:
+    """
+    Set empty metrics state on monitored models which do not have it and update it with all predictions
+    with actual value. The update is applied only by the run which set the empty state.
+
+    Args:
+        field: Metrics state field.
+        empty_state: Empty metrics state.
+        update_prefix: Field the updated fields are relative to.
+        state_update: Function returning update operators for (prediction, old actual, new actual) changes.
+
+    Returns:
+        Number of updated monitored models.
+    """
+    monitored_models = MonitoredModel.get_motor_collection()
+    predictions = PredictionRecord.get_motor_collection()
+    updated = 0
+
+    async for monitored_model in monitored_models.find({field: {"$exists": False}}, {"_id": 1}):
+        result = await monitored_models.update_one({"_id": monitored_model["_id"], field: {"$exists": False}},
+                                                   {"$set": {field: empty_state}})
+        if result.modified_count == 0:
+            continue
+
+        changes = [(record["prediction"], None, record["actual"])
+                   async for record in predictions.find({"monitored_model_id": monitored_model["_id"],
+                                                         "actual": {"$ne": None}},
+                                                        {"_id": 0, "prediction": 1, "actual": 1})]
+        update = {operator: {f"{update_prefix}.{name}": value for name, value in fields.items()}
+                  for operator, fields in state_update(changes).items() if fields}
+        if update:
+            await monitored_models.update_one({"_id": monitored_model["_id"]}, update)
+        updated += 1
+
+    return updated
+
+
+async def backfill_column_schemas(chunk_size: int = 10000) -> int:
+    """
+    Build column schema of monitored models created before it existed from input data of their predictions,
+    reading predictions in chunks. The schema is built only by the run which set the empty schema.
+
+    Args:
+        chunk_size: Number of predictions added to the schema with one update.
+
+    Returns:
+        Number of updated monitored models.
+    """
+    monitored_models = MonitoredModel.get_motor_collection()
+    predictions = PredictionRecord.get_motor_collection()
+    updated = 0
+
+    async for monitored_model in monitored_models.find({"column_schema": {"$exists": False}}, {"_id": 1}):
+        result = await monitored_models.update_one({"_id": monitored_model["_id"],
+                                                    "column_schema": {"$exists": False}},
+                                                   {"$set": {"column_schema": ColumnSchema().dict()}})
+        if result.modified_count == 0:
+            continue
+
+        samples = []
+        async for record in predictions.find({"monitored_model_id": monitored_model["_id"]},
+                                             {"_id": 0, "input_data": 1}):
+            samples.append(record.get("input_data", {}))
+            if len(samples) >= chunk_size:
+                await monitored_models.update_one({"_id": monitored_model["_id"]}, column_schema_update(samples))
+                samples = []
+        if samples:
+            await monitored_models.update_one({"_id": monitored_model["_id"]}, column_schema_update(samples))
+        updated += 1
+
+    return updated
+
+
+async def backfill_sample_keys(chunk_size: int = 10000) -> int:
+    """
+    Set random sample key of predictions stored before predictions were sampled, so they can be part
+    of scatter chart samples.
+
+    Args:
+        chunk_size: Number of predictions updated with one bulk write.
+
+    Returns:
+        Number of updated predictions.
+    """
+    predictions = PredictionRecord.get_motor_collection()
+    updated = 0
+
+    while True:
+        records = await predictions.find({"sample_key": {"$exists": False}}, {"_id": 1}).to_list(length=chunk_size)
+        if not records:
+            return updated
+        await predictions.bulk_write([UpdateOne({"_id": record["_id"], "sample_key": {"$exists": False}},
+                                                {"$set": {"sample_key": random.random()}}) for record in records],
+                                     ordered=False)
+        updated += len(records)
+
+
+async def backfill_sample_buckets(chunk_size: int = 10000) -> int:
+    """
+    Set sample bucket of predictions stored before predictions were sampled by hour, so they can be part
+    of time stratified scatter chart samples.
+
+    Args:
+        chunk_size: Number of predictions updated with one bulk write.
+
+    Returns:
+        Number of updated predictions.
+    """
+    predictions = PredictionRecord.get_motor_collection()
+    updated = 0
+
+    while True:
+        records = await predictions.find({"sample_bucket": {"$exists": False},
+                                          "prediction_date": {"$type": "date"}},
+                                         {"_id": 1, "prediction_date": 1}).to_list(length=chunk_size)
+        if not records:
+            return updated
+        await predictions.bulk_write([UpdateOne({"_id": record["_id"]},
+                                                {"$set": {"sample_bucket": sample_bucket(record["prediction_date"])}})
+                                      for record in records], ordered=False)
+        updated += len(records)
+
+
+async def move_ml_models_to_artifact_store():
+    """
+    Move base64 encoded ml models of iterations in projects and monitored models to the artifact store,
+    keeping only their hash and size.
+
+    Returns:
+        Number of moved ml models.
+    """
+    moved = 0
+
+    projects = Project.get_motor_collection()
+    async for project in projects.find({"experiments.iterations.encoded_ml_model": {"$type": "string"}},
+                                       {"experiments": 1}):
+        for experiment in project["experiments"]:
+            for iteration in experiment.get("iterations", []):
+                moved += _store_encoded_ml_model(iteration)
+        await projects.update_one({"_id": project["_id"]}, {"$set": {"experiments": project["experiments"]}})
+
+    monitored_models = MonitoredModel.get_motor_collection()
+    async for monitored_model in monitored_models.find({"iteration.encoded_ml_model": {"$type": "string"}},
+                                                       {"iteration": 1}):
+        moved += _store_encoded_ml_model(monitored_model["iteration"])
+        await monitored_models.update_one({"_id": monitored_model["_id"]},
+                                          {"$set": {"iteration": monitored_model["iteration"]}})
+
+    return moved
+
+
+def _store_encoded_ml_model(iteration: dict) -> int:
+    if not iteration.get("encoded_ml_model"):
+        return 0
+    iteration["ml_model_hash"], iteration["ml_model_size"] = \
+        artifact_store.put(base64.b64decode(iteration["encoded_ml_model"].encode("utf-8")))
+    iteration["encoded_ml_model"] = None
+    return 1
@@ -0,0 +1,27 @@
+from typing import Dict, List
+
+from pydantic import BaseModel, Field
+
+
+class ColumnStats(BaseModel):
+    """
+    Types and number of values of one input data column.
+
+    Attributes:
+    - **types (List[str])**: Type families of the column values, see app.utils.arrow_export.value_type.
+    - **count (int)**: Number of predictions with a value which is not None in the column.
+    """
+    types: List[str] = Field(default=[], description="Type families of the column values")
+    count: int = Field(default=0, description="Number of values which are not None")
+
+
+class ColumnSchema(BaseModel):
+    """
+    Column schema of input data inferred from predictions as they are stored.
+
+    Attributes:
+    - **rows (int)**: Number of stored predictions.
+    - **columns (Dict[str, ColumnStats])**: Statistics per escaped input data column.
+    """
+    rows: int = Field(default=0, description="Number of stored predictions")
+    columns: Dict[str, ColumnStats] = Field(default={}, description="Statistics per escaped input data column")
@@ -0,0 +1,142 @@
+from datetime import datetime
+from typing import Dict, List, Optional
+
+from beanie import Document, PydanticObjectId
+from fastapi import HTTPException, status
+from pydantic import BaseModel, Field, validator
+from pymongo import ASCENDING, IndexModel
+
+
+class DriftColumnReference(BaseModel):
+    """
+    Reference distribution of one input data column.
+
+    Attributes:
+    - **kind (str)**: 'numeric' or 'categorical'.
+    - **edges (Optional[List[float]])**: Inner bin edges of numeric column, bin i holds values from edges[i-1]
+      to edges[i].
+    - **counts (Dict[str, int])**: Number of reference values per bin index or escaped category.
+    """
+    kind: str = Field(description="Column kind")
+    edges: Optional[List[float]] = Field(default=None, description="Inner bin edges of numeric column")
+    counts: Dict[str, int] = Field(default={}, description="Number of reference values per bin")
+
+
+class DriftReference(BaseModel):
+    """
+    Reference distribution of monitored model input data.
+
+    Attributes:
+    - **source (str)**: 'predictions' (the first predictions of the monitored model) or 'dataset'.
+    - **dataset_id (Optional[PydanticObjectId])**: Dataset id if source is 'dataset'.
+    - **size (int)**: Number of reference samples.
+    - **window_size (int)**: Number of predictions of one drift window.
+    - **created_at (datetime)**: Reference creation date.
+    - **columns (Dict[str, DriftColumnReference])**: Reference distribution per escaped column name.
+    """
+    source: str = Field(description="Reference source")
+    dataset_id: Optional[PydanticObjectId] = Field(default=None, description="Dataset id")
+    size: int = Field(description="Number of reference samples")
+    window_size: int = Field(description="Number of predictions of one drift window")
+    created_at: datetime = Field(default_factory=datetime.now)
+    columns: Dict[str, DriftColumnReference] = Field(default={}, description="Reference distribution per column")
+
+
+class DriftWindow(BaseModel):
+    """
+    Binned counts of predictions of the drift window which is not closed yet.
+
+    Attributes:
+    - **count (int)**: Number of predictions in the window.
+    - **start (Optional[datetime])**: Date of the first prediction in the window.
+    - **end (Optional[datetime])**: Date of the last prediction in the window.
+    - **counts (Dict[str, Dict[str, int]])**: Number of values per escaped column name and bin.
+    """
+    count: int = Field(default=0, description="Number of predictions in the window")
+    start: Optional[datetime] = Field(default=None, description="Date of the first prediction")
+    end: Optional[datetime] = Field(default=None, description="Date of the last prediction")
+    counts: Dict[str, Dict[str, int]] = Field(default={}, description="Number of values per column and bin")
+
+
+class ColumnDrift(BaseModel):
+    """
+    Drift statistics of one column in one closed drift window, all None if the window has no values
+    of the column.
+
+    Attributes:
+    - **psi (Optional[float])**: Population stability index.
+    - **ks (Optional[float])**: Kolmogorov-Smirnov statistic, numeric columns only.
+    - **chi2 (Optional[float])**: Chi-squared statistic.
+    - **chi2_dof (Optional[int])**: Degrees of freedom of the chi-squared statistic.
+    - **drifted (Optional[bool])**: True if psi exceeds DRIFT_PSI_THRESHOLD.
+    """
+    psi: Optional[float] = Field(default=None, description="Population stability index")
+    ks: Optional[float] = Field(default=None, description="Kolmogorov-Smirnov statistic")
+    chi2: Optional[float] = Field(default=None, description="Chi-squared statistic")
+    chi2_dof: Optional[int] = Field(default=None, description="Degrees of freedom of the chi-squared statistic")
+    drifted: Optional[bool] = Field(default=None, description="Drift flag")
+
+
+class DriftResult(Document):
+    """
+    Drift statistics of one closed drift window.
+
+    Attributes:
+    - **id (PydanticObjectId)**: Drift result id.
+    - **monitored_model_id (PydanticObjectId)**: Monitored model id.
+    - **window_start (datetime)**: Date of the first prediction in the window.
+    - **window_end (datetime)**: Date of the last prediction in the window.
+    - **predictions_count (int)**: Number of predictions in the window.
+    - **columns (Dict[str, ColumnDrift])**: Drift statistics per column.
+    """
+    monitored_model_id: PydanticObjectId
+    window_start: Optional[datetime] = None
+    window_end: Optional[datetime] = None
+    predictions_count: int = 0
+    columns: Dict[str, ColumnDrift] = {}
+
+    def __repr__(self) -> str:
+        return f"<DriftResult {self.monitored_model_id} {self.window_end}>"
+
+    class Settings:
+        name = "drift_results"
+        indexes = [
+            IndexModel([("monitored_model_id", ASCENDING), ("window_end", ASCENDING)])
+        ]
+
+
+class DriftReferenceRequest(BaseModel):
+    """
+    Request to build drift reference.
+
+    Attributes:
+    - **source (str)**: 'predictions' (the first predictions of the monitored model) or 'dataset'.
+    - **dataset_id (Optional[PydanticObjectId])**: Dataset id, required if source is 'dataset'.
+    - **size (Optional[int])**: Number of reference samples, server default if None.
+    - **window_size (Optional[int])**: Number of predictions of one drift window, server default if None.
+    """
+    source: str = Field(default='predictions', description="Reference source")
+    dataset_id: Optional[PydanticObjectId] = Field(default=None, description="Dataset id")
+    size: Optional[int] = Field(default=None, description="Number of reference samples", gt=0)
+    window_size: Optional[int] = Field(default=None, description="Number of predictions of one drift window", gt=0)
+
+    @validator('source')
+    def validate_source(cls, v):
+        if v not in cls.Settings.sources:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Drift reference source must be one of {cls.Settings.sources}"
+            )
+        return v
+
+    class Settings:
+        sources = ['predictions', 'dataset']
+
+    class Config:
+        schema_extra = {
+            "example": {
+                "source": "predictions",
+                "size": 1000,
+                "window_size": 1000
+            }
+        }
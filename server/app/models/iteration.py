@@ -42,7 +42,10 @@ class Iteration(BaseModel):
     - **image_charts (Optional[List[ImageChart]])**: Image charts list.
     - **assigned_monitored_model_id (Optional[PydanticObjectId])**: Assigned monitored model id.
     - **assigned_monitored_model_name (Optional[str])**: Assigned monitored model name.
-    - **encoded_ml_model (Optional[str])**: Encoded ml model.
+    - **encoded_ml_model (Optional[str])**: Encoded ml model, only accepted on input. It is moved to the artifact
+      store, which keeps every distinct ml model once.
+    - **ml_model_hash (Optional[str])**: SHA-256 of the pickled ml model in the artifact store.
+    - **ml_model_size (Optional[int])**: Size of the pickled ml model in bytes.
     """
 
     id: PydanticObjectId = Field(default_factory=PydanticObjectId, alias="id")
@@ -62,6 +65,8 @@ class Iteration(BaseModel):
     assigned_monitored_model_id: Optional[PydanticObjectId] = Field(default=None, alias="assigned_monitored_model_id")
     assigned_monitored_model_name: Optional[str] = Field(default=None, alias="assigned_monitored_model_name")
     encoded_ml_model: Optional[str] = Field(default=None, description="Encoded ml model")
+    ml_model_hash: Optional[str] = Field(default=None, description="SHA-256 of the pickled ml model")
+    ml_model_size: Optional[int] = Field(default=None, description="Size of the pickled ml model in bytes")
 
     def __repr__(self) -> str:
         return f"<Iteration {self.iteration_name}>"
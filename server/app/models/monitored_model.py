@@ -1,14 +1,17 @@
 import getpass
 import pickle
 
-from pydantic import Field, validator
+from pydantic import BaseModel, Field, validator
 from typing import Optional, List, Set, Tuple
-from beanie import Document
+from beanie import Document, PydanticObjectId, Replace, Save, before_event
 from fastapi import HTTPException, status
 from datetime import datetime
 
+from app.models.column_schema import ColumnSchema
+from app.models.drift import DriftReference, DriftWindow
 from app.models.iteration import Iteration
 from app.models.monitored_model_chart import MonitoredModelInteractiveChart
+from app.models.monitored_model_metrics import RegressionMetricsState, ClassificationMetricsState
 from app.models.prediction_data import PredictionData
 
 
@@ -23,9 +26,22 @@ class MonitoredModel(Document):
     - **model_status (str)**: Monitored model status.
     - **iteration (Iteration)**: Related Iteration.
     - **pinned (bool)**: Monitored model pinned status.
-    - **predictions_data (list[dict])**: Predictions data list of rows as dicts.
+    - **predictions_data (list[dict])**: Predictions data list of rows as dicts. Predictions are stored in the
+      prediction_data collection and attached to the monitored model when it is read.
     - **interactive_charts (list[MonitoredModelInteractiveChart])**: Interactive charts
     - **interactive_charts_existed (Set[Tuple[str, Optional[str], Optional[Tuple[str]]]])**: Interactive charts existed pairs of columns
+    - **inference_executor (Optional[str])**: Executor running predictions ('thread' or 'process'), server default if None.
+    - **regression_metrics_state (RegressionMetricsState)**: Regression metrics accumulators of predictions with actual value.
+    - **classification_metrics_state (ClassificationMetricsState)**: Confusion matrix of predictions with actual value.
+    - **drift_reference (Optional[DriftReference])**: Reference distribution of input data for drift detection.
+    - **drift_window (DriftWindow)**: Binned input data of the drift window which is not closed yet.
+    - **column_schema (ColumnSchema)**: Column schema of input data inferred from stored predictions.
+    - **retention_days (Optional[int])**: Number of days raw predictions are kept, older predictions are compacted
+      into rollups. Raw predictions are kept forever if None.
+    - **rollup_granularity (str)**: Granularity of rollups of compacted predictions ('hour' or 'day').
+    - **compaction_started_at (Optional[datetime])**: Start of the lease of the running compaction of predictions,
+      None if predictions are not being compacted.
+    - **version (int)**: Version bumped on every write to the monitored model or its predictions, used as ETag.
     - **created_at (datetime)**: Monitored model creation date.
     - **updated_at (datetime)**: Monitored model last update date.
     """
@@ -38,6 +54,18 @@ class MonitoredModel(Document):
     interactive_charts: Optional[list[MonitoredModelInteractiveChart]] = Field(default=[], description="Interactive "
                                                                                                        "charts")
     interactive_charts_existed: Optional[List[Tuple[str, Optional[str], Optional[List[str]]]]] = Field(default=[], description="Interactive charts existed pairs of columns")
+    inference_executor: Optional[str] = Field(default=None, description="Executor running predictions")
+    regression_metrics_state: RegressionMetricsState = Field(default_factory=RegressionMetricsState,
+                                                             description="Regression metrics accumulators")
+    classification_metrics_state: ClassificationMetricsState = Field(default_factory=ClassificationMetricsState,
+                                                                     description="Confusion matrix counts")
+    drift_reference: Optional[DriftReference] = Field(default=None, description="Drift reference distribution")
+    drift_window: DriftWindow = Field(default_factory=DriftWindow, description="Open drift window")
+    column_schema: ColumnSchema = Field(default_factory=ColumnSchema, description="Input data column schema")
+    retention_days: Optional[int] = Field(default=None, description="Number of days raw predictions are kept", gt=0)
+    rollup_granularity: str = Field(default='hour', description="Granularity of rollups of compacted predictions")
+    compaction_started_at: Optional[datetime] = Field(default=None, description="Start of the compaction lease")
+    version: int = Field(default=0, description="Version bumped on every write")
     created_at: datetime = Field(default_factory=datetime.now)
     updated_at: datetime = Field(default_factory=datetime.now)
 
@@ -50,6 +78,28 @@ class MonitoredModel(Document):
             )
         return v
 
+    @validator('inference_executor')
+    def validate_inference_executor(cls, v):
+        if v is not None and v not in cls.Settings.valid_inference_executors:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Inference executor must be one of {cls.Settings.valid_inference_executors}"
+            )
+        return v
+
+    @validator('rollup_granularity')
+    def validate_rollup_granularity(cls, v):
+        if v is not None and v not in cls.Settings.valid_rollup_granularities:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Rollup granularity must be one of {cls.Settings.valid_rollup_granularities}"
+            )
+        return v
+
+    @before_event(Save, Replace)
+    def bump_version(self):
+        self.version += 1
+
     def __repr__(self) -> str:
         return f"<Monitored model {self.model_name}>"
 
@@ -67,6 +117,12 @@ class MonitoredModel(Document):
     class Settings:
         name = "monitored_model"
         valid_statuses = ['active', 'idle', 'archived']
+        valid_inference_executors = ['thread', 'process']
+        valid_rollup_granularities = ['hour', 'day']
+        # fields maintained by the server, never overwritten by monitored model update
+        server_managed_fields = ['predictions_data', 'regression_metrics_state', 'classification_metrics_state',
+                                 'drift_reference', 'drift_window', 'column_schema', 'compaction_started_at',
+                                 'version']
 
     class Config:
         schema_extra = {
@@ -96,6 +152,83 @@ class MonitoredModel(Document):
         }
 
 
+class IterationSummary(BaseModel):
+    """
+    Iteration metadata included in monitored model summary, without the encoded ml model and charts.
+
+    Attributes:
+    - **id (PydanticObjectId)**: Iteration id.
+    - **iteration_name (str)**: Iteration title.
+    - **experiment_id (PydanticObjectId)**: Experiment id.
+    - **experiment_name (str)**: Experiment name.
+    - **project_id (PydanticObjectId)**: Project id.
+    - **project_title (str)**: Project title.
+    - **path_to_model (Optional[str])**: Path to model.
+    """
+    id: Optional[PydanticObjectId] = Field(default=None, description="Iteration id")
+    iteration_name: Optional[str] = Field(default=None, description="Iteration title")
+    experiment_id: Optional[PydanticObjectId] = Field(default=None, description="Experiment id")
+    experiment_name: Optional[str] = Field(default=None, description="Experiment name")
+    project_id: Optional[PydanticObjectId] = Field(default=None, description="Project id")
+    project_title: Optional[str] = Field(default=None, description="Project title")
+    path_to_model: Optional[str] = Field(default=None, description="Path to model")
+
+
+class MonitoredModelSummary(BaseModel):
+    """
+    Monitored model metadata with prediction counts, read with a projection so neither predictions nor
+    the encoded ml model are loaded.
+
+    Attributes:
+    - **id (PydanticObjectId)**: Monitored model id.
+    - **model_name (str)**: Monitored model name.
+    - **model_description (str)**: Monitored model description.
+    - **model_status (str)**: Monitored model status.
+    - **iteration (Optional[IterationSummary])**: Related iteration metadata.
+    - **pinned (bool)**: Monitored model pinned status.
+    - **inference_executor (Optional[str])**: Executor running predictions.
+    - **created_at (datetime)**: Monitored model creation date.
+    - **updated_at (datetime)**: Monitored model last update date.
+    - **predictions_count (int)**: Number of predictions.
+    - **actuals_count (int)**: Number of predictions with actual value.
+    - **last_prediction_date (Optional[datetime])**: Date of the latest prediction.
+    """
+    id: PydanticObjectId = Field(alias="_id", description="Monitored model id")
+    model_name: str = Field(description="Model name")
+    model_description: Optional[str] = Field(default="", description="Model description")
+    model_status: str = Field(description="Model status")
+    iteration: Optional[IterationSummary] = Field(default=None, description="Iteration metadata")
+    pinned: bool = Field(default=False, description="Model pinned status")
+    inference_executor: Optional[str] = Field(default=None, description="Executor running predictions")
+    created_at: Optional[datetime] = Field(default=None, description="Model creation date")
+    updated_at: Optional[datetime] = Field(default=None, description="Model last update date")
+    predictions_count: int = Field(default=0, description="Number of predictions")
+    actuals_count: int = Field(default=0, description="Number of predictions with actual value")
+    last_prediction_date: Optional[datetime] = Field(default=None, description="Date of the latest prediction")
+
+    class Settings:
+        projection = {
+            "_id": 1,
+            "model_name": 1,
+            "model_description": 1,
+            "model_status": 1,
+            "iteration.id": 1,
+            "iteration.iteration_name": 1,
+            "iteration.experiment_id": 1,
+            "iteration.experiment_name": 1,
+            "iteration.project_id": 1,
+            "iteration.project_title": 1,
+            "iteration.path_to_model": 1,
+            "pinned": 1,
+            "inference_executor": 1,
+            "created_at": 1,
+            "updated_at": 1
+        }
+
+    class Config:
+        allow_population_by_field_name = True
+
+
 class UpdateMonitoredModel(MonitoredModel):
     """
     Class for update monitored model.
@@ -107,6 +240,8 @@ class UpdateMonitoredModel(MonitoredModel):
     - **iteration (Iteration)**: Related Iteration.
     - **pinned (bool)**: Monitored model pinned status.
     - **predictions_data (list[dict])**: Predictions data list of rows as dicts.
+    - **retention_days (Optional[int])**: Number of days raw predictions are kept, None to keep them forever.
+    - **rollup_granularity (str)**: Granularity of rollups of compacted predictions ('hour' or 'day').
     - **updated_at (datetime)**: Monitored model last update date.
     """
     model_name: Optional[str]
@@ -115,6 +250,7 @@ class UpdateMonitoredModel(MonitoredModel):
     iteration: Optional[Iteration]
     pinned: Optional[bool]
     predictions_data: Optional[list[PredictionData]]
+    rollup_granularity: Optional[str]
     updated_at: datetime = Field(default_factory=datetime.now)
 
     class Config:
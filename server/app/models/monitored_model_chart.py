@@ -16,7 +16,8 @@ class MonitoredModelInteractiveChart(BaseModel):
     - **y_axis_columns (Optional[List[str]])**: List of columns for Y axis.
     - **bin_method (Optional[str])**: Bin method.
     - **bin_number (Optional[int])**: Bin number.
-    - **metrics (Optional[List[str]])**: List of metrics for regression and classification.
+    - **metrics (Optional[List[str]])**: List of metrics for regression and classification, drift statistics
+      for data drift.
     """
     id: PydanticObjectId = Field(default_factory=PydanticObjectId, alias="id")
     monitored_model_id: PydanticObjectId = Field(default_factory=PydanticObjectId, alias="monitored_model_id")
@@ -53,11 +54,12 @@ class MonitoredModelInteractiveChart(BaseModel):
     class Settings:
         name = "MonitoredModelInteractiveChart"
         chart_types = ["histogram", "countplot", "scatter", "scatter_with_histograms", "timeseries",
-                       "regression_metrics", "classification_metrics", "confusion_matrix"]
+                       "regression_metrics", "classification_metrics", "confusion_matrix", "data_drift"]
         bin_methods = ["squareRoot", "scott", "freedmanDiaconis", "sturges", "fixedNumber"]
         metrics = {
             "regression": ["r2", "mae", "mse", "rmse", "medae", "msle", "rmsle", "smape"],
-            "classification": ["accuracy", "precision", "recall", "f1score", "mmc"]
+            "classification": ["accuracy", "precision", "recall", "f1score", "mmc"],
+            "drift": ["psi", "ks", "chi2"]
         }
 
     class Config:
@@ -118,11 +120,12 @@ class UpdateMonitoredModelInteractiveChart(MonitoredModelInteractiveChart):
     class Settings:
         name = "UpdateMonitoredModelInteractiveChart"
         chart_types = ["histogram", "countplot", "scatter", "scatter_with_histograms", "timeseries",
-                       "regression_metrics", "classification_metrics", "confusion_matrix"]
+                       "regression_metrics", "classification_metrics", "confusion_matrix", "data_drift"]
         bin_methods = ["squareRoot", "scott", "freedmanDiaconis", "sturges", "fixedNumber"]
         metrics = {
             "regression": ["r2", "mae", "mse", "rmse", "medae", "msle", "rmsle", "smape"],
-            "classification": ["accuracy", "precision", "recall", "f1score", "mmc"]
+            "classification": ["accuracy", "precision", "recall", "f1score", "mmc"],
+            "drift": ["psi", "ks", "chi2"]
         }
 
     class Config:
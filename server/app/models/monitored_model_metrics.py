@@ -0,0 +1,43 @@
+from typing import Dict, Optional
+
+from pydantic import BaseModel, Field
+
+
+class RegressionMetricsState(BaseModel):
+    """
+    Running accumulators of regression metrics of predictions with actual value.
+
+    Attributes:
+    - **count (int)**: Number of predictions with actual value.
+    - **actual_shift (Optional[float])**: Value subtracted from actual values before they are summed, the first
+      actual value, so the sums stay small and r2 does not lose precision for large actual values.
+    - **sum_actual (float)**: Sum of shifted actual values.
+    - **sum_actual_squared (float)**: Sum of squared shifted actual values.
+    - **sum_squared_error (float)**: Sum of squared errors.
+    - **sum_absolute_error (float)**: Sum of absolute errors.
+    - **sum_squared_log_error (float)**: Sum of squared logarithmic errors.
+    - **log_error_undefined_count (int)**: Number of predictions with actual or prediction not greater than -1.
+    - **sum_smape (float)**: Sum of symmetric absolute percentage errors.
+    - **absolute_error_sketch (Dict[str, int])**: Quantile sketch of absolute errors, bucket index to count.
+    """
+    count: int = Field(default=0, description="Number of predictions with actual value")
+    actual_shift: Optional[float] = Field(default=None, description="Value subtracted from actual values")
+    sum_actual: float = Field(default=0.0, description="Sum of shifted actual values")
+    sum_actual_squared: float = Field(default=0.0, description="Sum of squared shifted actual values")
+    sum_squared_error: float = Field(default=0.0, description="Sum of squared errors")
+    sum_absolute_error: float = Field(default=0.0, description="Sum of absolute errors")
+    sum_squared_log_error: float = Field(default=0.0, description="Sum of squared logarithmic errors")
+    log_error_undefined_count: int = Field(default=0, description="Number of predictions without logarithmic error")
+    sum_smape: float = Field(default=0.0, description="Sum of symmetric absolute percentage errors")
+    absolute_error_sketch: Dict[str, int] = Field(default={}, description="Quantile sketch of absolute errors")
+
+
+class ClassificationMetricsState(BaseModel):
+    """
+    Sparse confusion matrix of predictions with actual value.
+
+    Attributes:
+    - **counts (Dict[str, Dict[str, int]])**: Number of predictions per escaped actual label and escaped predicted label.
+    """
+    counts: Dict[str, Dict[str, int]] = Field(default={}, description="Confusion matrix counts, actual label to "
+                                                                      "predicted label to count")
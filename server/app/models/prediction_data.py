@@ -1,7 +1,9 @@
+import random
 from datetime import datetime
-from typing import Union
-from beanie import PydanticObjectId
-from pydantic import BaseModel, Field
+from typing import Union, List, Optional
+from beanie import Document, PydanticObjectId
+from pydantic import BaseModel, Field, validator
+from pymongo import ASCENDING, IndexModel
 
 
 class PredictionData(BaseModel):
@@ -38,6 +40,76 @@ class PredictionData(BaseModel):
         name = "PredictionData"
 
 
+def sample_bucket(prediction_date: datetime) -> datetime:
+    """
+    Get sample bucket of a prediction, the hour of its prediction date.
+    """
+    return prediction_date.replace(minute=0, second=0, microsecond=0)
+
+
+class PredictionRecord(Document):
+    """
+    Prediction data stored in its own collection, one document per prediction.
+
+    Attributes:
+    - **id (PydanticObjectId)**: Prediction id, the same as id of the related PredictionData.
+    - **monitored_model_id (PydanticObjectId)**: Monitored model id.
+    - **prediction_date (datetime)**: Prediction date.
+    - **input_data (dict)**: Input data.
+    - **prediction (Union[float, int])**: Prediction.
+    - **actual (Union[float, int])**: Actual.
+    - **sample_key (float)**: Uniform random key. Predictions with the smallest keys are a uniform random sample
+      of all predictions of the monitored model, which stays up to date as predictions are inserted.
+    - **sample_bucket (datetime)**: Hour of the prediction date. Indexed together with the sample key, so
+      predictions of any set of hours are sampled without reading predictions of other hours.
+    """
+    monitored_model_id: PydanticObjectId
+    prediction_date: datetime = Field(default_factory=datetime.now)
+    input_data: dict
+    prediction: Union[float, int]
+    actual: Union[float, int] = Field(default=None)
+    sample_key: float = Field(default_factory=random.random)
+    sample_bucket: Optional[datetime] = None
+
+    @validator('sample_bucket', always=True)
+    def validate_sample_bucket(cls, v, values):
+        if v is None and values.get('prediction_date') is not None:
+            return sample_bucket(values['prediction_date'])
+        return v
+
+    @classmethod
+    def from_prediction_data(cls, monitored_model_id: PydanticObjectId,
+                             prediction_data: PredictionData) -> 'PredictionRecord':
+        return cls(
+            id=prediction_data.id,
+            monitored_model_id=monitored_model_id,
+            prediction_date=prediction_data.prediction_date,
+            input_data=prediction_data.input_data,
+            prediction=prediction_data.prediction,
+            actual=prediction_data.actual
+        )
+
+    def to_prediction_data(self) -> PredictionData:
+        return PredictionData(
+            id=self.id,
+            prediction_date=self.prediction_date,
+            input_data=self.input_data,
+            prediction=self.prediction,
+            actual=self.actual
+        )
+
+    def __repr__(self) -> str:
+        return f"<PredictionRecord {self.prediction_date} {self.input_data} {self.prediction}>"
+
+    class Settings:
+        name = "prediction_data"
+        indexes = [
+            IndexModel([("monitored_model_id", ASCENDING), ("prediction_date", ASCENDING), ("_id", ASCENDING)]),
+            IndexModel([("monitored_model_id", ASCENDING), ("sample_key", ASCENDING)]),
+            IndexModel([("monitored_model_id", ASCENDING), ("sample_bucket", ASCENDING), ("sample_key", ASCENDING)])
+        ]
+
+
 class UpdatePredictionData(BaseModel):
     """
     Update prediction data model.
@@ -54,3 +126,85 @@ class UpdatePredictionData(BaseModel):
                         "actual": 0.5
                     }
                 }
+
+
+class ActualUpdate(BaseModel):
+    """
+    Actual value of one prediction in bulk actuals update.
+
+    Attributes:
+    - **prediction_id (PydanticObjectId)**: Prediction id.
+    - **actual (Union[float, int])**: actual prediction value, None to delete it.
+    """
+
+    prediction_id: PydanticObjectId
+    actual: Union[float, int] = Field(default=None)
+
+
+class ActualUpdateResult(BaseModel):
+    """
+    Result of one item of bulk actuals update.
+
+    Attributes:
+    - **prediction_id (PydanticObjectId)**: Prediction id.
+    - **status (str)**: 'updated' or 'not_found'.
+    """
+
+    prediction_id: PydanticObjectId
+    status: str
+
+
+class BulkActualsResult(BaseModel):
+    """
+    Bulk actuals update result model.
+
+    Attributes:
+    - **updated (int)**: Number of updated predictions.
+    - **not_found (int)**: Number of items whose prediction does not exist in the monitored model.
+    - **results (List[ActualUpdateResult])**: Result of every item, in the order of the request.
+    """
+
+    updated: int = Field(default=0, description="Number of updated predictions")
+    not_found: int = Field(default=0, description="Number of items whose prediction was not found")
+    results: List[ActualUpdateResult] = Field(default=[], description="Result of every item")
+
+
+class PredictionError(BaseModel):
+    """
+    Prediction error model.
+
+    Attributes:
+    - **index (int)**: Index of the failed sample in the request.
+    - **input_data (dict)**: Input data of the failed sample.
+    - **detail (str)**: Error description.
+    """
+
+    index: int
+    input_data: dict
+    detail: str
+
+
+class BatchPredictionResult(BaseModel):
+    """
+    Batch prediction result model.
+
+    Attributes:
+    - **predictions (List[PredictionData])**: Predictions data of successfully predicted samples.
+    - **errors (List[PredictionError])**: Errors of samples that could not be predicted.
+    """
+
+    predictions: List[PredictionData] = Field(default=[], description="Predictions data")
+    errors: List[PredictionError] = Field(default=[], description="Prediction errors")
+
+
+class PredictionsPage(BaseModel):
+    """
+    Page of predictions ordered by prediction date and id.
+
+    Attributes:
+    - **predictions (List[PredictionData])**: Predictions data of the page.
+    - **next_cursor (Optional[str])**: Cursor of the next page, None if this is the last page.
+    """
+
+    predictions: List[PredictionData] = Field(default=[], description="Predictions data")
+    next_cursor: Optional[str] = Field(default=None, description="Cursor of the next page")
@@ -0,0 +1,69 @@
+from datetime import datetime
+from typing import Dict, List, Optional
+
+from beanie import Document, PydanticObjectId
+from pydantic import BaseModel, Field
+from pymongo import ASCENDING, IndexModel
+
+
+class ColumnRollup(BaseModel):
+    """
+    Summary of numeric values of one column of the predictions of a rollup bucket.
+
+    Attributes:
+    - **count (int)**: Number of numeric values.
+    - **sum (float)**: Sum of values.
+    - **sum_squared (float)**: Sum of squared values.
+    - **min (Optional[float])**: Minimum value, None if there are no values.
+    - **max (Optional[float])**: Maximum value, None if there are no values.
+    - **sketch (Dict[str, int])**: Quantile sketch of values, signed bucket key to count,
+      see app.utils.rollups.signed_sketch_bucket.
+    """
+    count: int = Field(default=0, description="Number of numeric values")
+    sum: float = Field(default=0.0, description="Sum of values")
+    sum_squared: float = Field(default=0.0, description="Sum of squared values")
+    min: Optional[float] = Field(default=None, description="Minimum value")
+    max: Optional[float] = Field(default=None, description="Maximum value")
+    sketch: Dict[str, int] = Field(default={}, description="Quantile sketch of values")
+
+
+class PredictionRollup(Document):
+    """
+    Aggregate of the predictions of one monitored model in one hour or day, which replaces the raw predictions
+    older than the retention of the monitored model.
+
+    Attributes:
+    - **monitored_model_id (PydanticObjectId)**: Monitored model id.
+    - **granularity (str)**: 'hour' or 'day'.
+    - **bucket_start (datetime)**: Start of the hour or day.
+    - **predictions_count (int)**: Number of predictions.
+    - **actuals_count (int)**: Number of predictions with actual value.
+    - **prediction (ColumnRollup)**: Summary of predictions.
+    - **actual (ColumnRollup)**: Summary of actual values.
+    - **input_data (Dict[str, ColumnRollup])**: Summary per escaped input data column.
+    - **confusion_counts (Dict[str, Dict[str, int]])**: Number of predictions per escaped actual label and
+      escaped predicted label.
+    - **compaction_ids (List[str])**: Ids of compactions merged into the rollup, so a retried compaction
+      is not merged twice.
+    """
+    monitored_model_id: PydanticObjectId
+    granularity: str = Field(description="Rollup granularity")
+    bucket_start: datetime = Field(description="Start of the bucket")
+    predictions_count: int = Field(default=0, description="Number of predictions")
+    actuals_count: int = Field(default=0, description="Number of predictions with actual value")
+    prediction: ColumnRollup = Field(default_factory=ColumnRollup, description="Summary of predictions")
+    actual: ColumnRollup = Field(default_factory=ColumnRollup, description="Summary of actual values")
+    input_data: Dict[str, ColumnRollup] = Field(default={}, description="Summary per escaped input data column")
+    confusion_counts: Dict[str, Dict[str, int]] = Field(default={}, description="Confusion matrix counts, actual "
+                                                                                "label to predicted label to count")
+    compaction_ids: List[str] = Field(default=[], description="Ids of compactions merged into the rollup")
+
+    def __repr__(self) -> str:
+        return f"<PredictionRollup {self.monitored_model_id} {self.granularity} {self.bucket_start}>"
+
+    class Settings:
+        name = "prediction_rollups"
+        indexes = [
+            IndexModel([("monitored_model_id", ASCENDING), ("bucket_start", ASCENDING), ("granularity", ASCENDING)],
+                       unique=True)
+        ]
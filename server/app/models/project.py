@@ -1,4 +1,4 @@
-from beanie import Document
+from beanie import Document, Replace, Save, before_event
 from pydantic import Field, validator
 from typing import Optional, List
 from datetime import datetime
@@ -21,6 +21,7 @@ class Project(Document):
     - **updated_at (datetime)**: Project last update date.
     - **experiments (List[Experiment])**: List of experiments in the project.
     - **pinned (bool)**: Project pinned status.
+    - **version (int)**: Version bumped on every write, used as ETag.
     """
 
     title: str = Field(description="Project title", min_length=1, max_length=40)
@@ -31,6 +32,7 @@ class Project(Document):
     updated_at: datetime = Field(default_factory=datetime.now)
     experiments: List[Experiment] = []
     pinned: bool = Field(default=False, description="Project pinned status")
+    version: int = Field(default=0, description="Version bumped on every write")
 
     @validator('status')
     def validate_status(cls, v):
@@ -41,6 +43,10 @@ class Project(Document):
             )
         return v
 
+    @before_event(Save, Replace)
+    def bump_version(self):
+        self.version += 1
+
     def __repr__(self) -> str:
         return f"<Project {self.title}>"
 
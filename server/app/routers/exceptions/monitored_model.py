@@ -203,4 +203,80 @@ def monitored_model_timeseries_chart_y_axis_columns_not_None_exception():
     return HTTPException(
         status_code=status.HTTP_400_BAD_REQUEST,
         detail="Invalid value for 'y_axis_columns'. Cannot be None for chart type 'timeseries'."
-    )
\ No newline at end of file
+    )
+
+def monitored_model_chart_data_not_supported_exception(chart_type: str):
+    return HTTPException(
+        status_code=status.HTTP_400_BAD_REQUEST,
+        detail=f"Chart data is not computed on the server for {chart_type} chart."
+    )
+
+
+def monitored_model_bad_status_filter_exception(valid_filters: list):
+    return HTTPException(
+        status_code=status.HTTP_400_BAD_REQUEST,
+        detail=f"Status filter must be one of {valid_filters}"
+    )
+
+
+def monitored_model_bad_predictions_cursor_exception():
+    return HTTPException(
+        status_code=status.HTTP_400_BAD_REQUEST,
+        detail="Invalid predictions page cursor."
+    )
+
+
+def monitored_model_bad_downsampling_method_exception(valid_methods: list):
+    return HTTPException(
+        status_code=status.HTTP_400_BAD_REQUEST,
+        detail=f"Downsampling method must be one of {valid_methods}"
+    )
+
+
+def monitored_model_bad_sampling_method_exception(valid_methods: list):
+    return HTTPException(
+        status_code=status.HTTP_400_BAD_REQUEST,
+        detail=f"Sampling method must be one of {valid_methods}"
+    )
+
+
+def monitored_model_bad_export_format_exception(valid_formats: list):
+    return HTTPException(
+        status_code=status.HTTP_400_BAD_REQUEST,
+        detail=f"Export format must be one of {valid_formats}"
+    )
+
+
+def monitored_model_has_no_retention_exception():
+    return HTTPException(
+        status_code=status.HTTP_400_BAD_REQUEST,
+        detail="Monitored model has no retention, set retention_days to compact its predictions."
+    )
+
+
+def monitored_model_compaction_in_progress_exception():
+    return HTTPException(
+        status_code=status.HTTP_409_CONFLICT,
+        detail="Predictions of monitored model are being compacted already."
+    )
+
+
+def monitored_model_drift_reference_no_data_exception():
+    return HTTPException(
+        status_code=status.HTTP_400_BAD_REQUEST,
+        detail="There is no data to build drift reference from."
+    )
+
+
+def monitored_model_drift_reference_dataset_not_given_exception():
+    return HTTPException(
+        status_code=status.HTTP_400_BAD_REQUEST,
+        detail="Dataset id is required to build drift reference from dataset."
+    )
+
+
+def monitored_model_drift_reference_dataset_exception(description: str):
+    return HTTPException(
+        status_code=status.HTTP_400_BAD_REQUEST,
+        detail=f"Failed to read dataset for drift reference. {description}"
+    )
@@ -1,6 +1,6 @@
 from datetime import datetime
 
-from fastapi import APIRouter, status
+from fastapi import APIRouter, Request, Response, status
 from beanie import PydanticObjectId
 from typing import List, Dict
 
@@ -13,12 +13,14 @@ from app.routers.exceptions.experiment import experiment_name_not_unique_excepti
 from app.routers.exceptions.iteration import iteration_not_found_exception, \
     iteration_in_experiment_assigned_to_monitored_model_exception, iteration_assigned_to_monitored_model_exception
 from app.routers.exceptions.project import project_not_found_exception
+from app.utils.etag import check_document_etag
 
 experiment_router = APIRouter()
 
 
 @experiment_router.get("/", response_model=List[Experiment], status_code=status.HTTP_200_OK)
-async def get_experiments(project_id: PydanticObjectId) -> List[Experiment]:
+async def get_experiments(project_id: PydanticObjectId, request: Request,
+                          response: Response) -> List[Experiment]:
     """
     Retrieve all experiments.
 
@@ -29,6 +31,9 @@ async def get_experiments(project_id: PydanticObjectId) -> List[Experiment]:
     Returns:
     - **List[Experiment]**: List of experiments
     """
+    if await check_document_etag(request, response, Project, {"_id": project_id}) is None:
+        raise project_not_found_exception()
+
     project = await Project.get(project_id)
     if not project:
         raise project_not_found_exception()
@@ -39,7 +44,8 @@ async def get_experiments(project_id: PydanticObjectId) -> List[Experiment]:
 
 
 @experiment_router.get("/{id}", response_model=Experiment, status_code=status.HTTP_200_OK)
-async def get_experiment(project_id: PydanticObjectId, id: PydanticObjectId) -> Experiment:
+async def get_experiment(project_id: PydanticObjectId, id: PydanticObjectId, request: Request,
+                         response: Response) -> Experiment:
     """
     Retrieve experiment by id.
 
@@ -50,6 +56,9 @@ async def get_experiment(project_id: PydanticObjectId, id: PydanticObjectId) ->
     Returns:
     - **Experiment**: Experiment
     """
+    if await check_document_etag(request, response, Project, {"_id": project_id}) is None:
+        raise project_not_found_exception()
+
     project = await Project.get(project_id)
     if not project:
         raise project_not_found_exception()
@@ -62,7 +71,8 @@ async def get_experiment(project_id: PydanticObjectId, id: PydanticObjectId) ->
 
 
 @experiment_router.get("/name/{name}", response_model=Experiment, status_code=status.HTTP_200_OK)
-async def get_experiment_by_name(project_id: PydanticObjectId, name: str) -> Experiment:
+async def get_experiment_by_name(project_id: PydanticObjectId, name: str, request: Request,
+                                 response: Response) -> Experiment:
     """
     Retrieve experiment by name.
 
@@ -73,6 +83,9 @@ async def get_experiment_by_name(project_id: PydanticObjectId, name: str) -> Exp
     Returns:
     - **Experiment**: Experiment
     """
+    if await check_document_etag(request, response, Project, {"_id": project_id}) is None:
+        raise project_not_found_exception()
+
     project = await Project.get(project_id)
     if not project:
         raise project_not_found_exception()
@@ -1,6 +1,7 @@
+import asyncio
 from datetime import datetime
 
-from fastapi import APIRouter, status
+from fastapi import APIRouter, Request, Response, status
 from beanie import PydanticObjectId
 from typing import List, Dict
 
@@ -13,12 +14,15 @@ from app.routers.exceptions.experiment import experiment_not_found_exception
 from app.routers.exceptions.project import project_not_found_exception
 from app.routers.exceptions.iteration import iteration_not_found_exception, \
     iteration_assigned_to_monitored_model_exception, iteration_no_path_to_model_exception
+from app.utils.artifact_store import store_iteration_ml_model
+from app.utils.etag import check_document_etag
 
 iteration_router = APIRouter()
 
 
 @iteration_router.get("/", response_model=List[Iteration], status_code=status.HTTP_200_OK)
-async def get_iterations(project_id: PydanticObjectId, experiment_id: PydanticObjectId) -> List[Iteration]:
+async def get_iterations(project_id: PydanticObjectId, experiment_id: PydanticObjectId,
+                         request: Request, response: Response) -> List[Iteration]:
     """
     Retrieve all iteration for selected experiment.
 
@@ -29,6 +33,9 @@ async def get_iterations(project_id: PydanticObjectId, experiment_id: PydanticOb
     Returns:
     - **List[Iteration]**: List of iterations
     """
+    if await check_document_etag(request, response, Project, {"_id": project_id}) is None:
+        raise project_not_found_exception()
+
     project = await Project.get(project_id)
     if not project:
         raise project_not_found_exception()
@@ -44,7 +51,8 @@ async def get_iterations(project_id: PydanticObjectId, experiment_id: PydanticOb
 
 
 @iteration_router.get("/{id}", response_model=Iteration, status_code=status.HTTP_200_OK)
-async def get_iteration(project_id: PydanticObjectId, experiment_id: PydanticObjectId, id: PydanticObjectId) -> \
+async def get_iteration(project_id: PydanticObjectId, experiment_id: PydanticObjectId, id: PydanticObjectId,
+                        request: Request, response: Response) -> \
         Iteration:
     """
     Retrieve iteration by id.
@@ -57,6 +65,9 @@ async def get_iteration(project_id: PydanticObjectId, experiment_id: PydanticObj
     Returns:
     - **Iteration**: Iteration
     """
+    if await check_document_etag(request, response, Project, {"_id": project_id}) is None:
+        raise project_not_found_exception()
+
     project = await Project.get(project_id)
     if not project:
         raise project_not_found_exception()
@@ -73,7 +84,8 @@ async def get_iteration(project_id: PydanticObjectId, experiment_id: PydanticObj
 
 
 @iteration_router.get("/name/{name}", response_model=List[Iteration], status_code=status.HTTP_200_OK)
-async def get_iterations_by_name(project_id: PydanticObjectId, experiment_id: PydanticObjectId, name: str) -> \
+async def get_iterations_by_name(project_id: PydanticObjectId, experiment_id: PydanticObjectId, name: str,
+                                 request: Request, response: Response) -> \
         List[Iteration]:
     """
     Retrieve all iterations by name.
@@ -86,6 +98,9 @@ async def get_iterations_by_name(project_id: PydanticObjectId, experiment_id: Py
     Returns:
     - **List[Iteration]**: List of iterations with selected name
     """
+    if await check_document_etag(request, response, Project, {"_id": project_id}) is None:
+        raise project_not_found_exception()
+
     project = await Project.get(project_id)
     if not project:
         raise project_not_found_exception()
@@ -146,6 +161,9 @@ async def add_iteration(project_id: PydanticObjectId, experiment_id: PydanticObj
 
         await add_iteration_to_dataset_linked_iterations(iteration)
 
+    # keep only hash and size of the ml model in the project document
+    await asyncio.to_thread(store_iteration_ml_model, iteration)
+
     experiment.iterations.append(iteration)
     await project.save()
 
@@ -1,16 +1,30 @@
+import asyncio
 import base64
+import hashlib
 import io
+import numpy as np
 import pandas as pd
-from typing import List, Union, Optional
+from typing import AsyncIterator, Dict, List, Union, Optional, Tuple
 import pickle
-from datetime import datetime
+import time
+from datetime import datetime, timedelta
 from beanie import PydanticObjectId
-from fastapi import APIRouter, status
-
+from beanie.operators import In
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Query, Request, Response, status
+from fastapi.responses import StreamingResponse
+from pymongo import ReturnDocument, UpdateOne
+from pymongo.errors import DuplicateKeyError
+
+from app.models.column_schema import ColumnSchema
+from app.models.dataset import Dataset
+from app.models.drift import ColumnDrift, DriftReference, DriftWindow, DriftResult, DriftReferenceRequest
 from app.models.iteration import Iteration
-from app.models.monitored_model import MonitoredModel, UpdateMonitoredModel
+from app.models.monitored_model import MonitoredModel, UpdateMonitoredModel, MonitoredModelSummary
 from app.models.monitored_model_chart import MonitoredModelInteractiveChart, UpdateMonitoredModelInteractiveChart
-from app.models.prediction_data import PredictionData, UpdatePredictionData
+from app.models.monitored_model_metrics import RegressionMetricsState, ClassificationMetricsState
+from app.models.prediction_data import PredictionData, UpdatePredictionData, PredictionError, BatchPredictionResult, \
+    PredictionRecord, PredictionsPage, ActualUpdate, ActualUpdateResult, BulkActualsResult
+from app.models.prediction_rollup import ColumnRollup, PredictionRollup
 from app.models.project import Project
 from app.routers.exceptions.experiment import experiment_not_found_exception
 from app.routers.exceptions.iteration import iteration_not_found_exception
@@ -29,25 +43,64 @@ from app.routers.exceptions.monitored_model import monitored_model_not_found_exc
     monitored_model_chart_changing_columns_exception, monitored_model_prediction_not_found_exception, \
     monitored_model_chart_metrics_None_exception, monitored_model_scatter_chart_y_axis_columns_not_None_exception, \
     monitored_model_timeseries_chart_y_axis_columns_not_None_exception, \
-    monitored_model_chart_metrics_not_None_exception, monitored_model_chart_metric_not_in_metrics_exception
+    monitored_model_chart_metrics_not_None_exception, monitored_model_chart_metric_not_in_metrics_exception, \
+    monitored_model_chart_data_not_supported_exception, monitored_model_bad_status_filter_exception, \
+    monitored_model_bad_predictions_cursor_exception, monitored_model_bad_downsampling_method_exception, \
+    monitored_model_drift_reference_no_data_exception, monitored_model_drift_reference_dataset_not_given_exception, \
+    monitored_model_drift_reference_dataset_exception, monitored_model_bad_export_format_exception, \
+    monitored_model_has_no_retention_exception, monitored_model_bad_sampling_method_exception, \
+    monitored_model_compaction_in_progress_exception
+from app.routers.exceptions.dataset import dataset_not_found_exception
 from app.routers.exceptions.project import project_not_found_exception
+from app.config.config import settings
+from app.utils.arrow_export import ExportWriter, export_formats, export_media_types, export_schema, \
+    records_to_batch, value_type
+from app.utils.artifact_store import artifact_store, store_iteration_ml_model
+from app.utils.batcher import prediction_batcher
+from app.utils.chart_cache import chart_data_cache
+from app.utils.chart_data import histogram_bins, downsample_series, scatter_points
+from app.utils.drift import add_to_drift_window, build_references, drift_statistics
+from app.utils.etag import check_document_etag, check_documents_etag, document_etag
+from app.utils.field_names import escape_field_name, unescape_field_name
+from app.utils.column_schema import column_schema_update, describe_column_schema
+from app.utils.classification_metrics import classification_state_increments, compute_classification_metrics, \
+    confusion_matrix
+from app.utils.inference import CustomUnpickler, inference_engine
+from app.utils.metrics import predict_phase_duration, predictions_compacted, predictions_compaction_failures
+from app.utils.model_cache import model_cache
+from app.utils.ndjson import NDJSONResponse, iter_ndjson_samples, ndjson_line
+from app.utils.pagination import encode_cursor, decode_cursor
+from app.utils.regression_metrics import regression_state_increments, compute_regression_metrics, \
+    regression_actual_shift
+from app.utils.rollups import RollupAccumulator, bucket_floor, merge_column_rollups, retention_cutoff, \
+    rollup_granularities
+from app.utils.warmup import model_warmup
 
 monitored_model_router = APIRouter()
 
 
-class CustomUnpickler(pickle.Unpickler):
-    def find_class(self, module, name):
-        if name == 'MonitoredModelWrapper':
-            from app.models.monitored_model_wrapper import MonitoredModelWrapper
-            return MonitoredModelWrapper
-        if name == 'BaselineNN':
-            from app.models.monitored_model_wrapper import BaselineNN
-            return BaselineNN
-        return super().find_class(module, name)
+async def monitored_model_version(id: PydanticObjectId, request: Request, response: Response) -> int:
+    """
+    Util function for reading version of monitored model, used as dependency of GET endpoints. Responds with
+    304 Not Modified if If-None-Match header of request matches the ETag of the version, otherwise sets the ETag
+    header of response.
+
+    Args:
+        id: Monitored model id.
+        request: Request.
+        response: Response.
+
+    Returns:
+        Version of monitored model.
+    """
+    version = await check_document_etag(request, response, MonitoredModel, {"_id": id})
+    if version is None:
+        raise monitored_model_not_found_exception()
+    return version
 
 
 @monitored_model_router.get("/", response_model=List[MonitoredModel], status_code=status.HTTP_200_OK)
-async def get_all_monitored_models() -> List[MonitoredModel]:
+async def get_all_monitored_models(request: Request, response: Response) -> List[MonitoredModel]:
     """
     Get all monitored models.
 
@@ -58,12 +111,13 @@ async def get_all_monitored_models() -> List[MonitoredModel]:
     - **List[MonitoredModel]**: List of all monitored models.
     """
 
+    await check_documents_etag(request, response, MonitoredModel)
     monitored_models = await MonitoredModel.find_all().to_list()
-    return monitored_models
+    return await attach_predictions_data(monitored_models)
 
 
 @monitored_model_router.get("/non-archived", response_model=List[MonitoredModel], status_code=status.HTTP_200_OK)
-async def get_non_archived_monitored_models() -> List[MonitoredModel]:
+async def get_non_archived_monitored_models(request: Request, response: Response) -> List[MonitoredModel]:
     """
     Get all non-archived monitored models.
 
@@ -74,12 +128,13 @@ async def get_non_archived_monitored_models() -> List[MonitoredModel]:
     - **List[MonitoredModel]**: List of all non-archived monitored models.
     """
 
+    await check_documents_etag(request, response, MonitoredModel, MonitoredModel.model_status != 'archived')
     monitored_models = await MonitoredModel.find(MonitoredModel.model_status != 'archived').to_list()
-    return monitored_models
+    return await attach_predictions_data(monitored_models)
 
 
 @monitored_model_router.get("/archived", response_model=List[MonitoredModel], status_code=status.HTTP_200_OK)
-async def get_archived_monitored_models() -> List[MonitoredModel]:
+async def get_archived_monitored_models(request: Request, response: Response) -> List[MonitoredModel]:
     """
     Get all archived monitored models.
 
@@ -90,12 +145,13 @@ async def get_archived_monitored_models() -> List[MonitoredModel]:
     - **List[MonitoredModel]**: List of all archived monitored models.
     """
 
+    await check_documents_etag(request, response, MonitoredModel, MonitoredModel.model_status == 'archived')
     monitored_models = await MonitoredModel.find(MonitoredModel.model_status == 'archived').to_list()
-    return monitored_models
+    return await attach_predictions_data(monitored_models)
 
 
 @monitored_model_router.get("/active", response_model=List[MonitoredModel], status_code=status.HTTP_200_OK)
-async def get_active_monitored_models() -> List[MonitoredModel]:
+async def get_active_monitored_models(request: Request, response: Response) -> List[MonitoredModel]:
     """
     Get all active monitored models.
 
@@ -106,12 +162,13 @@ async def get_active_monitored_models() -> List[MonitoredModel]:
     - **List[MonitoredModel]**: List of all active monitored models.
     """
 
+    await check_documents_etag(request, response, MonitoredModel, MonitoredModel.model_status == 'active')
     monitored_models = await MonitoredModel.find(MonitoredModel.model_status == 'active').to_list()
-    return monitored_models
+    return await attach_predictions_data(monitored_models)
 
 
 @monitored_model_router.get("/idle", response_model=List[MonitoredModel], status_code=status.HTTP_200_OK)
-async def get_idle_monitored_models() -> List[MonitoredModel]:
+async def get_idle_monitored_models(request: Request, response: Response) -> List[MonitoredModel]:
     """
     Get all idle monitored models.
 
@@ -122,31 +179,71 @@ async def get_idle_monitored_models() -> List[MonitoredModel]:
     - **List[MonitoredModel]**: List of all idle monitored models.
     """
 
+    await check_documents_etag(request, response, MonitoredModel, MonitoredModel.model_status == 'idle')
     monitored_models = await MonitoredModel.find(MonitoredModel.model_status == 'idle').to_list()
-    return monitored_models
+    return await attach_predictions_data(monitored_models)
+
+
+@monitored_model_router.get("/summary", response_model=List[MonitoredModelSummary], status_code=status.HTTP_200_OK)
+async def get_monitored_models_summary(request: Request, response: Response,
+                                       model_status: Optional[str] = Query(default=None, alias="status")) \
+        -> List[MonitoredModelSummary]:
+    """
+    Get metadata of monitored models with numbers of predictions and the date of the latest prediction.
+    Predictions, the encoded ml model and charts are not loaded.
+
+    Args:
+    - **status (Optional[str])**: Status filter, one of 'active', 'idle', 'archived' or 'non-archived'.
+      All monitored models if not given.
+
+    Returns:
+    - **List[MonitoredModelSummary]**: List of monitored models summaries.
+    """
+    valid_filters = MonitoredModel.Settings.valid_statuses + ['non-archived']
+    if model_status is None:
+        query = {}
+    elif model_status == 'non-archived':
+        query = MonitoredModel.model_status != 'archived'
+    elif model_status in valid_filters:
+        query = MonitoredModel.model_status == model_status
+    else:
+        raise monitored_model_bad_status_filter_exception(valid_filters)
+
+    await check_documents_etag(request, response, MonitoredModel, query)
+    summaries = await MonitoredModel.find(query, projection_model=MonitoredModelSummary).to_list()
+    return await attach_predictions_counts(summaries)
 
 
 @monitored_model_router.get('/name/{name}', response_model=MonitoredModel, status_code=status.HTTP_200_OK)
-async def get_monitored_model_by_name(name: str) -> MonitoredModel:
+async def get_monitored_model_by_name(name: str, request: Request, response: Response,
+                                      with_predictions: bool = True) -> MonitoredModel:
     """
     Retrieve monitored model by name.
 
     Args:
     - **name (str)**: Monitored model name
+    - **with_predictions (bool)**: Attach predictions data. Without it only the monitored model document is read,
+      e.g. to look up its id, so the response does not grow with the number of predictions.
 
     Returns:
     - **MonitoredModel**: Monitored model
     """
 
+    if await check_document_etag(request, response, MonitoredModel, {"model_name": name}) is None:
+        raise monitored_model_not_found_exception()
+
     monitored_model = await MonitoredModel.find_one(MonitoredModel.model_name == name)
     if not monitored_model:
         raise monitored_model_not_found_exception()
 
+    if with_predictions:
+        await attach_predictions_data([monitored_model])
     return monitored_model
 
 
 @monitored_model_router.get('/id/{id}', response_model=MonitoredModel, status_code=status.HTTP_200_OK)
-async def get_monitored_model_by_id(id: PydanticObjectId) -> MonitoredModel:
+async def get_monitored_model_by_id(id: PydanticObjectId,
+                                    version: int = Depends(monitored_model_version)) -> MonitoredModel:
     """
     Retrieve monitored model by id.
 
@@ -161,6 +258,7 @@ async def get_monitored_model_by_id(id: PydanticObjectId) -> MonitoredModel:
     if not monitored_model:
         raise monitored_model_not_found_exception()
 
+    await attach_predictions_data([monitored_model])
     return monitored_model
 
 
@@ -192,6 +290,15 @@ async def create_monitored_model(monitored_model: MonitoredModel) -> MonitoredMo
         if iteration_to_check.path_to_model is None or iteration_to_check.path_to_model == '':
             raise iteration_has_no_path_to_model_exception()
 
+    await asyncio.to_thread(store_iteration_ml_model, monitored_model.iteration)
+
+    predictions_data = monitored_model.predictions_data or []
+    monitored_model.predictions_data = []
+    monitored_model.regression_metrics_state = RegressionMetricsState()
+    monitored_model.classification_metrics_state = ClassificationMetricsState()
+    monitored_model.drift_reference = None
+    monitored_model.drift_window = DriftWindow()
+    monitored_model.column_schema = ColumnSchema()
     monitored_model = await monitored_model.insert()
 
     if monitored_model.iteration is not None:
@@ -202,7 +309,10 @@ async def create_monitored_model(monitored_model: MonitoredModel) -> MonitoredMo
         monitored_model.iteration = iteration_with_assigned_model
 
     await monitored_model.save()
+    await store_predictions_data(monitored_model.id, predictions_data)
 
+    monitored_model = await MonitoredModel.get(monitored_model.id)
+    monitored_model.predictions_data = predictions_data
     return monitored_model
   
 
@@ -279,11 +389,18 @@ async def update_monitored_model(id: PydanticObjectId, updated_monitored_model:
             # Update monitored_model's iteration with the updated iteration
             updated_monitored_model.iteration = iteration_with_assigned_model
 
+    if updated_monitored_model.iteration is not None:
+        await asyncio.to_thread(store_iteration_ml_model, updated_monitored_model.iteration)
+
     updated_monitored_model.updated_at = datetime.now()
-    await monitored_model.update({"$set": updated_monitored_model.dict(exclude_unset=True)})
+    server_managed_fields = set(MonitoredModel.Settings.server_managed_fields)
+    await monitored_model.update({"$set": updated_monitored_model.dict(exclude_unset=True,
+                                                                       exclude=server_managed_fields),
+                                  "$inc": {"version": 1}})
+    model_cache.invalidate(id)
     monitored_model = await MonitoredModel.get(id)
-    await monitored_model.save()
 
+    await attach_predictions_data([monitored_model])
     return monitored_model
 
 
@@ -306,12 +423,49 @@ async def delete_monitored_model(id: PydanticObjectId) -> MonitoredModel:
     if monitored_model.iteration is not None:
         await update_assigned_model_in_iteration(monitored_model.iteration, None, None)
 
+    await attach_predictions_data([monitored_model])
     await monitored_model.delete()
+    await PredictionRecord.find(PredictionRecord.monitored_model_id == id).delete()
+    await PredictionRollup.find(PredictionRollup.monitored_model_id == id).delete()
+    await DriftResult.find(DriftResult.monitored_model_id == id).delete()
+    model_cache.invalidate(id)
+    chart_data_cache.invalidate(id)
+    predict_phase_duration.remove(model_id=str(id))
     return monitored_model
 
 
+@monitored_model_router.get('/model-cache/stats', response_model=dict, status_code=status.HTTP_200_OK)
+async def get_model_cache_stats() -> dict:
+    """
+    Get statistics of the decoded ml models cache.
+
+    Args:
+    - **None**
+
+    Returns:
+    - **dict**: Cache size, size limit and hit/miss/eviction counters.
+    """
+    return model_cache.stats()
+
+
+@monitored_model_router.get('/inference/stats', response_model=dict, status_code=status.HTTP_200_OK)
+async def get_inference_stats() -> dict:
+    """
+    Get queue wait and execution time statistics of predictions per monitored model, in seconds,
+    and statistics of batching concurrent predictions.
+
+    Args:
+    - **None**
+
+    Returns:
+    - **dict**: Pool sizes, statistics of every monitored model and batching statistics.
+    """
+    return {**inference_engine.stats(), 'batching': prediction_batcher.stats()}
+
+
 @monitored_model_router.get('/{id}/ml-model-metadata', response_model=dict, status_code=status.HTTP_200_OK)
-async def get_monitored_model_ml_model_metadata(id: PydanticObjectId) -> dict:
+async def get_monitored_model_ml_model_metadata(id: PydanticObjectId,
+                                                version: int = Depends(monitored_model_version)) -> dict:
     """
     Get monitored model ml model metadata.
 
@@ -340,73 +494,281 @@ async def get_monitored_model_ml_model_metadata(id: PydanticObjectId) -> dict:
 
 
 @monitored_model_router.post('/{id}/predict', response_model=list[PredictionData], status_code=status.HTTP_200_OK)
-async def monitored_model_predict(id: PydanticObjectId, data: list[dict]) -> list[PredictionData]:
+async def monitored_model_predict(id: PydanticObjectId, data: list[dict], background_tasks: BackgroundTasks,
+                                  shadow: Optional[List[PydanticObjectId]] = Query(default=None)) \
+        -> list[PredictionData]:
     """
-    Make prediction using monitored model ml model. <br>
+    Make prediction using monitored model ml model. All samples are predicted with one vectorized call.
+    If any sample cannot be predicted, no prediction is stored. Shadow monitored models predict the same samples
+    concurrently after the response is sent and store predictions data under their own monitored models. <br>
     **NOTE:** ml model needs to be complied with scikit-learn API.
 
     Args:
     - **id (str)**: Monitored model id
     - **data (list[dict])**: List of samples to make prediction on.
+    - **shadow (Optional[List[str]])**: Ids of shadow monitored models, may be given multiple times.
 
     Returns:
     - **list[PredictionData]**: List of predictions data.
     """
-    monitored_model = await MonitoredModel.get(id)
+    with predict_phase_duration.time(str(id), 'db_load'):
+        monitored_model = await MonitoredModel.get(id)
 
     if not monitored_model:
+        # no series of ids which are not monitored models, so the model_id label stays bounded
+        predict_phase_duration.remove(model_id=str(id))
         raise monitored_model_not_found_exception()
     if not monitored_model.iteration:
         raise monitored_model_has_no_iteration_exception()
 
-    try:
-        ml_model = await load_ml_model(monitored_model)
-    except Exception as e:
-        raise monitored_model_load_ml_model_exception(str(e))
+    predictions_data, errors = await run_predictions(monitored_model, data)
+    if errors:
+        raise monitored_model_prediction_exception(errors[0].detail)
 
-    predictions_data = []
-    for sample in data:
-        try:
-            prediction = ml_model.predict(pd.DataFrame([sample]))[0]
-            prediction_data = PredictionData(
-                input_data=sample,
-                prediction=prediction
-            )
-            predictions_data.append(prediction_data)
-            monitored_model.predictions_data.append(prediction_data)
-            await monitored_model.save()
-        except Exception as e:
-            raise monitored_model_prediction_exception(str(e))
+    await store_predictions_data(monitored_model.id, predictions_data)
+    schedule_shadow_predictions(background_tasks, monitored_model.id, shadow, data)
 
     return predictions_data
 
 
-@monitored_model_router.put('/{id}/predictions/{prediction_id}', response_model=PredictionData, status_code=status.HTTP_200_OK)
-async def monitored_model_set_actual_prediction_value(id: PydanticObjectId, prediction_id: PydanticObjectId, updated_prediction: UpdatePredictionData) -> PredictionData:
+@monitored_model_router.post('/{id}/predict-batch', response_model=BatchPredictionResult,
+                             status_code=status.HTTP_200_OK)
+async def monitored_model_predict_batch(id: PydanticObjectId, data: list[dict], background_tasks: BackgroundTasks,
+                                        shadow: Optional[List[PydanticObjectId]] = Query(default=None)) \
+        -> BatchPredictionResult:
     """
-    Set actual prediction value.
+    Make batch prediction using monitored model ml model. All samples are predicted with one vectorized call
+    and stored with one write. Samples that cannot be predicted are reported in errors and do not abort
+    the rest of the batch. Shadow monitored models predict the same samples concurrently after the response
+    is sent and store predictions data under their own monitored models. <br>
+    **NOTE:** ml model needs to be complied with scikit-learn API.
 
     Args:
     - **id (str)**: Monitored model id
-    - **prediction_id (str)**: Prediction id.
+    - **data (list[dict])**: List of samples to make prediction on.
+    - **shadow (Optional[List[str]])**: Ids of shadow monitored models, may be given multiple times.
 
     Returns:
-    - **PredictionData**: Updated prediction.
+    - **BatchPredictionResult**: Predictions data of predicted samples and errors of failed samples.
     """
+    with predict_phase_duration.time(str(id), 'db_load'):
+        monitored_model = await MonitoredModel.get(id)
 
-    monitored_model = await MonitoredModel.get(id)
+    if not monitored_model:
+        # no series of ids which are not monitored models, so the model_id label stays bounded
+        predict_phase_duration.remove(model_id=str(id))
+        raise monitored_model_not_found_exception()
+    if not monitored_model.iteration:
+        raise monitored_model_has_no_iteration_exception()
+
+    predictions_data, errors = await run_predictions(monitored_model, data)
+
+    await store_predictions_data(monitored_model.id, predictions_data)
+    schedule_shadow_predictions(background_tasks, monitored_model.id, shadow, data)
+
+    return BatchPredictionResult(predictions=predictions_data, errors=errors)
+
+
+@monitored_model_router.post('/{id}/predict-stream', response_class=NDJSONResponse, status_code=status.HTTP_200_OK)
+async def monitored_model_predict_stream(id: PydanticObjectId, request: Request,
+                                         batch_size: Optional[int] = Query(default=None, ge=1)) -> NDJSONResponse:
+    """
+    Make streaming prediction using monitored model ml model. Request body is newline-delimited JSON with one
+    sample per line and may be sent with chunked transfer encoding. Samples are predicted and stored in batches
+    as they arrive and results are streamed back as newline-delimited JSON, so memory use does not grow with
+    the number of samples. Every result line is either predictions data of a predicted sample or prediction error,
+    which has detail, of a sample that could not be predicted or parsed. Index of an error is the line number
+    of the sample among non-empty lines, starting from 0. <br>
+    **NOTE:** ml model needs to be complied with scikit-learn API.
+
+    Args:
+    - **id (str)**: Monitored model id
+    - **batch_size (int)**: Number of samples predicted together, PREDICT_STREAM_BATCH_SIZE setting by default.
+
+    Returns:
+    - **NDJSONResponse**: Stream of predictions data and prediction errors.
+    """
+    with predict_phase_duration.time(str(id), 'db_load'):
+        monitored_model = await MonitoredModel.get(id)
 
     if not monitored_model:
+        # no series of ids which are not monitored models, so the model_id label stays bounded
+        predict_phase_duration.remove(model_id=str(id))
         raise monitored_model_not_found_exception()
+    if not monitored_model.iteration:
+        raise monitored_model_has_no_iteration_exception()
 
-    prediction = next((prediction for prediction in monitored_model.predictions_data if prediction.id == prediction_id), None)
-    if not prediction:
-        monitored_model_prediction_not_found_exception()
+    samples = iter_ndjson_samples(request.stream())
+    return NDJSONResponse(predict_stream(monitored_model, samples, batch_size or settings.PREDICT_STREAM_BATCH_SIZE))
 
-    prediction.actual = updated_prediction.actual
-    await monitored_model.save()
 
-    return prediction
+@monitored_model_router.get('/{id}/predictions', response_model=PredictionsPage, status_code=status.HTTP_200_OK)
+async def get_monitored_model_predictions(id: PydanticObjectId,
+                                          from_date: Optional[datetime] = Query(default=None, alias="from"),
+                                          to_date: Optional[datetime] = Query(default=None, alias="to"),
+                                          limit: int = Query(default=100, ge=1,
+                                                             le=settings.PREDICTIONS_PAGE_MAX_SIZE),
+                                          cursor: Optional[str] = None,
+                                          version: int = Depends(monitored_model_version)) -> PredictionsPage:
+    """
+    Get page of monitored model predictions ordered by prediction date and id. Pages are read with keyset
+    pagination, so every page costs the same no matter how deep in the history it is.
+
+    Args:
+    - **id (str)**: Monitored model id
+    - **from (Optional[datetime])**: Only predictions made at or after this date.
+    - **to (Optional[datetime])**: Only predictions made before this date.
+    - **limit (int)**: Maximum number of predictions of the page.
+    - **cursor (Optional[str])**: Cursor of the page, next_cursor of the previous page. First page if not given.
+
+    Returns:
+    - **PredictionsPage**: Predictions of the page and cursor of the next page.
+    """
+    query = predictions_query(id, from_date, to_date)
+    if cursor is not None:
+        try:
+            last_date, last_id = decode_cursor(cursor)
+        except ValueError:
+            raise monitored_model_bad_predictions_cursor_exception()
+        query["$or"] = [{"prediction_date": {"$gt": last_date}},
+                        {"prediction_date": last_date, "_id": {"$gt": last_id}}]
+
+    records = await PredictionRecord.find(query).sort([("prediction_date", 1), ("_id", 1)]) \
+        .limit(limit + 1).to_list()
+
+    next_cursor = None
+    if len(records) > limit:
+        records = records[:limit]
+        next_cursor = encode_cursor(records[-1].prediction_date, records[-1].id)
+
+    return PredictionsPage(predictions=[record.to_prediction_data() for record in records], next_cursor=next_cursor)
+
+
+@monitored_model_router.get('/{id}/predictions/export', response_class=StreamingResponse,
+                            status_code=status.HTTP_200_OK)
+async def export_monitored_model_predictions(id: PydanticObjectId,
+                                             export_format: str = Query(default='arrow', alias="format"),
+                                             from_date: Optional[datetime] = Query(default=None, alias="from"),
+                                             to_date: Optional[datetime] = Query(default=None, alias="to"),
+                                             version: int = Depends(monitored_model_version)) \
+        -> StreamingResponse:
+    """
+    Export monitored model predictions ordered by prediction date as Arrow IPC stream or Parquet file.
+    Every row holds prediction id, prediction date, prediction, actual and one column per input data column.
+    Predictions are read from the database and encoded in record batches while the response is streamed,
+    so memory use does not grow with the number of predictions.
+
+    Args:
+    - **id (str)**: Monitored model id
+    - **format (str)**: 'arrow' for Arrow IPC stream or 'parquet' for Parquet file with one row group per batch.
+    - **from (Optional[datetime])**: Only predictions made at or after this date.
+    - **to (Optional[datetime])**: Only predictions made before this date.
+
+    Returns:
+    - **StreamingResponse**: Encoded predictions.
+    """
+    if export_format not in export_formats:
+        raise monitored_model_bad_export_format_exception(export_formats)
+
+    query = predictions_query(id, from_date, to_date)
+    schema, input_columns = export_schema(await get_input_data_types(query))
+    extension = 'arrows' if export_format == 'arrow' else 'parquet'
+
+    return StreamingResponse(export_predictions_stream(query, ExportWriter(export_format, schema), input_columns),
+                             media_type=export_media_types[export_format],
+                             headers={"Content-Disposition": f'attachment; filename="predictions_{id}.{extension}"',
+                                      "ETag": document_etag(id, version)})
+
+
+@monitored_model_router.post('/{id}/predictions/compact', response_model=dict, status_code=status.HTTP_200_OK)
+async def compact_monitored_model_predictions(id: PydanticObjectId) -> dict:
+    """
+    Compact predictions older than the retention of monitored model into hourly or daily rollups right away,
+    instead of waiting for the periodic compaction. Compacted predictions are deleted, so they are no longer
+    listed, exported or updated with actual values, but charts keep counting them. Responds with 409 Conflict
+    if the predictions are being compacted already.
+
+    Args:
+    - **id (str)**: Monitored model id
+
+    Returns:
+    - **dict**: Number of compacted predictions, number of updated rollups and the cutoff date.
+    """
+    monitored_model = await MonitoredModel.get(id)
+    if not monitored_model:
+        raise monitored_model_not_found_exception()
+    if monitored_model.retention_days is None:
+        raise monitored_model_has_no_retention_exception()
+
+    result = await compact_predictions(monitored_model.id, monitored_model.retention_days,
+                                       monitored_model.rollup_granularity)
+    if result is None:
+        raise monitored_model_compaction_in_progress_exception()
+    predictions_compacted.inc(amount=result['compacted'])
+    return result
+
+
+@monitored_model_router.put('/{id}/predictions/actuals', response_model=BulkActualsResult,
+                            status_code=status.HTTP_200_OK)
+async def monitored_model_set_actual_prediction_values(id: PydanticObjectId,
+                                                       actuals: List[ActualUpdate]) -> BulkActualsResult:
+    """
+    Set or delete actual values of many predictions with one bulk write. Items are applied in order,
+    so if a prediction is given more than once, the last actual value is kept. Items whose prediction
+    does not exist in the monitored model are reported and do not abort the rest.
+
+    Args:
+    - **id (str)**: Monitored model id
+    - **actuals (List[ActualUpdate])**: Prediction ids with actual values, None to delete the actual value.
+
+    Returns:
+    - **BulkActualsResult**: Numbers of updated and not found predictions and the result of every item.
+    """
+    prediction_ids = list({actual_update.prediction_id for actual_update in actuals})
+    cursor = PredictionRecord.get_motor_collection().find(
+        {"_id": {"$in": prediction_ids}, "monitored_model_id": id},
+        {"_id": 1, "prediction": 1, "actual": 1}
+    )
+    records = {record["_id"]: record async for record in cursor}
+    if not records and not await monitored_model_exists(id):
+        raise monitored_model_not_found_exception()
+
+    operations = []
+    changes = []
+    results = []
+    for actual_update in actuals:
+        record = records.get(actual_update.prediction_id)
+        if record is None:
+            results.append(ActualUpdateResult(prediction_id=actual_update.prediction_id, status='not_found'))
+            continue
+
+        changes.append((record["prediction"], record.get("actual"), actual_update.actual))
+        record["actual"] = actual_update.actual
+        operations.append(UpdateOne({"_id": actual_update.prediction_id, "monitored_model_id": id},
+                                    {"$set": {"actual": actual_update.actual}}))
+        results.append(ActualUpdateResult(prediction_id=actual_update.prediction_id, status='updated'))
+
+    if operations:
+        await PredictionRecord.get_motor_collection().bulk_write(operations, ordered=True)
+        await apply_actual_changes(id, changes)
+
+    return BulkActualsResult(updated=len(operations), not_found=len(results) - len(operations), results=results)
+
+
+@monitored_model_router.put('/{id}/predictions/{prediction_id}', response_model=PredictionData, status_code=status.HTTP_200_OK)
+async def monitored_model_set_actual_prediction_value(id: PydanticObjectId, prediction_id: PydanticObjectId, updated_prediction: UpdatePredictionData) -> PredictionData:
+    """
+    Set actual prediction value.
+
+    Args:
+    - **id (str)**: Monitored model id
+    - **prediction_id (str)**: Prediction id.
+
+    Returns:
+    - **PredictionData**: Updated prediction.
+    """
+
+    return await update_prediction_actual(id, prediction_id, updated_prediction.actual)
 
 
 @monitored_model_router.delete('/{id}/predictions/{prediction_id}/actual', response_model=PredictionData, status_code=status.HTTP_200_OK)
@@ -422,19 +784,147 @@ async def monitored_model_delete_prediction_actual(id: PydanticObjectId, predict
     - **PredictionData**: Updated prediction.
     """
 
-    monitored_model = await MonitoredModel.get(id)
+    return await update_prediction_actual(id, prediction_id, None)
 
-    if not monitored_model:
+
+@monitored_model_router.get('/{id}/metrics/regression', response_model=dict, status_code=status.HTTP_200_OK)
+async def get_monitored_model_regression_metrics(id: PydanticObjectId,
+                                                 version: int = Depends(monitored_model_version)) -> dict:
+    """
+    Get regression metrics of predictions with actual value. Metrics are read from accumulators updated
+    whenever an actual value changes, so predictions are not read. medae is estimated from a quantile sketch
+    with 1% relative accuracy.
+
+    Args:
+    - **id (str)**: Monitored model id
+
+    Returns:
+    - **dict**: Number of predictions with actual value and r2, mse, rmse, mae, msle, rmsle, medae and smape.
+    """
+    monitored_model = await get_metrics_state(id, 'regression_metrics_state')
+    return compute_regression_metrics(monitored_model.regression_metrics_state)
+
+
+@monitored_model_router.get('/{id}/metrics/classification', response_model=dict, status_code=status.HTTP_200_OK)
+async def get_monitored_model_classification_metrics(id: PydanticObjectId,
+                                                     version: int = Depends(monitored_model_version)) -> dict:
+    """
+    Get classification metrics and confusion matrix of predictions with actual value. Both are derived from
+    confusion matrix counts updated whenever an actual value changes, so predictions are not read.
+    Only predictions and actual values which are integral numbers, strings or booleans are counted.
+
+    Args:
+    - **id (str)**: Monitored model id
+
+    Returns:
+    - **dict**: Number of predictions with actual value, accuracy, macro averaged precision, recall and f1score,
+      mmc (Matthews correlation coefficient), class labels and confusion matrix with actual labels as rows.
+    """
+    monitored_model = await get_metrics_state(id, 'classification_metrics_state')
+    labels, matrix = confusion_matrix(monitored_model.classification_metrics_state)
+    return {
+        **compute_classification_metrics(monitored_model.classification_metrics_state),
+        'labels': labels,
+        'confusion_matrix': matrix
+    }
+
+
+@monitored_model_router.post('/{id}/drift/reference', response_model=DriftReference,
+                             status_code=status.HTTP_201_CREATED)
+async def build_monitored_model_drift_reference(id: PydanticObjectId,
+                                                reference_request: DriftReferenceRequest) -> DriftReference:
+    """
+    Build reference distribution of input data for drift detection, from the first predictions of the monitored
+    model or from a logged dataset. Drift history is rebuilt from all predictions which are not part of the
+    reference. <br>
+    Without explicitly built reference, the reference is built from the first DRIFT_REFERENCE_SIZE predictions
+    as soon as the monitored model has them.
+
+    Args:
+    - **id (str)**: Monitored model id
+    - **reference_request (DriftReferenceRequest)**: Reference source, size and drift window size.
+
+    Returns:
+    - **DriftReference**: Built reference.
+    """
+    if not await monitored_model_exists(id):
         raise monitored_model_not_found_exception()
 
-    prediction = next((prediction for prediction in monitored_model.predictions_data if prediction.id == prediction_id), None)
-    if not prediction:
-        monitored_model_prediction_not_found_exception()
+    size = reference_request.size or settings.DRIFT_REFERENCE_SIZE
+    window_size = reference_request.window_size or settings.DRIFT_WINDOW_SIZE
 
-    prediction.actual = None
-    await monitored_model.save()
+    if reference_request.source == 'dataset':
+        if reference_request.dataset_id is None:
+            raise monitored_model_drift_reference_dataset_not_given_exception()
+        dataset = await Dataset.get(reference_request.dataset_id)
+        if not dataset:
+            raise dataset_not_found_exception()
+        try:
+            data = await asyncio.to_thread(pd.read_csv, dataset.path_to_dataset, nrows=size)
+        except Exception as e:
+            raise monitored_model_drift_reference_dataset_exception(str(e))
+        samples = data.astype(object).where(data.notna(), None).to_dict('records')
+        history_start = 0
+    else:
+        cursor = PredictionRecord.get_motor_collection().find({"monitored_model_id": id}, {"_id": 0, "input_data": 1}) \
+            .sort([("prediction_date", 1), ("_id", 1)]).limit(size)
+        samples = [record["input_data"] async for record in cursor]
+        history_start = len(samples)
+
+    if not samples:
+        raise monitored_model_drift_reference_no_data_exception()
+
+    reference = DriftReference(source=reference_request.source, dataset_id=reference_request.dataset_id,
+                               size=len(samples), window_size=window_size,
+                               columns=build_references(samples, settings.DRIFT_BINS))
+    await MonitoredModel.get_motor_collection().update_one(
+        {"_id": id}, {"$set": {"drift_reference": reference.dict(), "drift_window": DriftWindow().dict()}}
+    )
+    await DriftResult.find(DriftResult.monitored_model_id == id).delete()
+    await replay_drift_history(id, reference, history_start)
+    await bump_monitored_model_version(id)
 
-    return prediction
+    return reference
+
+
+@monitored_model_router.get('/{id}/drift', response_model=List[DriftResult], status_code=status.HTTP_200_OK)
+async def get_monitored_model_drift(id: PydanticObjectId,
+                                    from_date: Optional[datetime] = Query(default=None, alias="from"),
+                                    to_date: Optional[datetime] = Query(default=None, alias="to"),
+                                    version: int = Depends(monitored_model_version)) \
+        -> List[DriftResult]:
+    """
+    Get drift statistics of closed drift windows ordered by window end.
+
+    Args:
+    - **id (str)**: Monitored model id
+    - **from (Optional[datetime])**: Only windows ending at or after this date.
+    - **to (Optional[datetime])**: Only windows ending before this date.
+
+    Returns:
+    - **List[DriftResult]**: psi, ks, chi2, chi2_dof and drifted per column of every window.
+    """
+    return await get_drift_results(id, from_date, to_date)
+
+
+@monitored_model_router.get('/{id}/column-schema', response_model=Dict[str, dict], status_code=status.HTTP_200_OK)
+async def get_monitored_model_column_schema(id: PydanticObjectId,
+                                            version: int = Depends(monitored_model_version)) -> Dict[str, dict]:
+    """
+    Get column schema of monitored model predictions inferred as predictions are stored.
+
+    Args:
+    - **id (str)**: Monitored model id
+
+    Returns:
+    - **Dict[str, dict]**: Kind ('numeric', 'string', 'categorical' or 'mixed') and nullable flag of every column.
+    """
+    monitored_model = await MonitoredModel.get(id)
+
+    if not monitored_model:
+        raise monitored_model_not_found_exception()
+
+    return describe_column_schema(monitored_model.column_schema)
 
 
 @monitored_model_router.post('/{id}/charts', response_model=MonitoredModelInteractiveChart,
@@ -456,32 +946,34 @@ async def add_chart_to_monitored_model(id: PydanticObjectId, chart: MonitoredMod
     if not monitored_model:
         raise monitored_model_not_found_exception()
 
-    if not monitored_model.predictions_data:
+    if monitored_model.column_schema.rows == 0:
         raise monitored_model_has_no_predictions_data_exception()
 
-    data = pd.DataFrame([{**prediction.input_data, 'prediction': prediction.prediction, 'actual': prediction.actual} for
-                         prediction in monitored_model.predictions_data])
-    data['actual'] = pd.to_numeric(data['actual'], errors='coerce')
-
-
     if (chart.chart_type, chart.x_axis_column, chart.y_axis_columns) in monitored_model.interactive_charts_existed:
         raise monitored_model_chart_existing_pair_of_columns_of_chart_type_exception(chart.chart_type,
                                                                                      chart.x_axis_column,
                                                                                      chart.y_axis_columns)
 
-    validated_chart = validate_chart(chart, data)
-    if validated_chart:
-        chart.monitored_model_id = monitored_model.id
-        monitored_model.interactive_charts.append(chart)
-        monitored_model.interactive_charts_existed.append((chart.chart_type, chart.x_axis_column, chart.y_axis_columns))
+    validate_chart(chart, describe_column_schema(monitored_model.column_schema))
+    chart.monitored_model_id = monitored_model.id
 
-    await monitored_model.save()
+    # push only the new chart, the pair check in the filter keeps concurrent additions of the same chart out
+    chart_columns = (chart.chart_type, chart.x_axis_column, chart.y_axis_columns)
+    update_result = await MonitoredModel.find_one({"_id": monitored_model.id,
+                                                   "interactive_charts_existed": {"$ne": chart_columns}}).update(
+        {"$push": {"interactive_charts": chart, "interactive_charts_existed": chart_columns}, "$inc": {"version": 1}}
+    )
+    if update_result.matched_count == 0:
+        raise monitored_model_chart_existing_pair_of_columns_of_chart_type_exception(chart.chart_type,
+                                                                                     chart.x_axis_column,
+                                                                                     chart.y_axis_columns)
 
     return chart
 
 
 @monitored_model_router.get('/{id}/charts/{chart_id}', response_model=MonitoredModelInteractiveChart)
-async def get_chart_from_monitored_model(id: PydanticObjectId, chart_id: PydanticObjectId) \
+async def get_chart_from_monitored_model(id: PydanticObjectId, chart_id: PydanticObjectId,
+                                         version: int = Depends(monitored_model_version)) \
         -> MonitoredModelInteractiveChart:
     """
     Get chart from monitored model.
@@ -505,6 +997,79 @@ async def get_chart_from_monitored_model(id: PydanticObjectId, chart_id: Pydanti
     return chart
 
 
+@monitored_model_router.get('/{id}/charts/{chart_id}/data', response_model=dict, status_code=status.HTTP_200_OK)
+async def get_chart_data_from_monitored_model(id: PydanticObjectId, chart_id: PydanticObjectId,
+                                              width: Optional[int] = Query(default=None, ge=3),
+                                              downsampling: str = 'lttb', sampling: str = 'uniform',
+                                              sample_size: Optional[int] = Query(default=None, ge=1),
+                                              strata: int = Query(default=10, ge=1, le=1000),
+                                              version: int = Depends(monitored_model_version)) -> dict:
+    """
+    Get data of monitored model chart aggregated on the server, so only the aggregates are sent instead of
+    all predictions data. <br>
+    **timeseries**: points [prediction date, value] of every y axis column, downsampled to at most width points
+    per series with Largest-Triangle-Three-Buckets ('lttb') or minimum and maximum per bucket ('minmax'). <br>
+    **histogram**: bins of x axis column. <br>
+    **scatter**: points [x, y] of every y axis column from a random sample of predictions. <br>
+    **scatter_with_histograms**: points [x, y] of the first y axis column from a random sample of predictions and
+    bins of x axis column and of the first y axis column computed from all predictions. <br>
+    **regression_metrics**: chart metrics read from the regression metrics accumulators. <br>
+    **classification_metrics**: chart metrics derived from the confusion matrix counts. <br>
+    **confusion_matrix**: class labels and confusion matrix with actual labels as rows. <br>
+    **data_drift**: drift statistics of x axis column in every closed drift window. <br>
+    Predictions compacted after the retention of the monitored model are read from rollups: timeseries have
+    one point with the mean value per rollup bucket and histograms count compacted values by their quantile sketch.
+    Scatter samples are drawn from predictions which are not compacted. <br>
+    Chart data is cached per version of the monitored model, which changes with every write to the monitored model
+    or its predictions, so repeated requests are served without reading predictions. The version is read again
+    after the chart data is computed and the chart data is not cached if a write changed it meanwhile, since
+    the chart data may then hold part of the write. <br>
+    Samples are read with an index on the random sample key of predictions, so their cost does not grow with
+    the number of predictions. 'uniform' sampling draws the sample from all predictions, 'stratified' splits
+    the time between the first and the last prediction into strata of equal length and draws the same number
+    of predictions from every stratum, so quiet periods are not drowned out by busy ones.
+
+    Args:
+    - **id (str)**: Monitored model id
+    - **chart_id (str)**: Chart id.
+    - **width (Optional[int])**: Maximum number of points per timeseries series, usually the chart width in pixels.
+      All points if not given.
+    - **downsampling (str)**: Timeseries downsampling method, 'lttb' or 'minmax'.
+    - **sampling (str)**: Scatter sampling method, 'uniform' or 'stratified'.
+    - **sample_size (Optional[int])**: Number of sampled scatter points, SCATTER_SAMPLE_SIZE if not given and at most
+      SCATTER_SAMPLE_MAX_SIZE.
+    - **strata (int)**: Number of time strata of 'stratified' sampling.
+
+    Returns:
+    - **dict**: Chart data.
+    """
+    if downsampling not in ('lttb', 'minmax'):
+        raise monitored_model_bad_downsampling_method_exception(['lttb', 'minmax'])
+    if sampling not in ('uniform', 'stratified'):
+        raise monitored_model_bad_sampling_method_exception(['uniform', 'stratified'])
+    sample_size = min(sample_size or settings.SCATTER_SAMPLE_SIZE, settings.SCATTER_SAMPLE_MAX_SIZE)
+
+    key = chart_data_cache.make_key(id, chart_id, version, width, downsampling, sampling, sample_size, strata)
+    chart_data = chart_data_cache.get(key)
+    if chart_data is not None:
+        return chart_data
+
+    monitored_model = await MonitoredModel.get(id)
+
+    if not monitored_model:
+        raise monitored_model_not_found_exception()
+
+    chart = next((chart for chart in monitored_model.interactive_charts if chart.id == chart_id), None)
+    if not chart:
+        raise monitored_model_chart_not_found_exception()
+
+    chart_data = await compute_chart_data(monitored_model, chart, width, downsampling, sampling, sample_size, strata)
+    current = await MonitoredModel.get_motor_collection().find_one({"_id": id}, {"version": 1})
+    if current and current.get("version", 0) == version:
+        chart_data_cache.put(key, chart_data)
+    return chart_data
+
+
 @monitored_model_router.put('/{id}/charts/{chart_id}', response_model=MonitoredModelInteractiveChart, status_code=status.HTTP_200_OK)
 async def update_chart_from_monitored_model(id: PydanticObjectId, chart_id: PydanticObjectId, updated_chart: UpdateMonitoredModelInteractiveChart) -> MonitoredModelInteractiveChart:
     """
@@ -527,15 +1092,11 @@ async def update_chart_from_monitored_model(id: PydanticObjectId, chart_id: Pyda
     if not chart:
         raise monitored_model_chart_not_found_exception()
 
-    data = pd.DataFrame([{**prediction.input_data, 'prediction': prediction.prediction, 'actual': prediction.actual} for
-                         prediction in monitored_model.predictions_data])
-    data['actual'] = pd.to_numeric(data['actual'], errors='coerce')
-
     if updated_chart.chart_type is None:
         updated_chart.chart_type = chart.chart_type
 
     if chart.chart_type == updated_chart.chart_type:
-        validated_chart = validate_chart(updated_chart, data)
+        validated_chart = validate_chart(updated_chart, describe_column_schema(monitored_model.column_schema))
         updated_chart.monitored_model_id = monitored_model.id
         if validated_chart:
             monitored_model.interactive_charts.append(updated_chart)
@@ -545,7 +1106,13 @@ async def update_chart_from_monitored_model(id: PydanticObjectId, chart_id: Pyda
     else:
         raise monitored_model_chart_changing_columns_exception()
 
-    await monitored_model.save()
+    await monitored_model.update({
+        "$set": {
+            MonitoredModel.interactive_charts: monitored_model.interactive_charts,
+            MonitoredModel.interactive_charts_existed: monitored_model.interactive_charts_existed
+        },
+        "$inc": {"version": 1}
+    })
 
     return updated_chart
 
@@ -571,9 +1138,13 @@ async def delete_chart_from_monitored_model(id: PydanticObjectId, chart_id: Pyda
     if not chart:
         raise monitored_model_chart_not_found_exception()
 
-    monitored_model.interactive_charts_existed.remove((chart.chart_type, chart.x_axis_column, chart.y_axis_columns))
-    monitored_model.interactive_charts.remove(chart)
-    await monitored_model.save()
+    await MonitoredModel.find_one(MonitoredModel.id == monitored_model.id).update({
+        "$pull": {
+            "interactive_charts": {"id": chart.id},
+            "interactive_charts_existed": (chart.chart_type, chart.x_axis_column, chart.y_axis_columns)
+        },
+        "$inc": {"version": 1}
+    })
 
     return chart
 
@@ -666,18 +1237,24 @@ async def load_and_decode_pkl(monitored_model: MonitoredModel) -> object:
     Returns:
         decoded_model: Decoded model.
     """
+    model_id = str(monitored_model.id)
     try:
-        if monitored_model.iteration.encoded_ml_model:
-            # Load and deserialize the pickled model from ml_model
-            model_data = base64.b64decode(monitored_model.iteration.encoded_ml_model.encode("utf-8"))
+        with predict_phase_duration.time(model_id, 'decode'):
+            if monitored_model.iteration.ml_model_hash:
+                # Read the pickled model from the artifact store
+                model_data = await asyncio.to_thread(artifact_store.get, monitored_model.iteration.ml_model_hash)
+            elif monitored_model.iteration.encoded_ml_model:
+                # Load and deserialize the pickled model from ml_model
+                model_data = base64.b64decode(monitored_model.iteration.encoded_ml_model.encode("utf-8"))
+            else:
+                raise monitored_model_no_ml_model_to_decode_exception()
 
-            # instead pickle loads use custom unpickler
+        # instead pickle loads use custom unpickler
+        with predict_phase_duration.time(model_id, 'unpickle'):
             decoded_model = CustomUnpickler(io.BytesIO(model_data)).load()
 
-            # Now, loaded_model contains your decoded model
-            return decoded_model
-        else:
-            raise monitored_model_no_ml_model_to_decode_exception()
+        # Now, loaded_model contains your decoded model
+        return decoded_model
 
     except Exception as e:
         # Handle any exceptions or errors that may occur during decoding
@@ -686,7 +1263,8 @@ async def load_and_decode_pkl(monitored_model: MonitoredModel) -> object:
 
 async def load_ml_model(monitored_model: MonitoredModel) -> object:
     """
-    Load ml model from path using pickle.
+    Load ml model from path using pickle. Decoded models are kept in the model cache, so the ml model
+    is decoded only once per monitored model, iteration and ml model hash.
 
     Args:
         monitored_model: Monitored model to load ml model from path.
@@ -694,40 +1272,1280 @@ async def load_ml_model(monitored_model: MonitoredModel) -> object:
     Returns:
         Loaded ml model instance.
     """
-    ml_model = await load_and_decode_pkl(monitored_model)
+    ml_model_hash = get_ml_model_hash(monitored_model.iteration)
+    if ml_model_hash is None:
+        return await load_and_decode_pkl(monitored_model)
+
+    cache_key = model_cache.make_key(monitored_model.id, monitored_model.iteration.id, ml_model_hash)
+    ml_model = model_cache.get(cache_key)
+    if ml_model is None:
+        ml_model = await load_and_decode_pkl(monitored_model)
+        model_cache.put(cache_key, ml_model)
 
     return ml_model
 
 
-async def get_iteration_from_monitored_model(monitored_model: MonitoredModel) -> Iteration:
+def get_ml_model_hash(iteration: Iteration) -> Optional[str]:
     """
-    Get iteration from monitored model.
+    Util function for getting hash of iteration ml model, also for iterations whose ml model is not moved
+    to the artifact store yet.
 
     Args:
-        monitored_model: Monitored model to get iteration from.
+        iteration: Iteration.
 
     Returns:
-        Iteration.
+        SHA-256 of the pickled ml model or None if iteration has no ml model.
     """
-    project = await Project.get(monitored_model.iteration.project_id)
-    if not project:
-        raise project_not_found_exception()
+    if iteration.ml_model_hash:
+        return iteration.ml_model_hash
+    if iteration.encoded_ml_model:
+        return hashlib.sha256(base64.b64decode(iteration.encoded_ml_model.encode("utf-8"))).hexdigest()
+    return None
 
-    experiment = next((exp for exp in project.experiments if exp.id == monitored_model.iteration.experiment_id),
-                      None)
-    if not experiment:
-        raise experiment_not_found_exception()
 
-    iteration = next((iter for iter in experiment.iterations if iter.id == monitored_model.iteration.id), None)
-    if not iteration:
-        raise iteration_not_found_exception()
+async def store_predictions_data(monitored_model_id: PydanticObjectId,
+                                 predictions_data: List[PredictionData]) -> None:
+    """
+    Util function for storing predictions data of monitored model in the prediction_data collection.
+    Predictions which already have actual value are added to the regression metrics accumulators and confusion
+    matrix counts, input data is added to the drift window and the column schema. The column schema update
+    comes last, as it bumps the version of the monitored model after everything else is written.
 
-    return iteration
+    Args:
+        monitored_model_id: Monitored model id.
+        predictions_data: Predictions data to store.
+    """
+    if not predictions_data:
+        return
 
+    with predict_phase_duration.time(str(monitored_model_id), 'persist'):
+        await PredictionRecord.insert_many([PredictionRecord.from_prediction_data(monitored_model_id, prediction_data)
+                                            for prediction_data in predictions_data])
+        await apply_actual_changes(monitored_model_id, [(prediction_data.prediction, None, prediction_data.actual)
+                                                        for prediction_data in predictions_data
+                                                        if prediction_data.actual is not None])
+        if settings.DRIFT_DETECTION:
+            await update_drift_window(monitored_model_id, predictions_data)
+        await update_column_schema(monitored_model_id, predictions_data)
 
-def validate_chart(chart: MonitoredModelInteractiveChart, data: pd.DataFrame) -> MonitoredModelInteractiveChart:
-    if chart.chart_type == 'histogram':
-        if not pd.api.types.is_numeric_dtype(data[chart.x_axis_column]):
+
+async def attach_predictions_data(monitored_models: List[MonitoredModel]) -> List[MonitoredModel]:
+    """
+    Util function for attaching predictions data from the prediction_data collection to monitored models
+    with one query.
+
+    Args:
+        monitored_models: Monitored models to attach predictions data to.
+
+    Returns:
+        Monitored models with predictions data ordered by prediction date.
+    """
+    if not monitored_models:
+        return monitored_models
+
+    predictions_data = {monitored_model.id: [] for monitored_model in monitored_models}
+    records = await PredictionRecord.find(In(PredictionRecord.monitored_model_id, list(predictions_data))) \
+        .sort([("prediction_date", 1), ("_id", 1)]).to_list()
+    for record in records:
+        predictions_data[record.monitored_model_id].append(record.to_prediction_data())
+
+    for monitored_model in monitored_models:
+        monitored_model.predictions_data = predictions_data[monitored_model.id]
+
+    return monitored_models
+
+
+async def attach_predictions_counts(summaries: List[MonitoredModelSummary]) -> List[MonitoredModelSummary]:
+    """
+    Util function for attaching numbers of predictions and the date of the latest prediction to monitored models
+    summaries with one aggregation of predictions and one of rollups of compacted predictions.
+
+    Args:
+        summaries: Monitored models summaries.
+
+    Returns:
+        Monitored models summaries with prediction counts.
+    """
+    if not summaries:
+        return summaries
+
+    counts = await PredictionRecord.get_motor_collection().aggregate([
+        {"$match": {"monitored_model_id": {"$in": [summary.id for summary in summaries]}}},
+        {"$group": {
+            "_id": "$monitored_model_id",
+            "predictions_count": {"$sum": 1},
+            "actuals_count": {"$sum": {"$cond": [{"$eq": [{"$ifNull": ["$actual", None]}, None]}, 0, 1]}},
+            "last_prediction_date": {"$max": "$prediction_date"}
+        }}
+    ]).to_list(length=None)
+    counts = {count["_id"]: count for count in counts}
+    rollup_counts = await PredictionRollup.get_motor_collection().aggregate([
+        {"$match": {"monitored_model_id": {"$in": [summary.id for summary in summaries]}}},
+        {"$group": {
+            "_id": "$monitored_model_id",
+            "predictions_count": {"$sum": "$predictions_count"},
+            "actuals_count": {"$sum": "$actuals_count"}
+        }}
+    ]).to_list(length=None)
+    rollup_counts = {count["_id"]: count for count in rollup_counts}
+
+    for summary in summaries:
+        count = counts.get(summary.id)
+        if count:
+            summary.predictions_count = count["predictions_count"]
+            summary.actuals_count = count["actuals_count"]
+            summary.last_prediction_date = count["last_prediction_date"]
+        rollup_count = rollup_counts.get(summary.id)
+        if rollup_count:
+            summary.predictions_count += rollup_count["predictions_count"]
+            summary.actuals_count += rollup_count["actuals_count"]
+
+    return summaries
+
+
+def predictions_query(monitored_model_id: PydanticObjectId, from_date: Optional[datetime] = None,
+                      to_date: Optional[datetime] = None) -> dict:
+    """
+    Util function for building query of monitored model predictions made in given date range.
+
+    Args:
+        monitored_model_id: Monitored model id.
+        from_date: Only predictions made at or after this date.
+        to_date: Only predictions made before this date.
+
+    Returns:
+        Query of the prediction_data collection.
+    """
+    query = {"monitored_model_id": monitored_model_id}
+    date_range = {}
+    if from_date is not None:
+        date_range["$gte"] = from_date
+    if to_date is not None:
+        date_range["$lt"] = to_date
+    if date_range:
+        query["prediction_date"] = date_range
+    return query
+
+
+async def get_input_data_types(query: dict) -> dict:
+    """
+    Util function for collecting types of input data values of queried predictions, reading only input data.
+
+    Args:
+        query: Query of the prediction_data collection.
+
+    Returns:
+        Dictionary of input data column and set of type families of its values.
+    """
+    input_types = {}
+    async for record in PredictionRecord.get_motor_collection().find(query, {"input_data": 1}):
+        for column, value in record.get("input_data", {}).items():
+            input_types.setdefault(column, set()).add(value_type(value))
+    return input_types
+
+
+async def export_predictions_stream(query: dict, writer: ExportWriter,
+                                    input_columns: List[Tuple[str, str]]) -> AsyncIterator[bytes]:
+    """
+    Util function for encoding queried predictions in record batches of PREDICTIONS_EXPORT_BATCH_SIZE rows.
+    Batches are encoded outside the event loop.
+
+    Args:
+        query: Query of the prediction_data collection.
+        writer: Export writer.
+        input_columns: Input data columns of the writer schema.
+
+    Returns:
+        Async iterator of encoded bytes.
+    """
+    def encode(records: List[dict]) -> bytes:
+        return writer.write(records_to_batch(records, writer.schema, input_columns))
+
+    batch_size = settings.PREDICTIONS_EXPORT_BATCH_SIZE
+    cursor = PredictionRecord.get_motor_collection().find(query) \
+        .sort([("prediction_date", 1), ("_id", 1)]).batch_size(batch_size)
+    records = []
+    async for record in cursor:
+        records.append(record)
+        if len(records) >= batch_size:
+            yield await asyncio.to_thread(encode, records)
+            records = []
+
+    if records:
+        yield await asyncio.to_thread(encode, records)
+    yield writer.close()
+
+
+async def monitored_model_exists(monitored_model_id: PydanticObjectId) -> bool:
+    """
+    Util function for checking if monitored model exists without reading it.
+
+    Args:
+        monitored_model_id: Monitored model id.
+
+    Returns:
+        True if monitored model exists.
+    """
+    return await MonitoredModel.get_motor_collection().count_documents({"_id": monitored_model_id}, limit=1) > 0
+
+
+async def bump_monitored_model_version(monitored_model_id: PydanticObjectId) -> None:
+    """
+    Util function for bumping version of monitored model after a write which does not update the monitored model
+    document itself, so ETags and cached chart data of the previous version are no longer used.
+
+    Args:
+        monitored_model_id: Monitored model id.
+    """
+    await MonitoredModel.get_motor_collection().update_one({"_id": monitored_model_id}, {"$inc": {"version": 1}})
+
+
+async def update_prediction_actual(monitored_model_id: PydanticObjectId, prediction_id: PydanticObjectId,
+                                   actual: Optional[Union[float, int]]) -> PredictionData:
+    """
+    Util function for setting or deleting actual value of prediction. The prediction is updated atomically and
+    the previous actual value is used to update the regression metrics accumulators and confusion matrix counts.
+
+    Args:
+        monitored_model_id: Monitored model id.
+        prediction_id: Prediction id.
+        actual: New actual value, None to delete it.
+
+    Returns:
+        Updated prediction.
+    """
+    record = await PredictionRecord.get_motor_collection().find_one_and_update(
+        {"_id": prediction_id, "monitored_model_id": monitored_model_id},
+        {"$set": {"actual": actual}},
+        return_document=ReturnDocument.BEFORE
+    )
+    if not record:
+        if not await monitored_model_exists(monitored_model_id):
+            raise monitored_model_not_found_exception()
+        raise monitored_model_prediction_not_found_exception()
+
+    await apply_actual_changes(monitored_model_id, [(record["prediction"], record.get("actual"), actual)])
+
+    prediction = PredictionRecord.parse_obj(record).to_prediction_data()
+    prediction.actual = actual
+    return prediction
+
+
+async def apply_actual_changes(monitored_model_id: PydanticObjectId,
+                               changes: List[Tuple[Union[float, int], Optional[Union[float, int]],
+                                                   Optional[Union[float, int]]]]) -> None:
+    """
+    Util function for updating regression metrics accumulators and confusion matrix counts of monitored model
+    and bumping its version with one atomic increment.
+
+    Args:
+        monitored_model_id: Monitored model id.
+        changes: Tuples of prediction, previous actual value and new actual value, None if there is no actual.
+    """
+    if not changes:
+        return
+
+    actual_shift = await get_actual_shift(monitored_model_id, changes)
+    increments = {
+        **{f"regression_metrics_state.{field}": value
+           for field, value in regression_state_increments(changes, actual_shift).items()},
+        **{f"classification_metrics_state.counts.{field}": value
+           for field, value in classification_state_increments(changes).items()},
+        "version": 1
+    }
+    await MonitoredModel.get_motor_collection().update_one({"_id": monitored_model_id}, {"$inc": increments})
+
+
+async def get_actual_shift(monitored_model_id: PydanticObjectId,
+                           changes: List[Tuple[Union[float, int], Optional[Union[float, int]],
+                                               Optional[Union[float, int]]]]) -> Optional[float]:
+    """
+    Util function for reading actual shift of regression metrics accumulators of monitored model. Accumulators
+    without predictions with actual value get the first new actual value of changes as actual shift, set only
+    if no concurrent update set another one first.
+
+    Args:
+        monitored_model_id: Monitored model id.
+        changes: Tuples of prediction, previous actual value and new actual value, None if there is no actual.
+
+    Returns:
+        Actual shift or None if actual values are summed unshifted.
+    """
+    monitored_models = MonitoredModel.get_motor_collection()
+    projection = {"regression_metrics_state.actual_shift": 1, "regression_metrics_state.count": 1}
+    monitored_model = await monitored_models.find_one({"_id": monitored_model_id}, projection)
+    state = (monitored_model or {}).get("regression_metrics_state") or {}
+    actual_shift = regression_actual_shift(changes)
+    if state.get("actual_shift") is not None or state.get("count") != 0 or actual_shift is None:
+        return state.get("actual_shift")
+
+    result = await monitored_models.update_one({"_id": monitored_model_id,
+                                                "regression_metrics_state.actual_shift": None,
+                                                "regression_metrics_state.count": 0},
+                                               {"$set": {"regression_metrics_state.actual_shift": actual_shift}})
+    if result.modified_count == 0:
+        monitored_model = await monitored_models.find_one({"_id": monitored_model_id}, projection)
+        return ((monitored_model or {}).get("regression_metrics_state") or {}).get("actual_shift")
+    return actual_shift
+
+
+async def get_metrics_state(monitored_model_id: PydanticObjectId, field: str) -> MonitoredModel:
+    """
+    Util function for reading one metrics state of monitored model without the rest of the model.
+
+    Args:
+        monitored_model_id: Monitored model id.
+        field: Metrics state field, 'regression_metrics_state' or 'classification_metrics_state'.
+
+    Returns:
+        Monitored model with only the metrics state and required fields set.
+    """
+    monitored_model = await MonitoredModel.get_motor_collection().find_one({"_id": monitored_model_id},
+                                                                            {"model_name": 1, field: 1})
+    if not monitored_model:
+        raise monitored_model_not_found_exception()
+
+    return MonitoredModel.parse_obj(monitored_model)
+
+
+async def update_column_schema(monitored_model_id: PydanticObjectId,
+                               predictions_data: List[PredictionData]) -> None:
+    """
+    Util function for adding input data of new predictions to the column schema of monitored model
+    and bumping its version with one atomic update.
+
+    Args:
+        monitored_model_id: Monitored model id.
+        predictions_data: New predictions data.
+    """
+    update = column_schema_update([prediction_data.input_data for prediction_data in predictions_data])
+    if update:
+        update["$inc"]["version"] = 1
+        await MonitoredModel.get_motor_collection().update_one({"_id": monitored_model_id}, update)
+
+
+async def update_drift_window(monitored_model_id: PydanticObjectId, predictions_data: List[PredictionData]) -> None:
+    """
+    Util function for adding input data of new predictions to the tumbling drift windows of monitored model.
+    Predictions are split at window boundaries, the same way as drift history is replayed, and the open window
+    is replaced with one update, guarded by the window read before, so concurrent updates are retried instead
+    of lost. If the monitored model has no drift reference yet, the reference is built once the monitored model
+    has enough predictions.
+
+    Args:
+        monitored_model_id: Monitored model id.
+        predictions_data: New predictions data.
+    """
+    records = sorted(({"input_data": prediction_data.input_data, "prediction_date": prediction_data.prediction_date}
+                      for prediction_data in predictions_data), key=lambda record: record["prediction_date"])
+    monitored_models = MonitoredModel.get_motor_collection()
+    while True:
+        monitored_model = await monitored_models.find_one({"_id": monitored_model_id},
+                                                          {"drift_reference": 1, "drift_window": 1})
+        if not monitored_model:
+            return
+
+        if monitored_model.get("drift_reference") is None:
+            await build_drift_reference_if_ready(monitored_model_id)
+            return
+
+        reference = DriftReference.parse_obj(monitored_model["drift_reference"])
+        window = DriftWindow.parse_obj(monitored_model.get("drift_window") or {})
+        closed, open_window = add_to_drift_window(reference, window, records)
+        result = await monitored_models.update_one(
+            {"_id": monitored_model_id, "drift_window.count": window.count, "drift_window.start": window.start,
+             "drift_window.end": window.end},
+            {"$set": {"drift_window": open_window.dict()}}
+        )
+        if result.matched_count:
+            break
+
+    if closed:
+        await DriftResult.insert_many([drift_result(monitored_model_id, reference, closed_window)
+                                       for closed_window in closed])
+
+
+async def build_drift_reference_if_ready(monitored_model_id: PydanticObjectId) -> None:
+    """
+    Util function for building drift reference from the first DRIFT_REFERENCE_SIZE predictions of monitored model
+    if it has that many predictions and no reference yet.
+
+    Args:
+        monitored_model_id: Monitored model id.
+    """
+    size = settings.DRIFT_REFERENCE_SIZE
+    predictions = PredictionRecord.get_motor_collection()
+    if await predictions.count_documents({"monitored_model_id": monitored_model_id}, limit=size) < size:
+        return
+
+    cursor = predictions.find({"monitored_model_id": monitored_model_id}, {"_id": 0, "input_data": 1}) \
+        .sort([("prediction_date", 1), ("_id", 1)]).limit(size)
+    samples = [record["input_data"] async for record in cursor]
+    reference = DriftReference(source='predictions', size=len(samples), window_size=settings.DRIFT_WINDOW_SIZE,
+                               columns=build_references(samples, settings.DRIFT_BINS))
+
+    result = await MonitoredModel.get_motor_collection().update_one(
+        {"_id": monitored_model_id, "drift_reference": None},
+        {"$set": {"drift_reference": reference.dict(), "drift_window": DriftWindow().dict()}}
+    )
+    if result.modified_count:
+        await replay_drift_history(monitored_model_id, reference, size)
+
+
+async def replay_drift_history(monitored_model_id: PydanticObjectId, reference: DriftReference, skip: int) -> None:
+    """
+    Util function for splitting predictions following the reference into drift windows. Full windows are stored
+    as drift results, the rest of predictions becomes the open drift window.
+
+    Args:
+        monitored_model_id: Monitored model id.
+        reference: Drift reference.
+        skip: Number of first predictions which are part of the reference.
+    """
+    cursor = PredictionRecord.get_motor_collection().find(
+        {"monitored_model_id": monitored_model_id}, {"_id": 0, "input_data": 1, "prediction_date": 1}
+    ).sort([("prediction_date", 1), ("_id", 1)]).skip(skip)
+
+    results = []
+    window = DriftWindow()
+    records = []
+    async for record in cursor:
+        records.append(record)
+        if len(records) == reference.window_size:
+            closed, window = add_to_drift_window(reference, window, records)
+            results.extend(drift_result(monitored_model_id, reference, closed_window) for closed_window in closed)
+            records = []
+    if records:
+        _, window = add_to_drift_window(reference, window, records)
+
+    if results:
+        await DriftResult.insert_many(results)
+    if window.count:
+        await MonitoredModel.get_motor_collection().update_one(
+            {"_id": monitored_model_id}, {"$set": {"drift_window": window.dict()}}
+        )
+
+
+def drift_result(monitored_model_id: PydanticObjectId, reference: DriftReference, window: DriftWindow) -> DriftResult:
+    """
+    Util function for comparing closed drift window with drift reference.
+
+    Args:
+        monitored_model_id: Monitored model id.
+        reference: Drift reference.
+        window: Closed drift window.
+
+    Returns:
+        Drift result of the window.
+    """
+    return DriftResult(
+        monitored_model_id=monitored_model_id,
+        window_start=window.start,
+        window_end=window.end,
+        predictions_count=window.count,
+        columns={column: drift_statistics(column_reference, window.counts.get(column, {}),
+                                          settings.DRIFT_PSI_THRESHOLD)
+                 for column, column_reference in reference.columns.items()}
+    )
+
+
+async def get_drift_results(monitored_model_id: PydanticObjectId, from_date: Optional[datetime] = None,
+                            to_date: Optional[datetime] = None) -> List[DriftResult]:
+    """
+    Util function for reading drift results of monitored model ordered by window end, with column names unescaped.
+
+    Args:
+        monitored_model_id: Monitored model id.
+        from_date: Only windows ending at or after this date.
+        to_date: Only windows ending before this date.
+
+    Returns:
+        Drift results.
+    """
+    query = {"monitored_model_id": monitored_model_id}
+    date_range = {}
+    if from_date is not None:
+        date_range["$gte"] = from_date
+    if to_date is not None:
+        date_range["$lt"] = to_date
+    if date_range:
+        query["window_end"] = date_range
+
+    results = await DriftResult.find(query).sort([("window_end", 1), ("_id", 1)]).to_list()
+    for result in results:
+        result.columns = {unescape_field_name(column): statistics for column, statistics in result.columns.items()}
+    return results
+
+
+async def compute_chart_data(monitored_model: MonitoredModel, chart: MonitoredModelInteractiveChart,
+                             width: Optional[int], downsampling: str, sampling: str, sample_size: int,
+                             strata: int) -> dict:
+    """
+    Util function for computing data of monitored model chart, see get_chart_data_from_monitored_model.
+
+    Args:
+        monitored_model: Monitored model.
+        chart: Chart of monitored model.
+        width: Maximum number of points per timeseries series, all points if None.
+        downsampling: Timeseries downsampling method, 'lttb' or 'minmax'.
+        sampling: Scatter sampling method, 'uniform' or 'stratified'.
+        sample_size: Number of sampled scatter points.
+        strata: Number of time strata of 'stratified' sampling.
+
+    Returns:
+        Chart data.
+    """
+    if chart.chart_type == 'timeseries':
+        dates, columns = await get_prediction_timeseries(monitored_model.id, chart.y_axis_columns)
+        count = len(dates)
+        rollup_dates, rollup_columns, compacted = await get_rollup_timeseries(monitored_model.id,
+                                                                              chart.y_axis_columns)
+        if compacted:
+            dates = np.concatenate([rollup_dates, dates])
+            order = np.argsort(dates, kind='stable')
+            dates = dates[order]
+            columns = {column: np.concatenate([rollup_columns[column], values])[order]
+                       for column, values in columns.items()}
+        series = {}
+        for column, values in columns.items():
+            points = downsample_series(dates, values, width, downsampling)
+            series[column] = [[pd.Timestamp(date, unit='ms').isoformat(), value] for date, value in points]
+        return {
+            'chart_type': chart.chart_type,
+            'count': count + compacted,
+            'series': series
+        }
+    elif chart.chart_type == 'histogram':
+        values = await get_prediction_column_values(monitored_model.id, chart.x_axis_column)
+        rollup = await get_column_rollup(monitored_model.id, chart.x_axis_column)
+        return {
+            'chart_type': chart.chart_type,
+            'column': chart.x_axis_column,
+            **histogram_bins(values, chart.bin_method, chart.bin_number, rollup)
+        }
+    elif chart.chart_type == 'scatter':
+        sample = await get_prediction_sample(monitored_model.id, [chart.x_axis_column, *chart.y_axis_columns],
+                                             sample_size, strata if sampling == 'stratified' else None)
+        return {
+            'chart_type': chart.chart_type,
+            'column': chart.x_axis_column,
+            'sampling': sampling,
+            'sample_size': len(sample[chart.x_axis_column]),
+            'series': {column: scatter_points(sample[chart.x_axis_column], sample[column])
+                       for column in chart.y_axis_columns}
+        }
+    elif chart.chart_type == 'scatter_with_histograms':
+        sample = await get_prediction_sample(monitored_model.id, [chart.x_axis_column, chart.y_axis_columns[0]],
+                                             sample_size, strata if sampling == 'stratified' else None)
+        x_values = await get_prediction_column_values(monitored_model.id, chart.x_axis_column)
+        y_values = await get_prediction_column_values(monitored_model.id, chart.y_axis_columns[0])
+        x_rollup = await get_column_rollup(monitored_model.id, chart.x_axis_column)
+        y_rollup = await get_column_rollup(monitored_model.id, chart.y_axis_columns[0])
+        return {
+            'chart_type': chart.chart_type,
+            'x': {'column': chart.x_axis_column,
+                  **histogram_bins(x_values, chart.bin_method, chart.bin_number, x_rollup)},
+            'y': {'column': chart.y_axis_columns[0],
+                  **histogram_bins(y_values, chart.bin_method, chart.bin_number, y_rollup)},
+            'sampling': sampling,
+            'sample_size': len(sample[chart.x_axis_column]),
+            'points': scatter_points(sample[chart.x_axis_column], sample[chart.y_axis_columns[0]])
+        }
+
+    elif chart.chart_type == 'data_drift':
+        metrics = chart.metrics or MonitoredModelInteractiveChart.Settings.metrics['drift']
+        results = await get_drift_results(monitored_model.id)
+        return {
+            'chart_type': chart.chart_type,
+            'column': chart.x_axis_column,
+            'windows': [{'window_start': result.window_start, 'window_end': result.window_end,
+                         'count': result.predictions_count,
+                         **{metric: getattr(result.columns.get(chart.x_axis_column, ColumnDrift()), metric)
+                            for metric in metrics}}
+                        for result in results]
+        }
+    elif chart.chart_type == 'regression_metrics':
+        metrics = compute_regression_metrics(monitored_model.regression_metrics_state)
+        return {
+            'chart_type': chart.chart_type,
+            'count': metrics['count'],
+            'metrics': {metric: metrics[metric] for metric in chart.metrics}
+        }
+
+    elif chart.chart_type == 'classification_metrics':
+        metrics = compute_classification_metrics(monitored_model.classification_metrics_state)
+        return {
+            'chart_type': chart.chart_type,
+            'count': metrics['count'],
+            'metrics': {metric: metrics[metric] for metric in chart.metrics}
+        }
+    elif chart.chart_type == 'confusion_matrix':
+        labels, matrix = confusion_matrix(monitored_model.classification_metrics_state)
+        return {
+            'chart_type': chart.chart_type,
+            'labels': labels,
+            'confusion_matrix': matrix
+        }
+
+    raise monitored_model_chart_data_not_supported_exception(chart.chart_type)
+
+
+def prediction_columns_projection(columns: List[str]) -> dict:
+    """
+    Util function for getting projection of columns of predictions. Input data columns are projected one by one,
+    unless a column name is not a field path, empty, with '.' or starting with '$', then all input data is projected.
+
+    Args:
+        columns: Column names, input data columns, 'prediction' or 'actual'.
+
+    Returns:
+        Projection of the columns, column values are read with prediction_column_value.
+    """
+    input_columns = [column for column in columns if column not in ('prediction', 'actual')]
+    projection = {"_id": 0, **{column: 1 for column in columns if column in ('prediction', 'actual')}}
+    if any(not column or '.' in column or column.startswith('$') for column in input_columns):
+        projection["input_data"] = 1
+    else:
+        projection.update({f"input_data.{column}": 1 for column in input_columns})
+    return projection
+
+
+def prediction_column_value(record: dict, column: str) -> Optional[float]:
+    """
+    Util function for reading numeric value of one column of prediction read with prediction_columns_projection.
+
+    Args:
+        record: Prediction document.
+        column: Column name, input data column, 'prediction' or 'actual'.
+
+    Returns:
+        Column value or None if it is not a number.
+    """
+    value = record.get(column) if column in ('prediction', 'actual') else record.get("input_data", {}).get(column)
+    return value if isinstance(value, (int, float)) and not isinstance(value, bool) else None
+
+
+async def get_prediction_column_values(monitored_model_id: PydanticObjectId, column: str) -> np.ndarray:
+    """
+    Util function for reading numeric values of one column of all monitored model predictions.
+    Only the column is read from the database, values which are not numbers are skipped.
+
+    Args:
+        monitored_model_id: Monitored model id.
+        column: Column name, input data column, 'prediction' or 'actual'.
+
+    Returns:
+        Array of column values.
+    """
+    cursor = PredictionRecord.get_motor_collection().find({"monitored_model_id": monitored_model_id},
+                                                          prediction_columns_projection([column]))
+
+    values = []
+    async for record in cursor:
+        value = prediction_column_value(record, column)
+        if value is not None:
+            values.append(value)
+
+    values = np.asarray(values, dtype=float)
+    return values[np.isfinite(values)]
+
+
+async def get_prediction_timeseries(monitored_model_id: PydanticObjectId,
+                                    columns: List[str]) -> Tuple[np.ndarray, dict]:
+    """
+    Util function for reading prediction dates and numeric values of columns of all monitored model predictions
+    ordered by prediction date. Only the date and the columns are read from the database.
+
+    Args:
+        monitored_model_id: Monitored model id.
+        columns: Column names, input data columns, 'prediction' or 'actual'.
+
+    Returns:
+        Prediction dates in milliseconds since epoch and dictionary of column values, NaN if value is not a number.
+    """
+    cursor = PredictionRecord.get_motor_collection().find(
+        {"monitored_model_id": monitored_model_id},
+        {"prediction_date": 1, **prediction_columns_projection(columns)}
+    ).sort([("prediction_date", 1), ("_id", 1)])
+
+    dates = []
+    values = {column: [] for column in columns}
+    async for record in cursor:
+        dates.append(record["prediction_date"])
+        for column in columns:
+            value = prediction_column_value(record, column)
+            values[column].append(value if value is not None else np.nan)
+
+    dates = np.array(dates, dtype='datetime64[ms]').astype(np.int64)
+    return dates, {column: np.asarray(column_values, dtype=float) for column, column_values in values.items()}
+
+
+async def get_prediction_sample(monitored_model_id: PydanticObjectId, columns: List[str], sample_size: int,
+                                strata: Optional[int] = None) -> dict:
+    """
+    Util function for reading numeric values of columns of a uniform random sample of monitored model predictions.
+    The sample is made of the predictions with the smallest sample keys, read in sample key order from the index,
+    so only the sampled predictions are read. With strata, the hours between the first and the last prediction
+    are split into strata of equal length and every stratum is sampled separately from the index of sample buckets
+    and sample keys, reading only the sampled predictions of the hours of the stratum which have predictions.
+    Strata without predictions are not read at all.
+
+    Args:
+        monitored_model_id: Monitored model id.
+        columns: Column names, input data columns, 'prediction' or 'actual'.
+        sample_size: Maximum number of sampled predictions.
+        strata: Number of time strata, None to sample all predictions at once.
+
+    Returns:
+        Dictionary of column values of the sampled predictions, NaN if value is not a number.
+    """
+    collection = PredictionRecord.get_motor_collection()
+    projection = prediction_columns_projection(columns)
+    sample_index = [("monitored_model_id", 1), ("sample_key", 1)]
+    bucket_sample_index = [("monitored_model_id", 1), ("sample_bucket", 1), ("sample_key", 1)]
+
+    queries = [({"monitored_model_id": monitored_model_id}, sample_size, sample_index)]
+    if strata is not None:
+        buckets = sorted(bucket for bucket in await collection.distinct("sample_bucket",
+                                                                        {"monitored_model_id": monitored_model_id})
+                         if bucket is not None)
+        queries = []
+        if buckets:
+            start = buckets[0]
+            length = (buckets[-1] + timedelta(hours=1) - start) / strata
+            strata_buckets = [[] for _ in range(strata)]
+            for bucket in buckets:
+                strata_buckets[min(int((bucket - start) / length), strata - 1)].append(bucket)
+            for stratum, stratum_buckets in enumerate(strata_buckets):
+                if stratum_buckets:
+                    # equality on every bucket lets the index merge the buckets in sample key order
+                    queries.append(({"monitored_model_id": monitored_model_id,
+                                     "sample_bucket": {"$in": stratum_buckets}},
+                                    sample_size // strata + (1 if stratum < sample_size % strata else 0),
+                                    bucket_sample_index))
+
+    values = {column: [] for column in columns}
+    for query, limit, index in queries:
+        if limit == 0:
+            continue
+        cursor = collection.find(query, projection).sort("sample_key", 1).hint(index).limit(limit)
+        async for record in cursor:
+            for column in columns:
+                value = prediction_column_value(record, column)
+                values[column].append(value if value is not None else np.nan)
+
+    return {column: np.asarray(column_values, dtype=float) for column, column_values in values.items()}
+
+
+def rollup_field(column: str) -> str:
+    return column if column in ('prediction', 'actual') else f"input_data.{escape_field_name(column)}"
+
+
+async def get_column_rollup(monitored_model_id: PydanticObjectId, column: str) -> ColumnRollup:
+    """
+    Util function for reading summary of one column of all compacted predictions of monitored model.
+    Only the column summary is read from the rollups.
+
+    Args:
+        monitored_model_id: Monitored model id.
+        column: Column name, input data column, 'prediction' or 'actual'.
+
+    Returns:
+        Summary of compacted values of the column, empty if there are no rollups.
+    """
+    field = rollup_field(column)
+    cursor = PredictionRollup.get_motor_collection().find({"monitored_model_id": monitored_model_id},
+                                                          {"_id": 0, field: 1})
+
+    rollups = []
+    async for rollup in cursor:
+        for key in field.split('.'):
+            rollup = rollup.get(key, {})
+        if rollup:
+            rollups.append(ColumnRollup(**rollup))
+
+    return merge_column_rollups(rollups)
+
+
+async def get_rollup_timeseries(monitored_model_id: PydanticObjectId,
+                                columns: List[str]) -> Tuple[np.ndarray, dict, int]:
+    """
+    Util function for reading bucket starts and mean values of columns of all rollups of monitored model ordered
+    by bucket start. Only the counts and sums of the columns are read.
+
+    Args:
+        monitored_model_id: Monitored model id.
+        columns: Column names, input data columns, 'prediction' or 'actual'.
+
+    Returns:
+        Bucket starts in milliseconds since epoch, dictionary of column means, NaN if the bucket has no numeric
+        value of the column, and number of compacted predictions.
+    """
+    fields = {column: rollup_field(column) for column in columns}
+    projection = {"_id": 0, "bucket_start": 1, "predictions_count": 1}
+    for field in fields.values():
+        projection[f"{field}.count"] = 1
+        projection[f"{field}.sum"] = 1
+    cursor = PredictionRollup.get_motor_collection().find(
+        {"monitored_model_id": monitored_model_id}, projection
+    ).sort([("bucket_start", 1)])
+
+    dates = []
+    values = {column: [] for column in columns}
+    compacted = 0
+    async for rollup in cursor:
+        dates.append(rollup["bucket_start"])
+        compacted += rollup.get("predictions_count", 0)
+        for column, field in fields.items():
+            summary = rollup
+            for key in field.split('.'):
+                summary = summary.get(key, {})
+            count = summary.get("count", 0)
+            values[column].append(summary.get("sum", 0.0) / count if count else np.nan)
+
+    dates = np.array(dates, dtype='datetime64[ms]').astype(np.int64)
+    return dates, {column: np.asarray(column_values, dtype=float) for column, column_values in values.items()}, \
+        compacted
+
+
+async def compact_predictions(monitored_model_id: PydanticObjectId, retention_days: int, granularity: str,
+                              now: Optional[datetime] = None) -> Optional[dict]:
+    """
+    Util function for compacting predictions of monitored model older than its retention into rollups.
+    Only one compaction of a monitored model runs at a time, guarded by a lease on the monitored model.
+    Predictions are compacted bucket by bucket, see compact_bucket, so rollups of buckets compacted before,
+    e.g. with a longer retention, are extended. Metrics accumulators, the column schema and drift results
+    are not changed.
+
+    Args:
+        monitored_model_id: Monitored model id.
+        retention_days: Number of days raw predictions are kept.
+        granularity: Rollup granularity, 'hour' or 'day'.
+        now: Current date, datetime.now() if None.
+
+    Returns:
+        Number of compacted predictions, number of updated rollups and the cutoff date, None if another
+        compaction of the monitored model holds the lease.
+    """
+    lease = await acquire_compaction_lease(monitored_model_id)
+    if lease is None:
+        return None
+
+    cutoff = retention_cutoff(now or datetime.now(), retention_days, granularity)
+    predictions = PredictionRecord.get_motor_collection()
+    compacted = 0
+    updated_rollups = 0
+
+    try:
+        oldest = await predictions.find_one({"monitored_model_id": monitored_model_id,
+                                             "prediction_date": {"$lt": cutoff}},
+                                            {"_id": 0, "prediction_date": 1}, sort=[("prediction_date", 1)])
+        bucket_start = bucket_floor(oldest["prediction_date"], granularity) if oldest else cutoff
+
+        while bucket_start < cutoff:
+            bucket_end = bucket_start + rollup_granularities[granularity]
+            bucket_compacted = await compact_bucket(monitored_model_id, granularity, bucket_start, bucket_end)
+            if bucket_compacted:
+                compacted += bucket_compacted
+                updated_rollups += 1
+
+            lease = await renew_compaction_lease(monitored_model_id, lease)
+            if lease is None:
+                break
+
+            # skip buckets without predictions
+            following = await predictions.find_one({"monitored_model_id": monitored_model_id,
+                                                    "prediction_date": {"$gte": bucket_end, "$lt": cutoff}},
+                                                   {"_id": 0, "prediction_date": 1}, sort=[("prediction_date", 1)])
+            bucket_start = bucket_floor(following["prediction_date"], granularity) if following else cutoff
+    finally:
+        if lease is not None:
+            await MonitoredModel.get_motor_collection().update_one(
+                {"_id": monitored_model_id, "compaction_started_at": lease},
+                {"$set": {"compaction_started_at": None}})
+
+    if compacted:
+        await bump_monitored_model_version(monitored_model_id)
+    return {'compacted': compacted, 'rollups': updated_rollups, 'cutoff': cutoff}
+
+
+async def compact_bucket(monitored_model_id: PydanticObjectId, granularity: str, bucket_start: datetime,
+                         bucket_end: datetime) -> int:
+    """
+    Util function for compacting predictions of one rollup bucket. Predictions of the bucket are first marked
+    with a compaction id, then the marked predictions are merged into the rollup, which records the compaction
+    id, and only then deleted. Predictions inserted into the bucket after marking are left for the next
+    compaction, and compactions interrupted after marking are finished with their own compaction id, which the
+    rollup does not merge twice.
+
+    Args:
+        monitored_model_id: Monitored model id.
+        granularity: Rollup granularity, 'hour' or 'day'.
+        bucket_start: Start of the bucket.
+        bucket_end: End of the bucket.
+
+    Returns:
+        Number of compacted predictions.
+    """
+    predictions = PredictionRecord.get_motor_collection()
+    bucket_query = {"monitored_model_id": monitored_model_id,
+                    "prediction_date": {"$gte": bucket_start, "$lt": bucket_end}}
+
+    await predictions.update_many({**bucket_query, "compaction_id": None},
+                                  {"$set": {"compaction_id": str(PydanticObjectId())}})
+    compaction_ids = await predictions.distinct("compaction_id", {**bucket_query,
+                                                                  "compaction_id": {"$ne": None}})
+
+    compacted = 0
+    for compaction_id in compaction_ids:
+        compaction_query = {**bucket_query, "compaction_id": compaction_id}
+        accumulator = RollupAccumulator()
+        async for record in predictions.find(compaction_query, {"_id": 0, "prediction": 1, "actual": 1,
+                                                                "input_data": 1}):
+            accumulator.add(record)
+        if not accumulator.count:
+            continue
+
+        await merge_into_rollup(monitored_model_id, granularity, bucket_start, compaction_id, accumulator)
+        await predictions.delete_many(compaction_query)
+        compacted += accumulator.count
+    return compacted
+
+
+async def merge_into_rollup(monitored_model_id: PydanticObjectId, granularity: str, bucket_start: datetime,
+                            compaction_id: str, accumulator: RollupAccumulator) -> None:
+    """
+    Util function for merging aggregate of compacted predictions into their rollup once per compaction id.
+
+    Args:
+        monitored_model_id: Monitored model id.
+        granularity: Rollup granularity, 'hour' or 'day'.
+        bucket_start: Start of the bucket.
+        compaction_id: Id of the compaction of the predictions.
+        accumulator: Aggregate of the predictions.
+    """
+    rollups = PredictionRollup.get_motor_collection()
+    rollup_query = {"monitored_model_id": monitored_model_id, "granularity": granularity,
+                    "bucket_start": bucket_start}
+    update = accumulator.update()
+    update["$addToSet"] = {"compaction_ids": compaction_id}
+
+    for _ in range(2):
+        try:
+            await rollups.update_one({**rollup_query, "compaction_ids": {"$ne": compaction_id}}, update,
+                                     upsert=True)
+            return
+        except DuplicateKeyError:
+            # the rollup already merged this compaction, or was inserted by a concurrent upsert
+            if await rollups.count_documents({**rollup_query, "compaction_ids": compaction_id}, limit=1):
+                return
+    raise RuntimeError(f"Failed to merge compaction {compaction_id} into its rollup")
+
+
+async def acquire_compaction_lease(monitored_model_id: PydanticObjectId) -> Optional[datetime]:
+    """
+    Util function for taking the compaction lease of monitored model. Leases not renewed for
+    PREDICTIONS_COMPACTION_LEASE seconds, e.g. of a crashed compaction, are taken over.
+
+    Args:
+        monitored_model_id: Monitored model id.
+
+    Returns:
+        Start of the lease, None if the lease is held by another compaction.
+    """
+    now = datetime.now()
+    expired = now - timedelta(seconds=settings.PREDICTIONS_COMPACTION_LEASE)
+    monitored_model = await MonitoredModel.get_motor_collection().find_one_and_update(
+        {"_id": monitored_model_id,
+         "$or": [{"compaction_started_at": None}, {"compaction_started_at": {"$lt": expired}}]},
+        {"$set": {"compaction_started_at": now}}, projection={"_id": 1})
+    return now if monitored_model else None
+
+
+async def renew_compaction_lease(monitored_model_id: PydanticObjectId, lease: datetime) -> Optional[datetime]:
+    """
+    Util function for renewing the compaction lease of monitored model.
+
+    Args:
+        monitored_model_id: Monitored model id.
+        lease: Start of the held lease.
+
+    Returns:
+        Start of the renewed lease, None if the lease was taken over.
+    """
+    now = datetime.now()
+    result = await MonitoredModel.get_motor_collection().update_one(
+        {"_id": monitored_model_id, "compaction_started_at": lease}, {"$set": {"compaction_started_at": now}})
+    return now if result.modified_count else None
+
+
+async def compact_expired_predictions() -> int:
+    """
+    Util function for compacting expired predictions of all monitored models with retention. Compaction
+    of one monitored model failing is counted in the metrics and does not stop the others.
+
+    Returns:
+        Number of compacted predictions.
+    """
+    compacted = 0
+    async for monitored_model in MonitoredModel.get_motor_collection().find(
+            {"retention_days": {"$ne": None}}, {"_id": 1, "retention_days": 1, "rollup_granularity": 1}):
+        try:
+            result = await compact_predictions(monitored_model["_id"], monitored_model["retention_days"],
+                                               monitored_model.get("rollup_granularity") or 'hour')
+        except Exception:
+            predictions_compaction_failures.inc()
+            continue
+        if result is None:
+            continue
+        predictions_compacted.inc(amount=result['compacted'])
+        compacted += result['compacted']
+    return compacted
+
+
+async def compact_expired_predictions_periodically(interval: float) -> None:
+    """
+    Util function for compacting expired predictions every interval seconds until cancelled.
+
+    Args:
+        interval: Number of seconds between compactions.
+    """
+    while True:
+        await compact_expired_predictions()
+        await asyncio.sleep(interval)
+
+
+async def run_predictions(monitored_model: MonitoredModel,
+                          data: list[dict]) -> Tuple[list[PredictionData], list[PredictionError]]:
+    """
+    Util function for predicting samples with monitored model ml model outside the event loop, in the executor
+    chosen by the monitored model or in the default one. With batching enabled, concurrent requests with
+    the same columns are predicted together.
+
+    Args:
+        monitored_model: Monitored model to make prediction with.
+        data: List of samples to make prediction on.
+
+    Returns:
+        Predictions data of predicted samples and errors of failed samples.
+    """
+    executor = monitored_model.inference_executor or settings.INFERENCE_EXECUTOR
+
+    async def predict(samples: list[dict]) -> Tuple[list[PredictionData], list[PredictionError]]:
+        if executor == 'process' and monitored_model.iteration.ml_model_hash:
+            cache_key = model_cache.make_key(monitored_model.id, monitored_model.iteration.id,
+                                             monitored_model.iteration.ml_model_hash)
+            try:
+                return await inference_engine.predict_in_process(str(monitored_model.id), cache_key,
+                                                                 monitored_model.iteration.ml_model_hash,
+                                                                 samples)
+            except Exception as e:
+                raise monitored_model_load_ml_model_exception(str(e))
+
+        try:
+            ml_model = await load_ml_model(monitored_model)
+        except Exception as e:
+            raise monitored_model_load_ml_model_exception(str(e))
+
+        return await inference_engine.predict_in_thread(str(monitored_model.id), ml_model, samples)
+
+    columns = prediction_batcher.columns_signature(data)
+    if not settings.PREDICT_BATCHING or columns is None:
+        return await predict(data)
+
+    # requests are merged only when they would use the same version of the ml model
+    batch_key = (str(monitored_model.id), str(monitored_model.iteration.id), monitored_model.updated_at,
+                 executor, columns)
+    return await prediction_batcher.submit(batch_key, data, predict)
+
+
+def schedule_shadow_predictions(background_tasks: BackgroundTasks, monitored_model_id: PydanticObjectId,
+                                shadow_ids: Optional[List[PydanticObjectId]], data: list[dict]) -> None:
+    """
+    Util function for scheduling predictions of shadow monitored models to run after the response is sent.
+
+    Args:
+        background_tasks: Background tasks of the request.
+        monitored_model_id: Id of the monitored model whose prediction is returned, skipped among shadows.
+        shadow_ids: Ids of shadow monitored models.
+        data: List of samples to make prediction on.
+    """
+    shadow_ids = list(dict.fromkeys(shadow_id for shadow_id in shadow_ids or [] if shadow_id != monitored_model_id))
+    if shadow_ids and data:
+        background_tasks.add_task(run_shadow_predictions, shadow_ids, data)
+
+
+async def run_shadow_predictions(shadow_ids: List[PydanticObjectId], data: list[dict]) -> None:
+    """
+    Util function for predicting samples with shadow monitored models concurrently and storing their predictions
+    data. Shadows which do not exist or have no iteration are skipped, samples which cannot be predicted by
+    a shadow are not stored and a shadow failing entirely does not affect the other ones.
+
+    Args:
+        shadow_ids: Ids of shadow monitored models.
+        data: List of samples to make prediction on.
+    """
+    async def predict_and_store(shadow_model: MonitoredModel) -> None:
+        predictions_data, _ = await run_predictions(shadow_model, data)
+        await store_predictions_data(shadow_model.id, predictions_data)
+
+    shadow_models = await MonitoredModel.find(In(MonitoredModel.id, shadow_ids)).to_list()
+    await asyncio.gather(*(predict_and_store(shadow_model) for shadow_model in shadow_models
+                           if shadow_model.iteration), return_exceptions=True)
+
+
+async def predict_stream(monitored_model: MonitoredModel,
+                         samples: AsyncIterator[Tuple[Optional[dict], Optional[str]]],
+                         batch_size: int) -> AsyncIterator[bytes]:
+    """
+    Util function for predicting and storing streamed samples in batches of batch_size, yielding result lines
+    of every batch as soon as it is predicted.
+
+    Args:
+        monitored_model: Monitored model to make prediction with.
+        samples: Parsed samples, (None, error detail) for lines which could not be parsed.
+        batch_size: Number of samples predicted together.
+
+    Returns:
+        Async iterator of newline-delimited JSON lines with predictions data and prediction errors.
+    """
+    batch = []
+    batch_indices = []
+
+    async def predict_batch() -> AsyncIterator[bytes]:
+        try:
+            predictions_data, errors = await run_predictions(monitored_model, batch)
+            await store_predictions_data(monitored_model.id, predictions_data)
+        except Exception as e:
+            detail = e.detail if isinstance(e, HTTPException) else str(e)
+            predictions_data = []
+            errors = [PredictionError(index=index, input_data=sample, detail=detail)
+                      for index, sample in enumerate(batch)]
+
+        for prediction_data in predictions_data:
+            yield ndjson_line(prediction_data)
+        for error in errors:
+            yield ndjson_line(PredictionError(index=batch_indices[error.index], input_data=error.input_data,
+                                              detail=error.detail))
+
+    index = 0
+    async for sample, detail in samples:
+        if detail is not None:
+            yield ndjson_line(PredictionError(index=index, input_data={}, detail=detail))
+        else:
+            batch.append(sample)
+            batch_indices.append(index)
+        index += 1
+
+        if len(batch) >= batch_size:
+            async for line in predict_batch():
+                yield line
+            batch = []
+            batch_indices = []
+
+    if batch:
+        async for line in predict_batch():
+            yield line
+
+
+async def preload_active_monitored_models() -> None:
+    """
+    Util function for loading ml models of all active monitored models into the model cache after startup,
+    one by one, so the first prediction of each of them does not pay the decoding cost. With warm-up enabled,
+    the latest stored input sample of every monitored model is predicted and thrown away, which also warms
+    lazily initialized ml models and, for the process executor, loads the ml model into one of the workers.
+    Preload results are recorded in the model warmup state, which is marked ready at the end.
+    """
+    try:
+        monitored_models = await MonitoredModel.find(MonitoredModel.model_status == 'active').to_list()
+        for monitored_model in monitored_models:
+            if not monitored_model.iteration:
+                continue
+
+            started_at = time.monotonic()
+            try:
+                status = await preload_monitored_model(monitored_model)
+                model_warmup.record(str(monitored_model.id), status, time.monotonic() - started_at)
+            except Exception as e:
+                detail = e.detail if isinstance(e, HTTPException) else str(e)
+                model_warmup.record(str(monitored_model.id), 'failed', time.monotonic() - started_at, detail)
+    finally:
+        model_warmup.finish()
+
+
+async def preload_monitored_model(monitored_model: MonitoredModel) -> str:
+    """
+    Util function for loading ml model of monitored model and optionally predicting its latest stored sample.
+
+    Args:
+        monitored_model: Monitored model to preload.
+
+    Returns:
+        'warmed' if warm-up prediction was made, 'loaded' otherwise.
+    """
+    executor = monitored_model.inference_executor or settings.INFERENCE_EXECUTOR
+    if executor != 'process' or not monitored_model.iteration.ml_model_hash:
+        await load_ml_model(monitored_model)
+
+    if not settings.MODEL_WARMUP_PREDICTION:
+        return 'loaded'
+
+    record = await PredictionRecord.find(PredictionRecord.monitored_model_id == monitored_model.id) \
+        .sort([("prediction_date", -1), ("_id", -1)]).limit(1).to_list()
+    if not record:
+        return 'loaded'
+
+    _, errors = await run_predictions(monitored_model, [record[0].input_data])
+    if errors:
+        raise monitored_model_prediction_exception(errors[0].detail)
+    return 'warmed'
+
+
+async def get_iteration_from_monitored_model(monitored_model: MonitoredModel) -> Iteration:
+    """
+    Get iteration from monitored model.
+
+    Args:
+        monitored_model: Monitored model to get iteration from.
+
+    Returns:
+        Iteration.
+    """
+    project = await Project.get(monitored_model.iteration.project_id)
+    if not project:
+        raise project_not_found_exception()
+
+    experiment = next((exp for exp in project.experiments if exp.id == monitored_model.iteration.experiment_id),
+                      None)
+    if not experiment:
+        raise experiment_not_found_exception()
+
+    iteration = next((iter for iter in experiment.iterations if iter.id == monitored_model.iteration.id), None)
+    if not iteration:
+        raise iteration_not_found_exception()
+
+    return iteration
+
+
+def validate_chart(chart: MonitoredModelInteractiveChart, columns: Dict[str, dict]) -> MonitoredModelInteractiveChart:
+    """
+    Validate chart against the column schema of monitored model.
+
+    Args:
+        chart: Chart to validate.
+        columns: Kind and nullable flag of every column, see describe_column_schema.
+
+    Returns:
+        Validated chart.
+    """
+    def is_numeric(column: Optional[str]) -> bool:
+        return columns.get(column, {}).get('kind') == 'numeric'
+
+    def is_string_or_numeric(column: Optional[str]) -> bool:
+        return columns.get(column, {}).get('kind') in ('numeric', 'string', 'categorical')
+
+    if chart.chart_type == 'histogram':
+        if not is_numeric(chart.x_axis_column):
             raise monitored_model_chart_column_bad_type_exception(chart.chart_type, 'numeric', 'x_axis_column')
         if chart.y_axis_columns is not None:
             raise monitored_model_chart_column_bad_type_exception(chart.chart_type, 'None', 'y_axis_columns')
@@ -742,8 +2560,7 @@ def validate_chart(chart: MonitoredModelInteractiveChart, data: pd.DataFrame) ->
         if chart.metrics is not None:
             raise monitored_model_chart_metrics_None_exception(chart.chart_type)
     elif chart.chart_type == 'countplot':
-        if not pd.api.types.is_string_dtype(data[chart.x_axis_column]) and not pd.api.types.is_numeric_dtype(
-                data[chart.x_axis_column]):
+        if not is_string_or_numeric(chart.x_axis_column):
             raise monitored_model_chart_column_bad_type_exception(chart.chart_type, 'string or numeric', 'x_axis_column')
         if chart.y_axis_columns is not None:
             raise monitored_model_chart_column_bad_type_exception(chart.chart_type, 'None', 'y_axis_columns')
@@ -754,13 +2571,13 @@ def validate_chart(chart: MonitoredModelInteractiveChart, data: pd.DataFrame) ->
         if chart.metrics is not None:
             raise monitored_model_chart_metrics_None_exception(chart.chart_type)
     elif chart.chart_type == 'scatter':
-        if not pd.api.types.is_numeric_dtype(data[chart.x_axis_column]):
+        if not is_numeric(chart.x_axis_column):
             raise monitored_model_chart_column_bad_type_exception(chart.chart_type, 'numeric', 'x_axis_column')
         if chart.y_axis_columns is None:
             raise monitored_model_scatter_chart_y_axis_columns_not_None_exception()
         else:
             for y_column in chart.y_axis_columns:
-                if not pd.api.types.is_numeric_dtype(data[y_column]):
+                if not is_numeric(y_column):
                     raise monitored_model_chart_column_bad_type_exception(chart.chart_type, 'numeric', y_column)
                 if chart.x_axis_column == y_column:
                     raise monitored_model_chart_columns_different_values_exception(chart.chart_type, y_column)
@@ -771,7 +2588,7 @@ def validate_chart(chart: MonitoredModelInteractiveChart, data: pd.DataFrame) ->
         if chart.metrics is not None:
             raise monitored_model_chart_metrics_None_exception(chart.chart_type)
     elif chart.chart_type == 'scatter_with_histograms':
-        if not pd.api.types.is_numeric_dtype(data[chart.x_axis_column]) or not pd.api.types.is_numeric_dtype(data[chart.y_axis_columns[0]]):
+        if not is_numeric(chart.x_axis_column) or not is_numeric(chart.y_axis_columns[0]):
             raise monitored_model_chart_column_bad_type_exception(chart.chart_type, 'numeric', 'first_column or second_column')
         if chart.x_axis_column == chart.y_axis_columns[0]:
             raise monitored_model_chart_columns_different_values_exception(chart.chart_type, chart.y_axis_columns[0])
@@ -792,7 +2609,7 @@ def validate_chart(chart: MonitoredModelInteractiveChart, data: pd.DataFrame) ->
             raise monitored_model_timeseries_chart_y_axis_columns_not_None_exception()
         else:
             for y_column in chart.y_axis_columns:
-                if not pd.api.types.is_numeric_dtype(data[y_column]):
+                if not is_numeric(y_column):
                     raise monitored_model_chart_column_bad_type_exception(chart.chart_type, 'numeric', 'y_axis_columns')
         if chart.bin_method is not None:
             raise monitored_model_chart_bad_bin_method_type_exception(chart.chart_type)
@@ -821,5 +2638,16 @@ def validate_chart(chart: MonitoredModelInteractiveChart, data: pd.DataFrame) ->
     elif chart.chart_type == 'confusion_matrix':
         if chart.x_axis_column is not None or chart.y_axis_columns is not None or chart.bin_method is not None or chart.bin_number is not None or chart.metrics is not None:
             raise monitored_model_bad_values_exception(chart.chart_type)
+    elif chart.chart_type == 'data_drift':
+        if chart.x_axis_column is None or chart.x_axis_column not in columns or \
+                chart.x_axis_column in ('prediction', 'actual'):
+            raise monitored_model_chart_column_bad_type_exception(chart.chart_type, 'input data column',
+                                                                  'x_axis_column')
+        if chart.y_axis_columns is not None or chart.bin_method is not None or chart.bin_number is not None:
+            raise monitored_model_bad_values_exception(chart.chart_type)
+        if chart.metrics is not None:
+            for metric in chart.metrics:
+                if metric not in MonitoredModelInteractiveChart.Settings.metrics['drift']:
+                    raise monitored_model_chart_metric_not_in_metrics_exception('drift', metric)
 
     return chart
@@ -1,6 +1,6 @@
 from datetime import datetime
 
-from fastapi import APIRouter, status
+from fastapi import APIRouter, Request, Response, status
 from beanie import PydanticObjectId
 from typing import List, Dict
 
@@ -14,12 +14,13 @@ from app.routers.exceptions.project import (
     project_not_found_exception,
     project_title_not_unique_exception,
 )
+from app.utils.etag import check_document_etag, check_documents_etag
 
 router = APIRouter()
 
 
 @router.get("/", response_model=List[Project], status_code=status.HTTP_200_OK)
-async def get_all_projects() -> List[Project]:
+async def get_all_projects(request: Request, response: Response) -> List[Project]:
     """
     Get all projects.
 
@@ -29,12 +30,13 @@ async def get_all_projects() -> List[Project]:
     Returns:
     - **List[Project]**: List of all projects.
     """
+    await check_documents_etag(request, response, Project)
     projects = await Project.find_all().to_list()
     return projects
 
 
 @router.get("/base", response_model=List[DisplayProject], status_code=status.HTTP_200_OK)
-async def get_all_projects_base() -> List[DisplayProject]:
+async def get_all_projects_base(request: Request, response: Response) -> List[DisplayProject]:
     """
     Get base information about all projects.
 
@@ -45,6 +47,7 @@ async def get_all_projects_base() -> List[DisplayProject]:
     - **List[DisplayProject]**: List of base information about all projects.
     """
 
+    await check_documents_etag(request, response, Project)
     projects = await Project.find_all().to_list()
     display_projects = []
 
@@ -70,7 +73,7 @@ async def get_all_projects_base() -> List[DisplayProject]:
 
 
 @router.get("/{id}/base", response_model=DisplayProject, status_code=status.HTTP_200_OK)
-async def get_project_base(id: PydanticObjectId) -> DisplayProject:
+async def get_project_base(id: PydanticObjectId, request: Request, response: Response) -> DisplayProject:
     """
     Get base information about project by id.
 
@@ -80,6 +83,9 @@ async def get_project_base(id: PydanticObjectId) -> DisplayProject:
     Returns:
     - **DisplayProject**: Base information about project.
     """
+    if await check_document_etag(request, response, Project, {"_id": id}) is None:
+        raise project_not_found_exception()
+
     project = await Project.get(id)
     if not project:
         raise project_not_found_exception()
@@ -99,7 +105,7 @@ async def get_project_base(id: PydanticObjectId) -> DisplayProject:
 
 
 @router.get("/non-archived", response_model=List[Project], status_code=status.HTTP_200_OK)
-async def get_non_archived_projects() -> List[Project]:
+async def get_non_archived_projects(request: Request, response: Response) -> List[Project]:
     """
     Get all non-archived projects.
 
@@ -109,12 +115,13 @@ async def get_non_archived_projects() -> List[Project]:
     Returns:
     - **List[Project]**: List of all non-archived projects.
     """
+    await check_documents_etag(request, response, Project, Project.archived == False)
     projects = await Project.find(Project.archived == False).to_list()
     return projects
 
 
 @router.get("/archived", response_model=List[Project], status_code=status.HTTP_200_OK)
-async def get_archived_projects() -> List[Project]:
+async def get_archived_projects(request: Request, response: Response) -> List[Project]:
     """
     Get all archived projects.
 
@@ -124,12 +131,13 @@ async def get_archived_projects() -> List[Project]:
     Returns:
     - **List[Project]**: List of all archived projects.
     """
+    await check_documents_etag(request, response, Project, Project.archived == True)
     projects = await Project.find(Project.archived == True).to_list()
     return projects
 
 
 @router.get("/{id}", response_model=Project, status_code=status.HTTP_200_OK)
-async def get_project(id: PydanticObjectId) -> Project:
+async def get_project(id: PydanticObjectId, request: Request, response: Response) -> Project:
     """
     Get project by id.
 
@@ -139,6 +147,9 @@ async def get_project(id: PydanticObjectId) -> Project:
     Returns:
     - **Project**: Project with given id.
     """
+    if await check_document_etag(request, response, Project, {"_id": id}) is None:
+        raise project_not_found_exception()
+
     project = await Project.get(id)
     if not project:
         raise project_not_found_exception()
@@ -185,7 +196,7 @@ async def update_project(id: PydanticObjectId, updated_project: UpdateProject) -
         raise project_title_not_unique_exception()
 
     updated_project.updated_at = datetime.now()
-    await project.update({"$set": updated_project.dict(exclude_unset=True)})
+    await project.update({"$set": updated_project.dict(exclude_unset=True, exclude={'version'})})
     await project.save()
 
     await update_iteration_project_title(project)
@@ -234,7 +245,7 @@ async def delete_project(id: PydanticObjectId):
 
 
 @router.get("/title/{title}", response_model=Project, status_code=status.HTTP_200_OK)
-async def get_project_by_title(title: str) -> Project:
+async def get_project_by_title(title: str, request: Request, response: Response) -> Project:
     """
     Get project by title.
 
@@ -244,6 +255,9 @@ async def get_project_by_title(title: str) -> Project:
     Returns:
     - **Project**: Project with given title.
     """
+    if await check_document_etag(request, response, Project, {"title": title}) is None:
+        raise project_not_found_exception()
+
     project = await Project.find_one(Project.title == title)
     if not project:
         raise project_not_found_exception()
@@ -4,6 +4,25 @@ from httpx import AsyncClient
 
 from app.app import app
 from app.config.config import settings
+from app.utils.artifact_store import artifact_store
+
+
+@pytest.fixture(scope="session", autouse=True)
+def isolated_artifact_store(tmp_path_factory):
+    """
+    Point the artifact store at a temporary directory, so tests never write ml models into the working tree.
+    The directory is shared by the whole session, like the test database, and passed through the environment
+    to inference worker processes.
+
+    Returns:
+        Path: Directory of the artifact store.
+    """
+    root = tmp_path_factory.mktemp("artifacts")
+    with pytest.MonkeyPatch.context() as monkeypatch:
+        monkeypatch.setenv("ARTIFACT_STORE_PATH", str(root))
+        monkeypatch.setattr(settings, "ARTIFACT_STORE_PATH", str(root))
+        monkeypatch.setattr(artifact_store, "root", root)
+        yield root
 
 
 @pytest.fixture
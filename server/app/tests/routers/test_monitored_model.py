@@ -1,14 +1,36 @@
+import asyncio
 import base64
+import io
+import json
+import math
 import pickle
+from datetime import datetime, timedelta
 
+import numpy as np
+import pyarrow as pa
+import pyarrow.parquet as pq
 import pytest
 import os
+from beanie import PydanticObjectId
 from httpx import AsyncClient
 
+from app.config.config import settings
 from app.database.init_mongo_db import drop_database
+from app.database.migrations import move_embedded_predictions_to_collection, backfill_metrics_states, \
+    move_ml_models_to_artifact_store, backfill_column_schemas, backfill_sample_keys, backfill_sample_buckets
+from app.models.column_schema import ColumnSchema, ColumnStats
+from app.models.monitored_model import MonitoredModel
 from app.models.monitored_model_chart import MonitoredModelInteractiveChart
+from app.models.prediction_data import PredictionRecord
+from app.models.prediction_rollup import PredictionRollup
 from app.routers.exceptions.monitored_model import monitored_model_encoding_pkl_file_exception
-from app.routers.monitored_model import CustomUnpickler
+from app.routers import monitored_model as monitored_model_router_module
+from app.routers.monitored_model import CustomUnpickler, preload_active_monitored_models
+from app.utils.chart_cache import chart_data_cache
+from app.utils.column_schema import describe_column_schema
+from app.utils.metrics import predict_phase_duration
+from app.utils.model_cache import model_cache
+from app.utils.warmup import model_warmup
 
 
 def load_ml_model_from_file_and_encode(pkl_file_path) -> str:
@@ -1566,3 +1588,1565 @@ async def test_create_monitored_model_failure_no_iteration(client: AsyncClient):
     }
     response = await client.post("/monitored-models/", json=monitored_model)
     assert response.status_code == 400
+
+
+@pytest.mark.asyncio
+async def test_monitored_ml_model_predict_uses_model_cache(client: AsyncClient):
+    """
+    Test that consecutive predictions reuse decoded ml model from the model cache.
+
+    Args:
+        client (AsyncClient): Async client fixture
+
+    Returns:
+        None
+    """
+    monitored_model_name = "Engine failure prediction model v4 changed"
+    response = await client.get(f"/monitored-models/name/{monitored_model_name}")
+    assert response.status_code == 200
+    monitored_model_id = response.json()["_id"]
+
+    data = [{"X1": 1.0, "X2": 2.0}]
+    response = await client.post(f"/monitored-models/{monitored_model_id}/predict", json=data)
+    assert response.status_code == 200
+
+    response = await client.get("/monitored-models/model-cache/stats")
+    assert response.status_code == 200
+    stats_before = response.json()
+
+    response = await client.post(f"/monitored-models/{monitored_model_id}/predict", json=data)
+    assert response.status_code == 200
+    assert response.json()[0]["prediction"] == pytest.approx(7.89043535267264)
+
+    response = await client.get("/monitored-models/model-cache/stats")
+    stats_after = response.json()
+    assert stats_after["hits"] == stats_before["hits"] + 1
+    assert stats_after["misses"] == stats_before["misses"]
+    assert stats_after["size"] <= stats_after["max_size"]
+
+    # updating monitored model drops its cached ml model
+    response = await client.put(f"/monitored-models/{monitored_model_id}", json={"model_description": "Cached"})
+    assert response.status_code == 200
+
+    response = await client.post(f"/monitored-models/{monitored_model_id}/predict", json=data)
+    assert response.status_code == 200
+
+    response = await client.get("/monitored-models/model-cache/stats")
+    assert response.json()["misses"] == stats_after["misses"] + 1
+
+
+@pytest.mark.asyncio
+async def test_monitored_ml_model_predict_batch_reports_failed_rows(client: AsyncClient):
+    """
+    Test monitored model batch predict with one failing row, which must not abort the rest of the batch.
+
+    Args:
+        client (AsyncClient): Async client fixture
+
+    Returns:
+        None
+    """
+    monitored_model_name = "Engine failure prediction model v4 changed"
+    response = await client.get(f"/monitored-models/name/{monitored_model_name}")
+    assert response.status_code == 200
+    monitored_model_id = response.json()["_id"]
+    predictions_count = len(response.json()["predictions_data"])
+
+    data = [
+        {"X1": 1.0, "X2": 2.0},
+        {"X1": "bad value", "X2": 2.0},
+        {"X1": 3.0, "X2": 4.0}
+    ]
+    response = await client.post(f"/monitored-models/{monitored_model_id}/predict-batch", json=data)
+    assert response.status_code == 200
+    assert len(response.json()["predictions"]) == 2
+    assert response.json()["predictions"][0]["prediction"] == pytest.approx(7.89043535267264)
+    assert response.json()["predictions"][1]["prediction"] == pytest.approx(17.685669831629962)
+    assert len(response.json()["errors"]) == 1
+    assert response.json()["errors"][0]["index"] == 1
+    assert response.json()["errors"][0]["input_data"]["X1"] == "bad value"
+
+    response = await client.get(f"/monitored-models/name/{monitored_model_name}")
+    assert len(response.json()["predictions_data"]) == predictions_count + 2
+
+
+@pytest.mark.asyncio
+async def test_move_embedded_predictions_to_collection(client: AsyncClient):
+    """
+    Test migration of predictions embedded in monitored model document to the prediction_data collection.
+
+    Args:
+        client (AsyncClient): Async client fixture
+
+    Returns:
+        None
+    """
+    result = await MonitoredModel.get_motor_collection().insert_one({
+        "model_name": "Model with embedded predictions",
+        "model_description": "",
+        "model_status": "idle",
+        "pinned": False,
+        "predictions_data": [
+            {"id": PydanticObjectId(), "prediction_date": datetime(2023, 1, 1), "input_data": {"X1": 1.0},
+             "prediction": 1.0, "actual": None},
+            {"id": PydanticObjectId(), "prediction_date": datetime(2023, 1, 2), "input_data": {"X1": 2.0},
+             "prediction": 2.0, "actual": 2.5}
+        ],
+        "interactive_charts": [],
+        "interactive_charts_existed": [],
+        "created_at": datetime.now(),
+        "updated_at": datetime.now()
+    })
+    monitored_model_id = str(result.inserted_id)
+
+    assert await move_embedded_predictions_to_collection() == 2
+    # running migration again does not move anything
+    assert await move_embedded_predictions_to_collection() == 0
+
+    stored_monitored_model = await MonitoredModel.get_motor_collection().find_one({"_id": result.inserted_id})
+    assert stored_monitored_model["predictions_data"] == []
+
+    response = await client.get(f"/monitored-models/id/{monitored_model_id}")
+    assert response.status_code == 200
+    assert len(response.json()["predictions_data"]) == 2
+    assert response.json()["predictions_data"][1]["actual"] == 2.5
+
+    prediction_id = response.json()["predictions_data"][0]["id"]
+    response = await client.put(f"/monitored-models/{monitored_model_id}/predictions/{prediction_id}",
+                                json={"actual": 1.5})
+    assert response.status_code == 200
+    assert response.json()["actual"] == 1.5
+
+    response = await client.put(f"/monitored-models/{monitored_model_id}/predictions/{PydanticObjectId()}",
+                                json={"actual": 1.5})
+    assert response.status_code == 404
+
+    response = await client.delete(f"/monitored-models/{monitored_model_id}")
+    assert response.status_code == 200
+    assert len(response.json()["predictions_data"]) == 2
+
+
+@pytest.mark.asyncio
+async def test_add_same_chart_concurrently(client: AsyncClient):
+    """
+    Test that only one of concurrent requests adding the same chart is stored.
+
+    Args:
+        client (AsyncClient): Async client fixture
+
+    Returns:
+        None
+    """
+    monitored_model_name = "Engine failure prediction model v4 changed"
+    response = await client.get(f"/monitored-models/name/{monitored_model_name}")
+    assert response.status_code == 200
+    monitored_model_id = response.json()["_id"]
+    charts_count = len(response.json()["interactive_charts"])
+
+    chart = {
+        "chart_type": "timeseries",
+        "y_axis_columns": ["prediction"]
+    }
+    responses = await asyncio.gather(
+        client.post(f"/monitored-models/{monitored_model_id}/charts", json=chart),
+        client.post(f"/monitored-models/{monitored_model_id}/charts", json=chart)
+    )
+    assert sorted(response.status_code for response in responses) == [201, 400]
+
+    response = await client.get(f"/monitored-models/name/{monitored_model_name}")
+    assert len(response.json()["interactive_charts"]) == charts_count + 1
+    assert len(response.json()["interactive_charts_existed"]) == charts_count + 1
+    chart_id = response.json()["interactive_charts"][-1]["id"]
+
+    response = await client.delete(f"/monitored-models/{monitored_model_id}/charts/{chart_id}")
+    assert response.status_code == 200
+
+    response = await client.get(f"/monitored-models/name/{monitored_model_name}")
+    assert len(response.json()["interactive_charts"]) == charts_count
+    assert len(response.json()["interactive_charts_existed"]) == charts_count
+
+
+@pytest.mark.asyncio
+async def test_monitored_ml_model_predict_in_process_pool(client: AsyncClient):
+    """
+    Test monitored model predict in the process pool executor and inference statistics.
+
+    Args:
+        client (AsyncClient): Async client fixture
+
+    Returns:
+        None
+    """
+    monitored_model_name = "Engine failure prediction model v4 changed"
+    response = await client.get(f"/monitored-models/name/{monitored_model_name}")
+    assert response.status_code == 200
+    monitored_model_id = response.json()["_id"]
+
+    response = await client.put(f"/monitored-models/{monitored_model_id}", json={"inference_executor": "gpu"})
+    assert response.status_code == 400
+
+    response = await client.put(f"/monitored-models/{monitored_model_id}", json={"inference_executor": "process"})
+    assert response.status_code == 200
+    assert response.json()["inference_executor"] == "process"
+
+    data = [{"X1": 1.0, "X2": 2.0}, {"X1": 3.0, "X2": 4.0}]
+    for _ in range(2):
+        response = await client.post(f"/monitored-models/{monitored_model_id}/predict", json=data)
+        assert response.status_code == 200
+        assert response.json()[0]["prediction"] == pytest.approx(7.89043535267264)
+        assert response.json()[1]["prediction"] == pytest.approx(17.685669831629962)
+
+    response = await client.get("/monitored-models/inference/stats")
+    assert response.status_code == 200
+    model_stats = response.json()["models"][monitored_model_id]
+    assert model_stats["executor"] == "process"
+    assert model_stats["predictions"] >= 2
+    assert model_stats["execution_max"] >= model_stats["execution_avg"] >= 0
+
+    response = await client.put(f"/monitored-models/{monitored_model_id}", json={"inference_executor": "thread"})
+    assert response.status_code == 200
+
+
+@pytest.mark.asyncio
+async def test_monitored_ml_model_predict_concurrent_requests_batched(client: AsyncClient):
+    """
+    Test that concurrent predict requests are merged into one batch and each gets its own predictions back.
+
+    Args:
+        client (AsyncClient): Async client fixture
+
+    Returns:
+        None
+    """
+    monitored_model_name = "Engine failure prediction model v4 changed"
+    response = await client.get(f"/monitored-models/name/{monitored_model_name}")
+    assert response.status_code == 200
+    monitored_model_id = response.json()["_id"]
+    predictions_count = len(response.json()["predictions_data"])
+
+    response = await client.get("/monitored-models/inference/stats")
+    batches_before = response.json()["batching"]["batches"]
+
+    settings.PREDICT_BATCHING = True
+    try:
+        responses = await asyncio.gather(
+            client.post(f"/monitored-models/{monitored_model_id}/predict", json=[{"X1": 1.0, "X2": 2.0}]),
+            client.post(f"/monitored-models/{monitored_model_id}/predict",
+                        json=[{"X1": 3.0, "X2": 4.0}, {"X1": 1.0, "X2": 2.0}]),
+            client.post(f"/monitored-models/{monitored_model_id}/predict-batch",
+                        json=[{"X1": "bad value", "X2": 4.0}, {"X1": 3.0, "X2": 4.0}])
+        )
+    finally:
+        settings.PREDICT_BATCHING = False
+
+    assert responses[0].status_code == 200
+    assert len(responses[0].json()) == 1
+    assert responses[0].json()[0]["prediction"] == pytest.approx(7.89043535267264)
+    assert responses[1].status_code == 200
+    assert len(responses[1].json()) == 2
+    assert responses[1].json()[0]["prediction"] == pytest.approx(17.685669831629962)
+    assert responses[1].json()[1]["prediction"] == pytest.approx(7.89043535267264)
+    assert responses[2].status_code == 200
+    assert len(responses[2].json()["predictions"]) == 1
+    assert responses[2].json()["predictions"][0]["prediction"] == pytest.approx(17.685669831629962)
+    assert responses[2].json()["errors"][0]["index"] == 0
+
+    response = await client.get("/monitored-models/inference/stats")
+    assert response.json()["batching"]["batches"] > batches_before
+
+    response = await client.get(f"/monitored-models/name/{monitored_model_name}")
+    assert len(response.json()["predictions_data"]) == predictions_count + 4
+
+
+@pytest.mark.asyncio
+async def test_get_histogram_chart_data(client: AsyncClient):
+    """
+    Test getting histogram chart bins computed on the server.
+
+    Args:
+        client (AsyncClient): Async client fixture
+
+    Returns:
+        None
+    """
+    monitored_model_name = "Engine failure prediction model v8"
+    response = await client.get(f"/monitored-models/name/{monitored_model_name}")
+    assert response.status_code == 200
+    monitored_model_id = response.json()["_id"]
+    predictions_data = response.json()["predictions_data"]
+    charts = response.json()["interactive_charts"]
+
+    chart = {
+        "chart_type": "histogram",
+        "x_axis_column": "prediction",
+        "bin_method": "sturges"
+    }
+    response = await client.post(f"/monitored-models/{monitored_model_id}/charts", json=chart)
+    assert response.status_code == 201
+    chart_id = response.json()["id"]
+
+    response = await client.get(f"/monitored-models/{monitored_model_id}/charts/{chart_id}/data")
+    assert response.status_code == 200
+    values = [prediction["prediction"] for prediction in predictions_data]
+    assert response.json()["count"] == len(values)
+    assert response.json()["min"] == pytest.approx(min(values))
+    assert response.json()["max"] == pytest.approx(max(values))
+    assert len(response.json()["bins"]) == math.ceil(math.log2(len(values)) + 1)
+    assert sum(histogram_bin[3] for histogram_bin in response.json()["bins"]) == len(values)
+
+    chart = next(chart for chart in charts if chart["chart_type"] == "scatter_with_histograms")
+    response = await client.get(f"/monitored-models/{monitored_model_id}/charts/{chart['id']}/data")
+    assert response.status_code == 200
+    assert len(response.json()["x"]["bins"]) == chart["bin_number"]
+    assert len(response.json()["y"]["bins"]) == chart["bin_number"]
+    assert sum(histogram_bin[3] for histogram_bin in response.json()["y"]["bins"]) == len(predictions_data)
+
+    chart = next(chart for chart in charts if chart["chart_type"] == "countplot")
+    response = await client.get(f"/monitored-models/{monitored_model_id}/charts/{chart['id']}/data")
+    assert response.status_code == 400
+
+
+@pytest.mark.asyncio
+async def test_regression_metrics_follow_actual_changes(client: AsyncClient):
+    """
+    Test regression metrics accumulators updated when actual prediction values are set and deleted.
+
+    Args:
+        client (AsyncClient): Async client fixture
+
+    Returns:
+        None
+    """
+    monitored_model_name = "Engine failure prediction model v4 changed"
+    response = await client.get(f"/monitored-models/name/{monitored_model_name}")
+    monitored_model_id = response.json()["_id"]
+
+    response = await client.post(f"/monitored-models/{monitored_model_id}/predict",
+                                 json=[{"X1": 1, "X2": 2}, {"X1": 3, "X2": 4}, {"X1": 1, "X2": 2}])
+    assert response.status_code == 200
+    predictions = response.json()
+    for prediction, actual in zip(predictions, [8, 16.5, 9]):
+        response = await client.put(f"/monitored-models/{monitored_model_id}/predictions/{prediction['id']}",
+                                    json={"actual": actual})
+        assert response.status_code == 200
+        assert response.json()["actual"] == actual
+
+    response = await client.delete(f"/monitored-models/{monitored_model_id}/predictions/{predictions[2]['id']}/actual")
+    assert response.status_code == 200
+    assert response.json()["actual"] is None
+
+    response = await client.get(f"/monitored-models/name/{monitored_model_name}")
+    with_actual = [prediction for prediction in response.json()["predictions_data"]
+                   if prediction["actual"] is not None]
+    y_true = np.array([prediction["actual"] for prediction in with_actual], dtype=float)
+    y_pred = np.array([prediction["prediction"] for prediction in with_actual], dtype=float)
+
+    response = await client.get(f"/monitored-models/{monitored_model_id}/metrics/regression")
+    assert response.status_code == 200
+    metrics = response.json()
+    assert metrics["count"] == len(with_actual)
+    assert metrics["mse"] == pytest.approx(np.mean((y_true - y_pred) ** 2))
+    assert metrics["mae"] == pytest.approx(np.mean(np.abs(y_true - y_pred)))
+    assert metrics["r2"] == pytest.approx(1 - np.sum((y_true - y_pred) ** 2) / np.sum((y_true - y_true.mean()) ** 2))
+    assert metrics["msle"] == pytest.approx(np.mean((np.log1p(y_true) - np.log1p(y_pred)) ** 2))
+    assert metrics["medae"] == pytest.approx(np.median(np.abs(y_true - y_pred)), rel=0.01)
+    assert metrics["smape"] == pytest.approx(np.mean(np.abs(y_true - y_pred) /
+                                                     ((np.abs(y_true) + np.abs(y_pred)) / 2)))
+
+
+@pytest.mark.asyncio
+async def test_regression_metrics_large_actual_values(client: AsyncClient):
+    """
+    Test r2 of regression metrics precise for actual values with a large constant offset and None for constant
+    actual values, also after the backfill migration rebuilt the accumulators.
+
+    Args:
+        client (AsyncClient): Async client fixture
+
+    Returns:
+        None
+    """
+    offset = 1e9
+    y_true = np.array([1.0, 2.0, 3.0, 4.0])
+    y_pred = np.array([1.5, 2.0, 2.5, 4.0])
+    monitored_model = {
+        "model_name": "Large actual values model",
+        "model_status": "idle",
+        "predictions_data": [{"input_data": {"X1": i}, "prediction": offset + prediction, "actual": offset + actual}
+                             for i, (actual, prediction) in enumerate(zip(y_true, y_pred))]
+    }
+    response = await client.post("/monitored-models/", json=monitored_model)
+    assert response.status_code == 201
+    monitored_model_id = response.json()["_id"]
+    expected_r2 = 1 - np.sum((y_true - y_pred) ** 2) / np.sum((y_true - y_true.mean()) ** 2)
+
+    response = await client.get(f"/monitored-models/{monitored_model_id}/metrics/regression")
+    assert response.json()["r2"] == pytest.approx(expected_r2)
+
+    await MonitoredModel.get_motor_collection().update_one(
+        {"_id": PydanticObjectId(monitored_model_id)}, {"$unset": {"regression_metrics_state": ""}})
+    assert await backfill_metrics_states() == 1
+    response = await client.get(f"/monitored-models/{monitored_model_id}/metrics/regression")
+    assert response.json()["r2"] == pytest.approx(expected_r2)
+
+    monitored_model["model_name"] = "Constant actual values model"
+    for prediction in monitored_model["predictions_data"]:
+        prediction["actual"] = offset + 0.1
+    response = await client.post("/monitored-models/", json=monitored_model)
+    monitored_model_id = response.json()["_id"]
+    response = await client.get(f"/monitored-models/{monitored_model_id}/metrics/regression")
+    assert response.json()["count"] == 4
+    assert response.json()["r2"] is None
+
+
+@pytest.mark.asyncio
+async def test_classification_metrics_follow_actual_changes(client: AsyncClient):
+    """
+    Test confusion matrix counts updated when predictions with actual value are stored and actual values
+    are changed, and rebuilt by the backfill migration.
+
+    Args:
+        client (AsyncClient): Async client fixture
+
+    Returns:
+        None
+    """
+    labels = [(0, 0), (0, 1), (1, 1), (1, 1), (2, 1), (2, 2), (2, 2)]
+    monitored_model = {
+        "model_name": "Classification metrics model",
+        "model_status": "idle",
+        "predictions_data": [{"input_data": {"X1": i}, "prediction": prediction, "actual": actual}
+                             for i, (actual, prediction) in enumerate(labels)]
+    }
+    response = await client.post("/monitored-models/", json=monitored_model)
+    assert response.status_code == 201
+    monitored_model_id = response.json()["_id"]
+    prediction_id = response.json()["predictions_data"][1]["id"]
+
+    response = await client.put(f"/monitored-models/{monitored_model_id}/predictions/{prediction_id}",
+                                json={"actual": 1})
+    assert response.status_code == 200
+    labels[1] = (1, 1)
+
+    response = await client.get(f"/monitored-models/{monitored_model_id}/metrics/classification")
+    assert response.status_code == 200
+    metrics = response.json()
+    assert metrics["count"] == len(labels)
+    assert metrics["labels"] == [0, 1, 2]
+    assert metrics["confusion_matrix"] == [[1, 0, 0], [0, 3, 0], [0, 1, 2]]
+    assert metrics["accuracy"] == pytest.approx(6 / 7)
+    assert metrics["precision"] == pytest.approx((1 + 3 / 4 + 1) / 3)
+    assert metrics["recall"] == pytest.approx((1 + 1 + 2 / 3) / 3)
+    assert metrics["f1score"] == pytest.approx((1 + 6 / 7 + 4 / 5) / 3)
+    assert metrics["mmc"] == pytest.approx((6 * 7 - (1 * 1 + 4 * 3 + 2 * 3)) /
+                                           (math.sqrt(49 - (1 + 9 + 9)) * math.sqrt(49 - (1 + 16 + 4))))
+
+    response = await client.delete(f"/monitored-models/{monitored_model_id}/predictions/{prediction_id}/actual")
+    assert response.status_code == 200
+    response = await client.get(f"/monitored-models/{monitored_model_id}/metrics/classification")
+    assert response.json()["confusion_matrix"] == [[1, 0, 0], [0, 2, 0], [0, 1, 2]]
+
+    await MonitoredModel.get_motor_collection().update_one(
+        {"_id": PydanticObjectId(monitored_model_id)},
+        {"$unset": {"classification_metrics_state": "", "regression_metrics_state": ""}}
+    )
+    assert await backfill_metrics_states() == 2
+    response = await client.get(f"/monitored-models/{monitored_model_id}/metrics/classification")
+    assert response.json()["confusion_matrix"] == [[1, 0, 0], [0, 2, 0], [0, 1, 2]]
+    response = await client.get(f"/monitored-models/{monitored_model_id}/metrics/regression")
+    assert response.json()["count"] == len(labels) - 1
+
+    response = await client.delete(f"/monitored-models/{monitored_model_id}")
+    assert response.status_code == 200
+
+
+@pytest.mark.asyncio
+async def test_get_monitored_models_summary(client: AsyncClient):
+    """
+    Test getting monitored models summaries without predictions and encoded ml models.
+
+    Args:
+        client (AsyncClient): Async client fixture
+
+    Returns:
+        None
+    """
+    response = await client.get("/monitored-models/")
+    monitored_models = {monitored_model["_id"]: monitored_model for monitored_model in response.json()}
+
+    response = await client.get("/monitored-models/summary")
+    assert response.status_code == 200
+    assert len(response.json()) == len(monitored_models)
+    for summary in response.json():
+        monitored_model = monitored_models[summary["_id"]]
+        assert summary["model_name"] == monitored_model["model_name"]
+        assert "predictions_data" not in summary
+        assert summary["predictions_count"] == len(monitored_model["predictions_data"])
+        assert summary["actuals_count"] == len([prediction for prediction in monitored_model["predictions_data"]
+                                                if prediction["actual"] is not None])
+        if monitored_model["iteration"] is not None:
+            assert summary["iteration"]["iteration_name"] == monitored_model["iteration"]["iteration_name"]
+            assert "encoded_ml_model" not in summary["iteration"]
+        if monitored_model["predictions_data"]:
+            assert summary["last_prediction_date"] == max(prediction["prediction_date"]
+                                                          for prediction in monitored_model["predictions_data"])
+
+    response = await client.get("/monitored-models/summary", params={"status": "non-archived"})
+    assert response.status_code == 200
+    assert len(response.json()) == len([monitored_model for monitored_model in monitored_models.values()
+                                        if monitored_model["model_status"] != "archived"])
+
+    response = await client.get("/monitored-models/summary", params={"status": "unknown"})
+    assert response.status_code == 400
+
+
+@pytest.mark.asyncio
+async def test_get_monitored_model_predictions_pages(client: AsyncClient):
+    """
+    Test reading monitored model predictions page by page and within date range.
+
+    Args:
+        client (AsyncClient): Async client fixture
+
+    Returns:
+        None
+    """
+    monitored_model_name = "Engine failure prediction model v4 changed"
+    response = await client.get(f"/monitored-models/name/{monitored_model_name}")
+    monitored_model_id = response.json()["_id"]
+    predictions_data = response.json()["predictions_data"]
+    assert len(predictions_data) > 3
+
+    predictions = []
+    cursor = None
+    while True:
+        params = {"limit": 3}
+        if cursor is not None:
+            params["cursor"] = cursor
+        response = await client.get(f"/monitored-models/{monitored_model_id}/predictions", params=params)
+        assert response.status_code == 200
+        assert len(response.json()["predictions"]) <= 3
+        predictions += response.json()["predictions"]
+        cursor = response.json()["next_cursor"]
+        if cursor is None:
+            break
+    assert [prediction["id"] for prediction in predictions] == [prediction["id"] for prediction in predictions_data]
+
+    from_date = predictions_data[1]["prediction_date"]
+    to_date = predictions_data[-1]["prediction_date"]
+    response = await client.get(f"/monitored-models/{monitored_model_id}/predictions",
+                                params={"from": from_date, "to": to_date})
+    assert response.status_code == 200
+    assert [prediction["id"] for prediction in response.json()["predictions"]] == \
+           [prediction["id"] for prediction in predictions_data if from_date <= prediction["prediction_date"] < to_date]
+
+    response = await client.get(f"/monitored-models/{monitored_model_id}/predictions",
+                                params={"limit": settings.PREDICTIONS_PAGE_MAX_SIZE + 1})
+    assert response.status_code == 422
+    response = await client.get(f"/monitored-models/{monitored_model_id}/predictions", params={"cursor": "bad"})
+    assert response.status_code == 400
+    response = await client.get(f"/monitored-models/{PydanticObjectId()}/predictions")
+    assert response.status_code == 404
+
+
+@pytest.mark.asyncio
+async def test_monitored_model_set_actual_prediction_values(client: AsyncClient):
+    """
+    Test setting actual values of many predictions with one request.
+
+    Args:
+        client (AsyncClient): Async client fixture
+
+    Returns:
+        None
+    """
+    monitored_model_name = "Engine failure prediction model v4 changed"
+    response = await client.get(f"/monitored-models/name/{monitored_model_name}")
+    monitored_model_id = response.json()["_id"]
+    predictions_data = response.json()["predictions_data"]
+    response = await client.get(f"/monitored-models/{monitored_model_id}/metrics/regression")
+    actuals_count = response.json()["count"]
+
+    first = next(prediction for prediction in predictions_data if prediction["actual"] is None)
+    second = next(prediction for prediction in predictions_data if prediction["actual"] is not None)
+    missing_id = str(PydanticObjectId())
+    actuals = [
+        {"prediction_id": first["id"], "actual": 1},
+        {"prediction_id": missing_id, "actual": 2},
+        {"prediction_id": second["id"], "actual": None},
+        {"prediction_id": first["id"], "actual": 10}
+    ]
+    response = await client.put(f"/monitored-models/{monitored_model_id}/predictions/actuals", json=actuals)
+    assert response.status_code == 200
+    assert response.json()["updated"] == 3
+    assert response.json()["not_found"] == 1
+    assert [result["status"] for result in response.json()["results"]] == \
+           ["updated", "not_found", "updated", "updated"]
+    assert response.json()["results"][1]["prediction_id"] == missing_id
+
+    response = await client.get(f"/monitored-models/name/{monitored_model_name}")
+    actual_values = {prediction["id"]: prediction["actual"] for prediction in response.json()["predictions_data"]}
+    assert actual_values[first["id"]] == 10
+    assert actual_values[second["id"]] is None
+
+    response = await client.get(f"/monitored-models/{monitored_model_id}/metrics/regression")
+    assert response.json()["count"] == actuals_count
+
+    response = await client.put(f"/monitored-models/{PydanticObjectId()}/predictions/actuals", json=actuals)
+    assert response.status_code == 404
+
+
+@pytest.mark.asyncio
+async def test_get_timeseries_chart_data_downsampled(client: AsyncClient):
+    """
+    Test getting timeseries chart points downsampled on the server.
+
+    Args:
+        client (AsyncClient): Async client fixture
+
+    Returns:
+        None
+    """
+    start = datetime(2023, 1, 1)
+    values = [math.sin(i / 20) for i in range(500)]
+    values[321] = 10.0
+    values[123] = -10.0
+    monitored_model = {
+        "model_name": "Timeseries downsampling model",
+        "model_status": "idle",
+        "predictions_data": [{"input_data": {"X1": i}, "prediction": value,
+                              "prediction_date": (start + timedelta(minutes=i)).isoformat()}
+                             for i, value in enumerate(values)]
+    }
+    response = await client.post("/monitored-models/", json=monitored_model)
+    assert response.status_code == 201
+    monitored_model_id = response.json()["_id"]
+
+    chart = {"chart_type": "timeseries", "y_axis_columns": ["prediction", "X1"]}
+    response = await client.post(f"/monitored-models/{monitored_model_id}/charts", json=chart)
+    assert response.status_code == 201
+    chart_id = response.json()["id"]
+
+    response = await client.get(f"/monitored-models/{monitored_model_id}/charts/{chart_id}/data")
+    assert response.status_code == 200
+    assert response.json()["count"] == 500
+    assert [point[1] for point in response.json()["series"]["prediction"]] == pytest.approx(values)
+
+    for method in ["lttb", "minmax"]:
+        response = await client.get(f"/monitored-models/{monitored_model_id}/charts/{chart_id}/data",
+                                    params={"width": 50, "downsampling": method})
+        assert response.status_code == 200
+        for points in response.json()["series"].values():
+            assert len(points) <= 50
+            assert [point[0] for point in points] == sorted(point[0] for point in points)
+        points = response.json()["series"]["prediction"]
+        assert max(point[1] for point in points) == 10.0
+        assert min(point[1] for point in points) == -10.0
+        assert datetime.fromisoformat(points[0][0]) == start
+
+    response = await client.get(f"/monitored-models/{monitored_model_id}/charts/{chart_id}/data",
+                                params={"width": 50, "downsampling": "unknown"})
+    assert response.status_code == 400
+
+    response = await client.delete(f"/monitored-models/{monitored_model_id}")
+    assert response.status_code == 200
+
+
+@pytest.mark.asyncio
+async def test_monitored_model_drift_detection(client: AsyncClient):
+    """
+    Test building drift reference, drift history of existing predictions, drift windows of new predictions
+    and data drift chart data.
+
+    Args:
+        client (AsyncClient): Async client fixture
+
+    Returns:
+        None
+    """
+    start = datetime(2023, 1, 1)
+    input_data = [{"X1": i % 10, "X2": "a" if i % 2 else "b"} for i in range(40)] + \
+                 [{"X1": 20 + i % 10, "X2": "c"} for i in range(40)]
+    monitored_model = {
+        "model_name": "Drift detection model",
+        "model_status": "idle",
+        "predictions_data": [{"input_data": sample, "prediction": 0,
+                              "prediction_date": (start + timedelta(minutes=i)).isoformat()}
+                             for i, sample in enumerate(input_data)]
+    }
+    response = await client.post("/monitored-models/", json=monitored_model)
+    assert response.status_code == 201
+    monitored_model_id = response.json()["_id"]
+
+    response = await client.post(f"/monitored-models/{monitored_model_id}/drift/reference",
+                                 json={"source": "predictions", "size": 20, "window_size": 10})
+    assert response.status_code == 201
+    assert response.json()["size"] == 20
+    assert response.json()["columns"]["X1"]["kind"] == "numeric"
+    assert response.json()["columns"]["X2"]["kind"] == "categorical"
+
+    response = await client.get(f"/monitored-models/{monitored_model_id}/drift")
+    assert response.status_code == 200
+    results = response.json()
+    assert len(results) == 6
+    assert [result["predictions_count"] for result in results] == [10] * 6
+    for result in results:
+        for column in result["columns"].values():
+            assert isinstance(column["drifted"], bool)
+            assert isinstance(column["chi2_dof"], int) and not isinstance(column["chi2_dof"], bool)
+            assert isinstance(column["psi"], float)
+    assert results[0]["columns"]["X1"]["chi2_dof"] == 9
+    assert results[0]["columns"]["X2"]["chi2_dof"] == 1
+    for result in results[:2]:
+        assert result["columns"]["X1"]["psi"] == pytest.approx(0, abs=0.01)
+        assert result["columns"]["X1"]["ks"] == pytest.approx(0)
+        assert not result["columns"]["X2"]["drifted"]
+    for result in results[2:]:
+        assert result["columns"]["X1"]["drifted"]
+        assert result["columns"]["X1"]["ks"] > 0.8
+        assert result["columns"]["X2"]["drifted"]
+
+    response = await client.get(f"/monitored-models/{monitored_model_id}/drift",
+                                params={"from": results[2]["window_end"]})
+    assert len(response.json()) == 4
+
+    chart = {"chart_type": "data_drift", "x_axis_column": "X1", "metrics": ["psi", "ks"]}
+    response = await client.post(f"/monitored-models/{monitored_model_id}/charts", json=chart)
+    assert response.status_code == 201
+    response = await client.get(f"/monitored-models/{monitored_model_id}/charts/{response.json()['id']}/data")
+    assert response.status_code == 200
+    assert [window["psi"] for window in response.json()["windows"]] == \
+           pytest.approx([result["columns"]["X1"]["psi"] for result in results])
+    assert "chi2" not in response.json()["windows"][0]
+
+    response = await client.post(f"/monitored-models/{monitored_model_id}/charts",
+                                 json={"chart_type": "data_drift", "x_axis_column": "prediction"})
+    assert response.status_code == 400
+
+    response = await client.post(f"/monitored-models/{monitored_model_id}/drift/reference",
+                                 json={"source": "dataset"})
+    assert response.status_code == 400
+
+    response = await client.delete(f"/monitored-models/{monitored_model_id}")
+    assert response.status_code == 200
+
+    monitored_model_name = "Engine failure prediction model v4 changed"
+    response = await client.get(f"/monitored-models/name/{monitored_model_name}")
+    monitored_model_id = response.json()["_id"]
+    predictions_count = len(response.json()["predictions_data"])
+    response = await client.post(f"/monitored-models/{monitored_model_id}/drift/reference",
+                                 json={"size": 2, "window_size": 2})
+    assert response.status_code == 201
+    response = await client.get(f"/monitored-models/{monitored_model_id}/drift")
+    windows_count = len(response.json())
+    assert windows_count == (predictions_count - 2) // 2
+
+    await client.post(f"/monitored-models/{monitored_model_id}/predict", json=[{"X1": 1, "X2": 2}])
+    await client.post(f"/monitored-models/{monitored_model_id}/predict", json=[{"X1": 1, "X2": 2}])
+    response = await client.get(f"/monitored-models/{monitored_model_id}/drift")
+    assert len(response.json()) == windows_count + 1
+
+    # a batch larger than the window is split at window boundaries
+    open_count = (predictions_count - 2) % 2
+    await client.post(f"/monitored-models/{monitored_model_id}/predict", json=[{"X1": 1, "X2": 2}] * 5)
+    response = await client.get(f"/monitored-models/{monitored_model_id}/drift")
+    assert len(response.json()) == windows_count + 1 + (open_count + 5) // 2
+    assert all(result["predictions_count"] == 2 for result in response.json())
+    monitored_model = await MonitoredModel.get_motor_collection().find_one(
+        {"_id": PydanticObjectId(monitored_model_id)})
+    assert monitored_model["drift_window"]["count"] == (open_count + 5) % 2
+
+
+@pytest.mark.asyncio
+async def test_ml_models_stored_in_artifact_store(client: AsyncClient):
+    """
+    Test ml models of iterations stored once in the artifact store and moved there from existing documents
+    by the migration.
+
+    Args:
+        client (AsyncClient): Async client fixture
+
+    Returns:
+        None
+    """
+    project_title = "Mercedes-Benz Manufacturing Poland"
+    response = await client.get(f"/projects/title/{project_title}")
+    project_id = response.json()["_id"]
+    experiment_name = "Engine failure prediction"
+    response = await client.get(f"/projects/{project_id}/experiments/name/{experiment_name}")
+    experiment_id = response.json()["id"]
+
+    path_to_model = os.path.join(os.path.dirname(__file__), "test_files", "linear_regression_model.pkl")
+    encoded_ml_model = load_ml_model_from_file_and_encode(path_to_model)
+    ml_model_hashes = []
+    for iteration_name in ["Artifact iteration 1", "Artifact iteration 2"]:
+        iteration = {
+            "iteration_name": iteration_name,
+            "path_to_model": path_to_model,
+            "encoded_ml_model": encoded_ml_model
+        }
+        response = await client.post(f"/projects/{project_id}/experiments/{experiment_id}/iterations/",
+                                     json=iteration)
+        assert response.status_code == 201
+        assert response.json()["encoded_ml_model"] is None
+        assert response.json()["ml_model_size"] == len(base64.b64decode(encoded_ml_model))
+        ml_model_hashes.append(response.json()["ml_model_hash"])
+    assert ml_model_hashes[0] == ml_model_hashes[1]
+
+    monitored_model = {
+        "model_name": "Artifact store model",
+        "model_status": "active",
+        "iteration": response.json()
+    }
+    response = await client.post("/monitored-models/", json=monitored_model)
+    assert response.status_code == 201
+    monitored_model_id = response.json()["_id"]
+    response = await client.post(f"/monitored-models/{monitored_model_id}/predict", json=[{"X1": 1, "X2": 2}])
+    assert response.status_code == 200
+    assert response.json()[0]["prediction"] == pytest.approx(7.89043535267264)
+
+    await MonitoredModel.get_motor_collection().update_one(
+        {"_id": PydanticObjectId(monitored_model_id)},
+        {"$set": {"iteration.encoded_ml_model": encoded_ml_model, "iteration.ml_model_hash": None}}
+    )
+    assert await move_ml_models_to_artifact_store() == 1
+    response = await client.get(f"/monitored-models/id/{monitored_model_id}")
+    assert response.json()["iteration"]["encoded_ml_model"] is None
+    assert response.json()["iteration"]["ml_model_hash"] == ml_model_hashes[0]
+
+    response = await client.delete(f"/monitored-models/{monitored_model_id}")
+    assert response.status_code == 200
+
+
+@pytest.mark.asyncio
+async def test_preload_active_monitored_models(client: AsyncClient):
+    """
+    Test preloading and warming up ml models of active monitored models and readiness endpoint.
+
+    Args:
+        client (AsyncClient): Async client fixture
+
+    Returns:
+        None
+    """
+    response = await client.get("/ready")
+    assert response.status_code == 200
+    assert response.json()["ready"]
+
+    path_to_model = os.path.join(os.path.dirname(__file__), "test_files", "linear_regression_model.pkl")
+    project_title = "Mercedes-Benz Manufacturing Poland"
+    response = await client.get(f"/projects/title/{project_title}")
+    project_id = response.json()["_id"]
+    experiment_name = "Engine failure prediction"
+    response = await client.get(f"/projects/{project_id}/experiments/name/{experiment_name}")
+    experiment_id = response.json()["id"]
+    iteration = {
+        "iteration_name": "Warm-up iteration",
+        "path_to_model": path_to_model,
+        "encoded_ml_model": load_ml_model_from_file_and_encode(path_to_model)
+    }
+    response = await client.post(f"/projects/{project_id}/experiments/{experiment_id}/iterations/", json=iteration)
+    monitored_model = {
+        "model_name": "Warm-up model",
+        "model_status": "active",
+        "iteration": response.json()
+    }
+    response = await client.post("/monitored-models/", json=monitored_model)
+    monitored_model_id = response.json()["_id"]
+    response = await client.post(f"/monitored-models/{monitored_model_id}/predict", json=[{"X1": 1, "X2": 2}])
+    assert response.status_code == 200
+
+    preload_task = asyncio.ensure_future(preload_active_monitored_models())
+    model_warmup.start(preload_task)
+    response = await client.get("/ready")
+    assert response.status_code == 503
+    assert response.json()["state"] == "running"
+
+    await preload_task
+    response = await client.get("/ready")
+    assert response.status_code == 200
+    assert response.json()["models"][monitored_model_id]["status"] == "warmed"
+
+    response = await client.get("/monitored-models/model-cache/stats")
+    hits = response.json()["hits"]
+    response = await client.post(f"/monitored-models/{monitored_model_id}/predict", json=[{"X1": 1, "X2": 2}])
+    assert response.status_code == 200
+    response = await client.get("/monitored-models/model-cache/stats")
+    assert response.json()["hits"] == hits + 1
+
+    response = await client.delete(f"/monitored-models/{monitored_model_id}")
+    assert response.status_code == 200
+
+
+@pytest.mark.asyncio
+async def test_monitored_ml_model_predict_stream(client: AsyncClient):
+    """
+    Test monitored model streaming predict with newline-delimited JSON predicted in several batches,
+    with one failing and one invalid line.
+
+    Args:
+        client (AsyncClient): Async client fixture
+
+    Returns:
+        None
+    """
+    monitored_model_name = "Engine failure prediction model v4 changed"
+    response = await client.get(f"/monitored-models/name/{monitored_model_name}")
+    monitored_model_id = response.json()["_id"]
+    predictions_count = len(response.json()["predictions_data"])
+
+    async def body():
+        yield b'{"X1": 1.0, "X2": 2.0}\n{"X1": "bad value", '
+        yield b'"X2": 2.0}\n\nnot json\n'
+        yield b'{"X1": 3.0, "X2": 4.0}\n{"X1": 1.0, "X2": 2.0}'
+
+    response = await client.post(f"/monitored-models/{monitored_model_id}/predict-stream?batch_size=2",
+                                 content=body())
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+
+    lines = [json.loads(line) for line in response.text.splitlines()]
+    predictions = [line for line in lines if "detail" not in line]
+    errors = {line["index"]: line for line in lines if "detail" in line}
+    assert [prediction["prediction"] for prediction in predictions] == \
+           pytest.approx([7.89043535267264, 17.685669831629962, 7.89043535267264])
+    assert sorted(errors) == [1, 2]
+    assert errors[1]["input_data"]["X1"] == "bad value"
+    assert errors[2]["detail"].startswith("Invalid JSON")
+
+    response = await client.get(f"/monitored-models/name/{monitored_model_name}")
+    assert len(response.json()["predictions_data"]) == predictions_count + 3
+
+    response = await client.post(f"/monitored-models/{PydanticObjectId()}/predict-stream", content=b"{}")
+    assert response.status_code == 404
+
+
+@pytest.mark.asyncio
+async def test_export_monitored_model_predictions(client: AsyncClient):
+    """
+    Test export of monitored model predictions as Arrow IPC stream and Parquet file.
+
+    Args:
+        client (AsyncClient): Async client fixture
+
+    Returns:
+        None
+    """
+    monitored_model_name = "Engine failure prediction model v4 changed"
+    response = await client.get(f"/monitored-models/name/{monitored_model_name}")
+    monitored_model_id = response.json()["_id"]
+    predictions_data = response.json()["predictions_data"]
+    assert predictions_data
+
+    response = await client.get(f"/monitored-models/name/{monitored_model_name}",
+                                params={"with_predictions": False})
+    assert response.json()["_id"] == monitored_model_id
+    assert response.json()["predictions_data"] == []
+
+    response = await client.get(f"/monitored-models/{monitored_model_id}/predictions/export")
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/vnd.apache.arrow.stream"
+    table = pa.ipc.open_stream(response.content).read_all()
+    assert table.num_rows == len(predictions_data)
+    assert table.column_names[:4] == ["id", "prediction_date", "prediction", "actual"]
+    assert {"X1", "X2"} <= set(table.column_names)
+    assert set(table.column("id").to_pylist()) == {prediction["id"] for prediction in predictions_data}
+
+    last_date = max(prediction["prediction_date"] for prediction in predictions_data)
+    response = await client.get(f"/monitored-models/{monitored_model_id}/predictions/export",
+                                params={"format": "parquet", "to": last_date})
+    assert response.status_code == 200
+    data = pq.read_table(io.BytesIO(response.content)).to_pandas()
+    assert len(data) == len([prediction for prediction in predictions_data
+                             if prediction["prediction_date"] < last_date])
+
+    response = await client.get(f"/monitored-models/{monitored_model_id}/predictions/export",
+                                params={"format": "csv"})
+    assert response.status_code == 400
+
+    response = await client.get(f"/monitored-models/{PydanticObjectId()}/predictions/export")
+    assert response.status_code == 404
+
+
+@pytest.mark.asyncio
+async def test_monitored_ml_model_predict_with_shadow_models(client: AsyncClient):
+    """
+    Test predictions of shadow monitored models stored under their own monitored models, shadows which do not
+    exist are skipped.
+
+    Args:
+        client (AsyncClient): Async client fixture
+
+    Returns:
+        None
+    """
+    path_to_model = os.path.join(os.path.dirname(__file__), "test_files", "linear_regression_model.pkl")
+    project_title = "Mercedes-Benz Manufacturing Poland"
+    response = await client.get(f"/projects/title/{project_title}")
+    project_id = response.json()["_id"]
+    experiment_name = "Engine failure prediction"
+    response = await client.get(f"/projects/{project_id}/experiments/name/{experiment_name}")
+    experiment_id = response.json()["id"]
+    iteration = {
+        "iteration_name": "Shadow iteration",
+        "path_to_model": path_to_model,
+        "encoded_ml_model": load_ml_model_from_file_and_encode(path_to_model)
+    }
+    response = await client.post(f"/projects/{project_id}/experiments/{experiment_id}/iterations/", json=iteration)
+    monitored_model = {
+        "model_name": "Shadow model",
+        "model_status": "active",
+        "iteration": response.json()
+    }
+    response = await client.post("/monitored-models/", json=monitored_model)
+    shadow_model_id = response.json()["_id"]
+
+    monitored_model_name = "Engine failure prediction model v4 changed"
+    response = await client.get(f"/monitored-models/name/{monitored_model_name}")
+    monitored_model_id = response.json()["_id"]
+    predictions_count = len(response.json()["predictions_data"])
+
+    data = [{"X1": 1.0, "X2": 2.0}, {"X1": 3.0, "X2": 4.0}]
+    response = await client.post(f"/monitored-models/{monitored_model_id}/predict", json=data,
+                                 params={"shadow": [shadow_model_id, str(PydanticObjectId()), monitored_model_id]})
+    assert response.status_code == 200
+    assert len(response.json()) == 2
+
+    response = await client.get(f"/monitored-models/id/{shadow_model_id}")
+    shadow_predictions = response.json()["predictions_data"]
+    assert [prediction["prediction"] for prediction in shadow_predictions] == \
+           pytest.approx([7.89043535267264, 17.685669831629962])
+    response = await client.get(f"/monitored-models/id/{monitored_model_id}")
+    assert len(response.json()["predictions_data"]) == predictions_count + 2
+
+    response = await client.post(f"/monitored-models/{monitored_model_id}/predict-batch",
+                                 json=[{"X1": "bad value", "X2": 4.0}, {"X1": 1.0, "X2": 2.0}],
+                                 params={"shadow": shadow_model_id})
+    assert response.status_code == 200
+    response = await client.get(f"/monitored-models/id/{shadow_model_id}")
+    assert len(response.json()["predictions_data"]) == 3
+
+    response = await client.delete(f"/monitored-models/{shadow_model_id}")
+    assert response.status_code == 200
+
+
+@pytest.mark.asyncio
+async def test_metrics(client: AsyncClient):
+    """
+    Test Prometheus metrics of request latency, predict phases, model cache and batching.
+
+    Args:
+        client (AsyncClient): Async client fixture
+
+    Returns:
+        None
+    """
+    monitored_model_name = "Engine failure prediction model v4 changed"
+    response = await client.get(f"/monitored-models/name/{monitored_model_name}")
+    monitored_model_id = response.json()["_id"]
+    response = await client.post(f"/monitored-models/{monitored_model_id}/predict", json=[{"X1": 1, "X2": 2}])
+    assert response.status_code == 200
+
+    response = await client.get("/metrics")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+    metrics = response.text
+
+    assert '# TYPE mlops_http_request_duration_seconds histogram' in metrics
+    assert ('mlops_http_request_duration_seconds_count{method="POST",route="/monitored-models/{id}/predict",'
+            'status="200"}') in metrics
+    assert ('mlops_http_request_duration_seconds_bucket{method="GET",route="/monitored-models/name/{name}",'
+            'status="200",le="+Inf"}') in metrics
+    for phase in ["db_load", "queue_wait", "predict", "persist"]:
+        assert f'mlops_predict_phase_duration_seconds_count{{model_id="{monitored_model_id}",phase="{phase}"}}' \
+               in metrics
+    assert "mlops_model_cache_hits_total " in metrics
+    assert "mlops_predict_batch_rows_count " in metrics
+    assert "# TYPE mlops_mongodb_command_duration_seconds histogram" in metrics
+    assert f'mlops_model_cache_size {model_cache.stats()["size"]}' in metrics
+
+    missing_model_id = "6500000000000000000000ff"
+    response = await client.post(f"/monitored-models/{missing_model_id}/predict", json=[{"X1": 1, "X2": 2}])
+    assert response.status_code == 404
+    response = await client.get("/metrics")
+    assert f'model_id="{missing_model_id}"' not in response.text
+
+    response = await client.post("/monitored-models/", json={"model_name": "Deleted metrics model",
+                                                              "model_status": "idle"})
+    deleted_model_id = response.json()["_id"]
+    predict_phase_duration.observe(0.01, deleted_model_id, 'predict')
+    response = await client.delete(f"/monitored-models/{deleted_model_id}")
+    assert response.status_code == 200
+    response = await client.get("/metrics")
+    assert f'model_id="{deleted_model_id}"' not in response.text
+
+
+@pytest.mark.asyncio
+async def test_monitored_model_column_schema(client: AsyncClient):
+    """
+    Test column schema kept up to date on ingest, chart validation against it and its backfill by the migration.
+
+    Args:
+        client (AsyncClient): Async client fixture
+
+    Returns:
+        None
+    """
+    monitored_model = await MonitoredModel.find_one(
+        MonitoredModel.model_name == "Engine failure prediction model v4 changed")
+    monitored_model_id = str(monitored_model.id)
+
+    response = await client.get(f"/monitored-models/{monitored_model_id}/column-schema")
+    assert response.status_code == 200
+    column_schema = response.json()
+    assert column_schema["X1"] == {"kind": "numeric", "nullable": False}
+    assert column_schema["X2"] == {"kind": "numeric", "nullable": False}
+    assert column_schema["prediction"] == {"kind": "numeric", "nullable": False}
+    assert column_schema["actual"] == {"kind": "numeric", "nullable": True}
+
+    response = await client.post(f"/monitored-models/{monitored_model_id}/charts",
+                                 json={"chart_type": "histogram", "x_axis_column": "X3",
+                                       "bin_method": "squareRoot"})
+    assert response.status_code == 400
+
+    await MonitoredModel.get_motor_collection().update_one({"_id": monitored_model.id},
+                                                           {"$unset": {"column_schema": ""}})
+    assert await backfill_column_schemas(chunk_size=1) >= 1
+    response = await client.get(f"/monitored-models/{monitored_model_id}/column-schema")
+    assert response.json() == column_schema
+
+    schema = ColumnSchema(rows=3, columns={
+        "name": ColumnStats(types=["string"], count=2),
+        "flag": ColumnStats(types=["bool"], count=3),
+        "value": ColumnStats(types=["int", "string"], count=3)
+    })
+    assert describe_column_schema(schema) == {
+        "name": {"kind": "string", "nullable": True},
+        "flag": {"kind": "categorical", "nullable": False},
+        "value": {"kind": "mixed", "nullable": False},
+        "prediction": {"kind": "numeric", "nullable": False},
+        "actual": {"kind": "numeric", "nullable": True}
+    }
+
+
+@pytest.mark.asyncio
+async def test_compact_monitored_model_predictions(client: AsyncClient):
+    """
+    Test compaction of predictions older than the retention into rollups which are still counted by charts
+    and summaries.
+
+    Args:
+        client (AsyncClient): Async client fixture
+
+    Returns:
+        None
+    """
+    path_to_model = os.path.join(os.path.dirname(__file__), "test_files", "linear_regression_model.pkl")
+    project_title = "Mercedes-Benz Manufacturing Poland"
+    response = await client.get(f"/projects/title/{project_title}")
+    project_id = response.json()["_id"]
+    experiment_name = "Engine failure prediction"
+    response = await client.get(f"/projects/{project_id}/experiments/name/{experiment_name}")
+    experiment_id = response.json()["id"]
+    iteration = {
+        "iteration_name": "Retention iteration",
+        "path_to_model": path_to_model,
+        "encoded_ml_model": load_ml_model_from_file_and_encode(path_to_model)
+    }
+    response = await client.post(f"/projects/{project_id}/experiments/{experiment_id}/iterations/", json=iteration)
+    monitored_model = {
+        "model_name": "Retention model",
+        "model_status": "active",
+        "iteration": response.json()
+    }
+    response = await client.post("/monitored-models/", json=monitored_model)
+    monitored_model_id = response.json()["_id"]
+
+    data = [{"X1": float(x), "X2": float(x + 1)} for x in range(10)]
+    response = await client.post(f"/monitored-models/{monitored_model_id}/predict", json=data)
+    assert response.status_code == 200
+    predictions = response.json()
+    response = await client.put(f"/monitored-models/{monitored_model_id}/predictions/actuals",
+                                json=[{"prediction_id": predictions[0]["id"], "actual": 1.0}])
+    assert response.status_code == 200
+
+    response = await client.post(f"/monitored-models/{monitored_model_id}/predictions/compact")
+    assert response.status_code == 400
+
+    response = await client.post(f"/monitored-models/{monitored_model_id}/charts",
+                                 json={"chart_type": "histogram", "x_axis_column": "X1", "bin_method": "sturges"})
+    histogram_id = response.json()["id"]
+    response = await client.post(f"/monitored-models/{monitored_model_id}/charts",
+                                 json={"chart_type": "timeseries", "y_axis_columns": ["prediction"]})
+    timeseries_id = response.json()["id"]
+    response = await client.get(f"/monitored-models/{monitored_model_id}/charts/{histogram_id}/data")
+    histogram = response.json()
+
+    # the first six predictions were made ten days ago, in two different hours
+    old_date = datetime.now().replace(minute=30) - timedelta(days=10)
+    for index, prediction in enumerate(predictions[:6]):
+        await PredictionRecord.get_motor_collection().update_one(
+            {"_id": PydanticObjectId(prediction["id"])},
+            {"$set": {"prediction_date": old_date + timedelta(hours=index % 2)}})
+
+    response = await client.put(f"/monitored-models/{monitored_model_id}", json={"retention_days": 7})
+    assert response.status_code == 200
+    assert response.json()["retention_days"] == 7
+    assert response.json()["rollup_granularity"] == 'hour'
+
+    response = await client.post(f"/monitored-models/{monitored_model_id}/predictions/compact")
+    assert response.status_code == 200
+    assert response.json()["compacted"] == 6
+    assert response.json()["rollups"] == 2
+    response = await client.post(f"/monitored-models/{monitored_model_id}/predictions/compact")
+    assert response.json()["compacted"] == 0
+
+    rollups = await PredictionRollup.find(
+        PredictionRollup.monitored_model_id == PydanticObjectId(monitored_model_id)).to_list()
+    assert sorted(rollup.predictions_count for rollup in rollups) == [3, 3]
+    assert sum(rollup.actuals_count for rollup in rollups) == 1
+    assert sum(rollup.input_data["X1"].sum for rollup in rollups) == pytest.approx(0 + 1 + 2 + 3 + 4 + 5)
+    assert sum(sum(counts.values()) for rollup in rollups for counts in rollup.confusion_counts.values()) == 0
+
+    response = await client.get(f"/monitored-models/{monitored_model_id}/predictions")
+    assert len(response.json()["predictions"]) == 4
+    response = await client.get(f"/monitored-models/{monitored_model_id}/charts/{histogram_id}/data")
+    compacted_histogram = response.json()
+    assert compacted_histogram["count"] == histogram["count"] == 10
+    assert compacted_histogram["min"] == 0.0
+    assert compacted_histogram["max"] == 9.0
+    assert len(compacted_histogram["bins"]) == len(histogram["bins"])
+    assert sum(bin[3] for bin in compacted_histogram["bins"]) == 10
+    response = await client.get(f"/monitored-models/{monitored_model_id}/charts/{timeseries_id}/data")
+    assert response.json()["count"] == 10
+    assert len(response.json()["series"]["prediction"]) == 2 + 4
+    response = await client.get("/monitored-models/summary")
+    summary = next(summary for summary in response.json() if summary["_id"] == monitored_model_id)
+    assert summary["predictions_count"] == 10
+    assert summary["actuals_count"] == 1
+
+    # compaction holding the lease
+    monitored_models = MonitoredModel.get_motor_collection()
+    await monitored_models.update_one({"_id": PydanticObjectId(monitored_model_id)},
+                                      {"$set": {"compaction_started_at": datetime.now()}})
+    response = await client.post(f"/monitored-models/{monitored_model_id}/predictions/compact")
+    assert response.status_code == 409
+
+    # compaction interrupted after merging prediction 6 into its rollup and before deleting it, with its lease
+    # expired, is finished without merging prediction 6 again
+    await monitored_models.update_one({"_id": PydanticObjectId(monitored_model_id)},
+                                      {"$set": {"compaction_started_at": datetime.now() - timedelta(days=1)}})
+    for prediction in predictions[6:8]:
+        await PredictionRecord.get_motor_collection().update_one(
+            {"_id": PydanticObjectId(prediction["id"])}, {"$set": {"prediction_date": old_date}})
+    await PredictionRecord.get_motor_collection().update_one(
+        {"_id": PydanticObjectId(predictions[6]["id"])}, {"$set": {"compaction_id": "interrupted"}})
+    await PredictionRollup.get_motor_collection().update_one(
+        {"monitored_model_id": PydanticObjectId(monitored_model_id),
+         "bucket_start": old_date.replace(minute=0, second=0, microsecond=0)},
+        {"$inc": {"predictions_count": 1}, "$addToSet": {"compaction_ids": "interrupted"}})
+
+    response = await client.post(f"/monitored-models/{monitored_model_id}/predictions/compact")
+    assert response.status_code == 200
+    assert response.json()["compacted"] == 2
+    response = await client.get("/monitored-models/summary")
+    summary = next(summary for summary in response.json() if summary["_id"] == monitored_model_id)
+    assert summary["predictions_count"] == 10
+    response = await client.get(f"/monitored-models/{monitored_model_id}/predictions")
+    assert len(response.json()["predictions"]) == 2
+    monitored_model = await monitored_models.find_one({"_id": PydanticObjectId(monitored_model_id)})
+    assert monitored_model["compaction_started_at"] is None
+
+    response = await client.delete(f"/monitored-models/{monitored_model_id}")
+    assert response.status_code == 200
+    assert await PredictionRollup.find(
+        PredictionRollup.monitored_model_id == PydanticObjectId(monitored_model_id)).count() == 0
+
+
+@pytest.mark.asyncio
+async def test_monitored_model_scatter_chart_sample(client: AsyncClient):
+    """
+    Test scatter charts served from a uniform or time stratified random sample of predictions with marginal
+    histograms of all predictions.
+
+    Args:
+        client (AsyncClient): Async client fixture
+
+    Returns:
+        None
+    """
+    path_to_model = os.path.join(os.path.dirname(__file__), "test_files", "linear_regression_model.pkl")
+    project_title = "Mercedes-Benz Manufacturing Poland"
+    response = await client.get(f"/projects/title/{project_title}")
+    project_id = response.json()["_id"]
+    experiment_name = "Engine failure prediction"
+    response = await client.get(f"/projects/{project_id}/experiments/name/{experiment_name}")
+    experiment_id = response.json()["id"]
+    iteration = {
+        "iteration_name": "Scatter sample iteration",
+        "path_to_model": path_to_model,
+        "encoded_ml_model": load_ml_model_from_file_and_encode(path_to_model)
+    }
+    response = await client.post(f"/projects/{project_id}/experiments/{experiment_id}/iterations/", json=iteration)
+    monitored_model = {
+        "model_name": "Scatter sample model",
+        "model_status": "active",
+        "iteration": response.json()
+    }
+    response = await client.post("/monitored-models/", json=monitored_model)
+    monitored_model_id = response.json()["_id"]
+
+    data = [{"X1": float(x), "X2": float(2 * x)} for x in range(50)]
+    response = await client.post(f"/monitored-models/{monitored_model_id}/predict", json=data)
+    predictions = response.json()
+
+    # the first ten predictions were made ten days ago
+    ten_days_ago = datetime.now() - timedelta(days=10)
+    for prediction in predictions[:10]:
+        await PredictionRecord.get_motor_collection().update_one(
+            {"_id": PydanticObjectId(prediction["id"])},
+            {"$set": {"prediction_date": ten_days_ago,
+                      "sample_bucket": ten_days_ago.replace(minute=0, second=0, microsecond=0)}})
+
+    response = await client.post(f"/monitored-models/{monitored_model_id}/charts",
+                                 json={"chart_type": "scatter", "x_axis_column": "X1",
+                                       "y_axis_columns": ["X2", "prediction"]})
+    scatter_id = response.json()["id"]
+    response = await client.post(f"/monitored-models/{monitored_model_id}/charts",
+                                 json={"chart_type": "scatter_with_histograms", "x_axis_column": "X1",
+                                       "y_axis_columns": ["X2"], "bin_method": "squareRoot"})
+    scatter_with_histograms_id = response.json()["id"]
+
+    response = await client.get(f"/monitored-models/{monitored_model_id}/charts/{scatter_id}/data",
+                                params={"sample_size": 10})
+    assert response.status_code == 200
+    scatter = response.json()
+    assert scatter["sampling"] == 'uniform'
+    assert scatter["sample_size"] == 10
+    assert len(scatter["series"]["X2"]) == len(scatter["series"]["prediction"]) == 10
+    assert len({x for x, _ in scatter["series"]["X2"]}) == 10
+    assert all(y == 2 * x for x, y in scatter["series"]["X2"])
+
+    response = await client.get(f"/monitored-models/{monitored_model_id}/charts/{scatter_id}/data",
+                                params={"sample_size": 10, "sampling": "stratified", "strata": 2})
+    scatter = response.json()
+    assert scatter["sample_size"] == 10
+    assert len([x for x, _ in scatter["series"]["X2"] if x < 10]) == 5
+
+    # the middle stratum has no predictions and is not sampled
+    response = await client.get(f"/monitored-models/{monitored_model_id}/charts/{scatter_id}/data",
+                                params={"sample_size": 9, "sampling": "stratified", "strata": 3})
+    scatter = response.json()
+    assert scatter["sample_size"] == 6
+    assert len([x for x, _ in scatter["series"]["X2"] if x < 10]) == 3
+
+    response = await client.get(f"/monitored-models/{monitored_model_id}/charts/{scatter_id}/data",
+                                params={"sample_size": 100})
+    assert response.json()["sample_size"] == 50
+    response = await client.get(f"/monitored-models/{monitored_model_id}/charts/{scatter_id}/data",
+                                params={"sampling": "systematic"})
+    assert response.status_code == 400
+
+    response = await client.get(f"/monitored-models/{monitored_model_id}/charts/{scatter_with_histograms_id}/data",
+                                params={"sample_size": 20})
+    scatter_with_histograms = response.json()
+    assert scatter_with_histograms["sample_size"] == 20
+    assert len(scatter_with_histograms["points"]) == 20
+    assert scatter_with_histograms["x"]["count"] == scatter_with_histograms["y"]["count"] == 50
+    assert scatter_with_histograms["y"]["max"] == 98.0
+
+    await PredictionRecord.get_motor_collection().update_many(
+        {"monitored_model_id": PydanticObjectId(monitored_model_id)}, {"$unset": {"sample_key": ""}})
+    assert await backfill_sample_keys(chunk_size=20) == 50
+    assert await PredictionRecord.get_motor_collection().count_documents(
+        {"monitored_model_id": PydanticObjectId(monitored_model_id), "sample_key": {"$type": "double"}}) == 50
+    await PredictionRecord.get_motor_collection().update_many(
+        {"monitored_model_id": PydanticObjectId(monitored_model_id)}, {"$unset": {"sample_bucket": ""}})
+    assert await backfill_sample_buckets(chunk_size=20) == 50
+    assert await PredictionRecord.get_motor_collection().count_documents(
+        {"monitored_model_id": PydanticObjectId(monitored_model_id), "sample_bucket": ten_days_ago.replace(
+            minute=0, second=0, microsecond=0)}) == 10
+
+    response = await client.delete(f"/monitored-models/{monitored_model_id}")
+    assert response.status_code == 200
+
+
+@pytest.mark.asyncio
+async def test_monitored_model_chart_data_column_names(client: AsyncClient):
+    """
+    Test timeseries, histogram and scatter chart data of input data columns with '.' in the name or starting
+    with '$', which are not field paths.
+
+    Args:
+        client (AsyncClient): Async client fixture
+
+    Returns:
+        None
+    """
+    monitored_model = {
+        "model_name": "Column names model",
+        "model_status": "idle",
+        "predictions_data": [{"input_data": {"a.b": float(x), "$c": float(3 * x)}, "prediction": 1}
+                             for x in range(10)]
+    }
+    response = await client.post("/monitored-models/", json=monitored_model)
+    assert response.status_code == 201
+    monitored_model_id = response.json()["_id"]
+
+    chart_ids = []
+    for chart in [{"chart_type": "timeseries", "y_axis_columns": ["a.b", "$c"]},
+                  {"chart_type": "histogram", "x_axis_column": "$c", "bin_method": "fixedNumber", "bin_number": 3},
+                  {"chart_type": "scatter", "x_axis_column": "a.b", "y_axis_columns": ["$c"]}]:
+        response = await client.post(f"/monitored-models/{monitored_model_id}/charts", json=chart)
+        assert response.status_code == 201
+        chart_ids.append(response.json()["id"])
+
+    response = await client.get(f"/monitored-models/{monitored_model_id}/charts/{chart_ids[0]}/data")
+    assert response.status_code == 200
+    assert [value for _, value in response.json()["series"]["a.b"]] == [float(x) for x in range(10)]
+    assert [value for _, value in response.json()["series"]["$c"]] == [float(3 * x) for x in range(10)]
+
+    response = await client.get(f"/monitored-models/{monitored_model_id}/charts/{chart_ids[1]}/data")
+    assert response.status_code == 200
+    assert response.json()["count"] == 10
+    assert response.json()["max"] == 27.0
+
+    response = await client.get(f"/monitored-models/{monitored_model_id}/charts/{chart_ids[2]}/data",
+                                params={"sample_size": 10})
+    assert response.status_code == 200
+    assert sorted(response.json()["series"]["$c"]) == [[float(x), float(3 * x)] for x in range(10)]
+
+
+@pytest.mark.asyncio
+async def test_monitored_model_etag(client: AsyncClient):
+    """
+    Test ETags of monitored models and projects, 304 Not Modified responses to conditional requests and chart data
+    served from the cache until the monitored model changes.
+
+    Args:
+        client (AsyncClient): Async client fixture
+
+    Returns:
+        None
+    """
+    path_to_model = os.path.join(os.path.dirname(__file__), "test_files", "linear_regression_model.pkl")
+    project_title = "Mercedes-Benz Manufacturing Poland"
+    response = await client.get(f"/projects/title/{project_title}")
+    project_id = response.json()["_id"]
+    experiment_name = "Engine failure prediction"
+    response = await client.get(f"/projects/{project_id}/experiments/name/{experiment_name}")
+    experiment_id = response.json()["id"]
+    iteration = {
+        "iteration_name": "ETag iteration",
+        "path_to_model": path_to_model,
+        "encoded_ml_model": load_ml_model_from_file_and_encode(path_to_model)
+    }
+    response = await client.post(f"/projects/{project_id}/experiments/{experiment_id}/iterations/", json=iteration)
+    monitored_model = {
+        "model_name": "ETag model",
+        "model_status": "active",
+        "iteration": response.json()
+    }
+    response = await client.post("/monitored-models/", json=monitored_model)
+    monitored_model_id = response.json()["_id"]
+    await client.post(f"/monitored-models/{monitored_model_id}/predict",
+                      json=[{"X1": float(x), "X2": float(x)} for x in range(5)])
+
+    response = await client.get(f"/monitored-models/id/{monitored_model_id}")
+    etag = response.headers["etag"]
+    response = await client.get(f"/monitored-models/id/{monitored_model_id}", headers={"If-None-Match": etag})
+    assert response.status_code == 304
+    assert response.headers["etag"] == etag
+    assert response.content == b""
+    response = await client.get(f"/monitored-models/id/{monitored_model_id}",
+                                headers={"If-None-Match": f'"other", W/{etag}'})
+    assert response.status_code == 304
+
+    response = await client.get("/monitored-models/")
+    list_etag = response.headers["etag"]
+    response = await client.get("/monitored-models/", headers={"If-None-Match": list_etag})
+    assert response.status_code == 304
+
+    response = await client.post(f"/monitored-models/{monitored_model_id}/charts",
+                                 json={"chart_type": "histogram", "x_axis_column": "X1", "bin_method": "squareRoot"})
+    chart_id = response.json()["id"]
+    response = await client.get(f"/monitored-models/id/{monitored_model_id}", headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.headers["etag"] != etag
+    response = await client.get("/monitored-models/", headers={"If-None-Match": list_etag})
+    assert response.status_code == 200
+
+    chart_data_url = f"/monitored-models/{monitored_model_id}/charts/{chart_id}/data"
+    hits = chart_data_cache.hits
+    response = await client.get(chart_data_url)
+    assert response.json()["count"] == 5
+    chart_etag = response.headers["etag"]
+    response = await client.get(chart_data_url)
+    assert response.json()["count"] == 5
+    assert chart_data_cache.hits == hits + 1
+    response = await client.get(chart_data_url, headers={"If-None-Match": chart_etag})
+    assert response.status_code == 304
+
+    await client.post(f"/monitored-models/{monitored_model_id}/predict", json=[{"X1": 5.0, "X2": 5.0}])
+    response = await client.get(chart_data_url, headers={"If-None-Match": chart_etag})
+    assert response.status_code == 200
+    assert response.json()["count"] == 6
+    assert chart_data_cache.hits == hits + 1
+
+    response = await client.get(f"/projects/{project_id}")
+    project_etag = response.headers["etag"]
+    response = await client.get(f"/projects/{project_id}", headers={"If-None-Match": project_etag})
+    assert response.status_code == 304
+    response = await client.get(f"/projects/{project_id}/experiments/{experiment_id}",
+                                headers={"If-None-Match": project_etag})
+    assert response.status_code == 304
+    await client.put(f"/projects/{project_id}", json={"description": "Engine failures of all production lines"})
+    response = await client.get(f"/projects/{project_id}", headers={"If-None-Match": project_etag})
+    assert response.status_code == 200
+    assert response.headers["etag"] != project_etag
+
+    response = await client.delete(f"/monitored-models/{monitored_model_id}")
+    assert response.status_code == 200
+    response = await client.get(f"/monitored-models/id/{monitored_model_id}", headers={"If-None-Match": etag})
+    assert response.status_code == 404
+
+
+@pytest.mark.asyncio
+async def test_monitored_model_chart_data_not_cached_after_concurrent_write(client: AsyncClient, monkeypatch):
+    """
+    Test chart data not cached when the monitored model version changes while the chart data is computed.
+
+    Args:
+        client (AsyncClient): Async client fixture
+        monkeypatch: Pytest monkeypatch fixture
+
+    Returns:
+        None
+    """
+    monitored_model = {
+        "model_name": "Concurrent write model",
+        "model_status": "idle",
+        "predictions_data": [{"input_data": {"X1": float(x)}, "prediction": 1} for x in range(5)]
+    }
+    response = await client.post("/monitored-models/", json=monitored_model)
+    monitored_model_id = response.json()["_id"]
+    response = await client.post(f"/monitored-models/{monitored_model_id}/charts",
+                                 json={"chart_type": "histogram", "x_axis_column": "X1", "bin_method": "squareRoot"})
+    chart_data_url = f"/monitored-models/{monitored_model_id}/charts/{response.json()['id']}/data"
+
+    compute_chart_data = monitored_model_router_module.compute_chart_data
+
+    async def compute_chart_data_during_write(*args, **kwargs):
+        await MonitoredModel.get_motor_collection().update_one({"_id": PydanticObjectId(monitored_model_id)},
+                                                               {"$inc": {"version": 1}})
+        return await compute_chart_data(*args, **kwargs)
+
+    monkeypatch.setattr(monitored_model_router_module, "compute_chart_data", compute_chart_data_during_write)
+    hits, misses = chart_data_cache.hits, chart_data_cache.misses
+    await client.get(chart_data_url)
+    monkeypatch.setattr(monitored_model_router_module, "compute_chart_data", compute_chart_data)
+    response = await client.get(chart_data_url)
+    assert response.json()["count"] == 5
+    assert (chart_data_cache.hits, chart_data_cache.misses) == (hits, misses + 2)
+    response = await client.get(chart_data_url)
+    assert chart_data_cache.hits == hits + 1
@@ -0,0 +1,203 @@
+import io
+import json
+from datetime import datetime
+from typing import Dict, List, Tuple
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+export_formats = ['arrow', 'parquet']
+
+export_media_types = {
+    'arrow': "application/vnd.apache.arrow.stream",
+    'parquet': "application/vnd.apache.parquet"
+}
+
+# columns of every prediction, input data columns follow them
+PREDICTION_COLUMNS = [
+    ('id', pa.string()),
+    ('prediction_date', pa.timestamp('ms')),
+    ('prediction', pa.float64()),
+    ('actual', pa.float64())
+]
+
+
+def value_type(value: object) -> str:
+    """
+    Get name of the arrow type family of an input data value.
+
+    Args:
+        value: Input data value.
+
+    Returns:
+        'bool', 'int', 'float', 'string', 'timestamp', 'json' or 'null'.
+    """
+    if value is None:
+        return 'null'
+    if isinstance(value, bool):
+        return 'bool'
+    if isinstance(value, int):
+        return 'int' if -2 ** 63 <= value < 2 ** 63 else 'json'
+    if isinstance(value, float):
+        return 'float'
+    if isinstance(value, str):
+        return 'string'
+    if isinstance(value, datetime):
+        return 'timestamp'
+    return 'json'
+
+
+def column_arrow_type(types: set) -> pa.DataType:
+    """
+    Get arrow type of a column holding values of given type families. Integers mixed with floats are stored
+    as floats, any other mix and nested values are stored as JSON strings.
+
+    Args:
+        types: Type families of the column values, see value_type.
+
+    Returns:
+        Arrow data type.
+    """
+    types = types - {'null'}
+    if not types:
+        return pa.string()
+    if types == {'int', 'float'}:
+        return pa.float64()
+    if len(types) > 1:
+        return pa.string()
+    return {
+        'bool': pa.bool_(),
+        'int': pa.int64(),
+        'float': pa.float64(),
+        'string': pa.string(),
+        'timestamp': pa.timestamp('ms'),
+        'json': pa.string()
+    }[types.pop()]
+
+
+def export_schema(input_types: Dict[str, set]) -> Tuple[pa.Schema, List[Tuple[str, str]]]:
+    """
+    Build schema of exported predictions. Input data columns named like prediction columns are prefixed
+    with 'input_data.'.
+
+    Args:
+        input_types: Type families of the values of every input data column.
+
+    Returns:
+        Arrow schema and list of (field name, input data column) pairs of input data columns.
+    """
+    names = {name for name, _ in PREDICTION_COLUMNS}
+    fields = [pa.field(name, data_type) for name, data_type in PREDICTION_COLUMNS]
+    input_columns = []
+    for column in sorted(input_types):
+        name = f"input_data.{column}" if column in names else column
+        fields.append(pa.field(name, column_arrow_type(input_types[column])))
+        input_columns.append((name, column))
+
+    return pa.schema(fields), input_columns
+
+
+def records_to_batch(records: List[dict], schema: pa.Schema, input_columns: List[Tuple[str, str]]) -> pa.RecordBatch:
+    """
+    Convert raw prediction documents to a record batch.
+
+    Args:
+        records: Documents of the prediction_data collection.
+        schema: Schema built by export_schema.
+        input_columns: Input data columns returned by export_schema.
+
+    Returns:
+        Record batch with one row per document.
+    """
+    columns = [
+        [str(record["_id"]) for record in records],
+        [record.get("prediction_date") for record in records],
+        [to_float(record.get("prediction")) for record in records],
+        [to_float(record.get("actual")) for record in records]
+    ]
+    for name, column in input_columns:
+        data_type = schema.field(name).type
+        values = [record.get("input_data", {}).get(column) for record in records]
+        if pa.types.is_string(data_type):
+            values = [value if value is None or isinstance(value, str) else json.dumps(value, default=str)
+                      for value in values]
+        elif pa.types.is_floating(data_type):
+            values = [to_float(value) for value in values]
+        columns.append(values)
+
+    return pa.RecordBatch.from_arrays([pa.array(values, type=field.type) for values, field in zip(columns, schema)],
+                                      schema=schema)
+
+
+def to_float(value: object):
+    return None if value is None else float(value)
+
+
+class _ChunkSink(io.RawIOBase):
+    """
+    Write-only file collecting written bytes until they are drained.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self._chunks = []
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks = []
+        return data
+
+
+class ExportWriter:
+    """
+    Incremental writer of Arrow IPC stream or Parquet file. Encoded bytes are taken out after every batch,
+    so only one batch is held in memory.
+
+    Attributes:
+    - **export_format (str)**: 'arrow' or 'parquet'.
+    - **schema (pa.Schema)**: Schema of written batches.
+    """
+
+    def __init__(self, export_format: str, schema: pa.Schema):
+        if export_format not in export_formats:
+            raise ValueError(f"Unknown export format: {export_format}")
+        self.export_format = export_format
+        self.schema = schema
+        self._sink = _ChunkSink()
+        if export_format == 'arrow':
+            self._writer = pa.ipc.new_stream(self._sink, schema)
+        else:
+            self._writer = pq.ParquetWriter(self._sink, schema)
+
+    def write(self, batch: pa.RecordBatch) -> bytes:
+        """
+        Write record batch, as one row group in case of Parquet.
+
+        Args:
+            batch: Record batch with the schema of the writer.
+
+        Returns:
+            Encoded bytes available so far.
+        """
+        if self.export_format == 'arrow':
+            self._writer.write_batch(batch)
+        else:
+            self._writer.write_table(pa.Table.from_batches([batch], schema=self.schema))
+        return self._sink.drain()
+
+    def close(self) -> bytes:
+        """
+        Finish the stream or file.
+
+        Returns:
+            Remaining encoded bytes.
+        """
+        self._writer.close()
+        return self._sink.drain()
@@ -0,0 +1,110 @@
+import base64
+import hashlib
+import os
+import tempfile
+from pathlib import Path
+from typing import Tuple
+
+from app.config.config import settings
+from app.models.iteration import Iteration
+
+
+class ArtifactStore:
+    """
+    Content-addressed store of ml model artifacts in a local directory.
+
+    Artifacts are keyed by SHA-256 of their content, so identical ml models logged from different iterations
+    are stored once. An artifact is written to a temporary file and renamed, so readers never see partial files.
+
+    Attributes:
+    - **root (Path)**: Directory of the store.
+    """
+
+    def __init__(self, root: str):
+        self.root = Path(root)
+
+    def path(self, artifact_hash: str) -> Path:
+        """
+        Get path of artifact, artifacts are spread into subdirectories by the first two characters of the hash.
+
+        Args:
+            artifact_hash: SHA-256 hex digest of artifact content.
+
+        Returns:
+            Path of artifact file.
+        """
+        if len(artifact_hash) != 64 or any(character not in '0123456789abcdef' for character in artifact_hash):
+            raise ValueError(f"Invalid artifact hash: {artifact_hash}")
+        return self.root / artifact_hash[:2] / artifact_hash
+
+    def put(self, data: bytes) -> Tuple[str, int]:
+        """
+        Store artifact if it is not stored yet.
+
+        Args:
+            data: Artifact content.
+
+        Returns:
+            SHA-256 hex digest and size of artifact.
+        """
+        artifact_hash = hashlib.sha256(data).hexdigest()
+        path = self.path(artifact_hash)
+        if not path.exists():
+            path.parent.mkdir(parents=True, exist_ok=True)
+            file_descriptor, temporary_path = tempfile.mkstemp(dir=path.parent, prefix=".tmp-")
+            try:
+                with os.fdopen(file_descriptor, 'wb') as file:
+                    file.write(data)
+                os.replace(temporary_path, path)
+            except BaseException:
+                if os.path.exists(temporary_path):
+                    os.remove(temporary_path)
+                raise
+        return artifact_hash, len(data)
+
+    def get(self, artifact_hash: str) -> bytes:
+        """
+        Read artifact.
+
+        Args:
+            artifact_hash: SHA-256 hex digest of artifact content.
+
+        Returns:
+            Artifact content.
+
+        Raises:
+            FileNotFoundError: If artifact is not stored.
+        """
+        return self.path(artifact_hash).read_bytes()
+
+    def exists(self, artifact_hash: str) -> bool:
+        """
+        Check if artifact is stored.
+
+        Args:
+            artifact_hash: SHA-256 hex digest of artifact content.
+
+        Returns:
+            True if artifact is stored.
+        """
+        return self.path(artifact_hash).exists()
+
+
+def store_iteration_ml_model(iteration: Iteration) -> Iteration:
+    """
+    Move base64 encoded ml model of iteration to the artifact store, keeping only its hash and size.
+
+    Args:
+        iteration: Iteration, possibly with encoded ml model.
+
+    Returns:
+        The same iteration without encoded ml model.
+    """
+    if iteration is not None and iteration.encoded_ml_model:
+        iteration.ml_model_hash, iteration.ml_model_size = \
+            artifact_store.put(base64.b64decode(iteration.encoded_ml_model.encode("utf-8")))
+        iteration.encoded_ml_model = None
+    return iteration
+
+
+artifact_store = ArtifactStore(settings.ARTIFACT_STORE_PATH)
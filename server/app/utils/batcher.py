@@ -0,0 +1,152 @@
+import asyncio
+from typing import Awaitable, Callable, Hashable, Tuple, Optional
+
+from app.config.config import settings
+from app.models.prediction_data import PredictionData, PredictionError
+from app.utils.metrics import predict_batch_rows, predict_batch_requests
+
+PredictFunction = Callable[[list[dict]], Awaitable[Tuple[list[PredictionData], list[PredictionError]]]]
+
+
+class _PendingBatch:
+    """
+    Requests waiting to be predicted together.
+    """
+
+    def __init__(self, predict: PredictFunction):
+        self.predict = predict
+        self.requests: list[Tuple[list[dict], asyncio.Future]] = []
+        self.rows = 0
+        self.timer: Optional[asyncio.TimerHandle] = None
+
+
+class PredictionBatcher:
+    """
+    Coalesces concurrent prediction requests for the same ml model into one vectorized predict call.
+
+    The first request for a key opens a batch, which is predicted after max_delay seconds or as soon as it holds
+    max_batch_size rows. Results are split back to every request in the order of its samples.
+
+    Attributes:
+    - **max_delay (float)**: Maximum time in seconds a request waits for other requests.
+    - **max_batch_size (int)**: Number of rows which triggers prediction of the batch immediately.
+    """
+
+    def __init__(self, max_delay: float, max_batch_size: int):
+        self.max_delay = max_delay
+        self.max_batch_size = max_batch_size
+        self.batches = 0
+        self.requests = 0
+        self.rows = 0
+        self._pending: dict = {}
+        self._tasks: set = set()
+
+    @staticmethod
+    def columns_signature(data: list[dict]) -> Optional[Tuple[str, ...]]:
+        """
+        Get columns shared by all samples, only samples with the same columns can be merged into one batch.
+
+        Args:
+            data: List of samples.
+
+        Returns:
+            Tuple of column names or None if samples have different columns.
+        """
+        if not data:
+            return None
+        columns = tuple(data[0])
+        if any(tuple(sample) != columns for sample in data):
+            return None
+        return columns
+
+    async def submit(self, key: Hashable, data: list[dict],
+                     predict: PredictFunction) -> Tuple[list[PredictionData], list[PredictionError]]:
+        """
+        Add samples to the batch of given key and wait for their predictions.
+
+        Args:
+            key: Batch key, requests are merged only if they predict with the same ml model and columns.
+            data: List of samples to make prediction on.
+            predict: Function predicting list of samples, the one of the request opening the batch is used.
+
+        Returns:
+            Predictions data of predicted samples and errors of failed samples, indexed within given samples.
+        """
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+
+        batch = self._pending.get(key)
+        if batch is None:
+            batch = self._pending[key] = _PendingBatch(predict)
+            batch.timer = loop.call_later(self.max_delay, self._flush, key)
+
+        batch.requests.append((data, future))
+        batch.rows += len(data)
+        if batch.rows >= self.max_batch_size:
+            self._flush(key)
+
+        return await future
+
+    def _flush(self, key: Hashable) -> None:
+        batch = self._pending.pop(key, None)
+        if batch is None:
+            return
+        batch.timer.cancel()
+
+        task = asyncio.ensure_future(self._predict_batch(batch))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _predict_batch(self, batch: _PendingBatch) -> None:
+        self.batches += 1
+        self.requests += len(batch.requests)
+        self.rows += batch.rows
+        predict_batch_rows.observe(batch.rows)
+        predict_batch_requests.observe(len(batch.requests))
+
+        rows = [sample for data, _ in batch.requests for sample in data]
+        try:
+            predictions_data, errors = await batch.predict(rows)
+        except Exception as e:
+            for _, future in batch.requests:
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        failed = {error.index: error for error in errors}
+        predictions = iter(predictions_data)
+        offset = 0
+        for data, future in batch.requests:
+            request_predictions = []
+            request_errors = []
+            for index in range(len(data)):
+                error = failed.get(offset + index)
+                if error is None:
+                    request_predictions.append(next(predictions))
+                else:
+                    request_errors.append(PredictionError(index=index, input_data=error.input_data,
+                                                          detail=error.detail))
+            offset += len(data)
+            if not future.done():
+                future.set_result((request_predictions, request_errors))
+
+    def stats(self) -> dict:
+        """
+        Get batching statistics.
+
+        Returns:
+            Dictionary with batching settings and numbers of predicted batches, merged requests and rows.
+        """
+        return {
+            'enabled': settings.PREDICT_BATCHING,
+            'max_delay': self.max_delay,
+            'max_batch_size': self.max_batch_size,
+            'batches': self.batches,
+            'requests': self.requests,
+            'rows': self.rows,
+            'avg_requests_per_batch': self.requests / self.batches if self.batches else 0.0
+        }
+
+
+prediction_batcher = PredictionBatcher(max_delay=settings.PREDICT_BATCH_MAX_DELAY_MS / 1000,
+                                       max_batch_size=settings.PREDICT_BATCH_MAX_SIZE)
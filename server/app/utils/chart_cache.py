@@ -0,0 +1,40 @@
+from typing import Hashable, Tuple
+
+from app.config.config import settings
+from app.utils.metrics import metrics_registry
+from app.utils.model_cache import ModelCache
+
+
+class ChartDataCache(ModelCache):
+    """
+    Bounded LRU cache of computed monitored model chart data.
+
+    Entries are keyed by (monitored model id, chart id, monitored model version, query parameters). The version
+    is bumped on every write to the monitored model or its predictions, so entries of older versions are never
+    served and are evicted as new versions are cached.
+    """
+
+    @staticmethod
+    def make_key(monitored_model_id: Hashable, chart_id: Hashable, version: int, *parameters: Hashable) -> Tuple:
+        """
+        Build cache key for given chart of monitored model version.
+
+        Args:
+            monitored_model_id: Monitored model id.
+            chart_id: Chart id.
+            version: Monitored model version.
+            parameters: Query parameters changing the chart data.
+
+        Returns:
+            Cache key.
+        """
+        return (str(monitored_model_id), str(chart_id), version) + parameters
+
+
+chart_data_cache = ChartDataCache(max_size=settings.CHART_DATA_CACHE_SIZE)
+
+metrics_registry.callback("mlops_chart_data_cache_hits_total", "Number of chart data requests served from the cache.",
+                          lambda: {(): chart_data_cache.hits}, metric_type="counter")
+metrics_registry.callback("mlops_chart_data_cache_misses_total",
+                          "Number of chart data requests computed from predictions.",
+                          lambda: {(): chart_data_cache.misses}, metric_type="counter")
@@ -0,0 +1,241 @@
+import math
+from collections import defaultdict
+from typing import Callable, Optional, Tuple
+
+import numpy as np
+
+from app.models.prediction_rollup import ColumnRollup
+from app.utils.regression_metrics import sketch_quantile
+from app.utils.rollups import signed_sketch_bucket, signed_sketch_bucket_value
+
+
+def number_of_bins(values: np.ndarray, bin_method: str, bin_number: Optional[int] = None) -> int:
+    """
+    Calculate number of histogram bins with the same rules as the monitoring charts of the client.
+
+    Args:
+        values: Column values.
+        bin_method: Bin method, one of MonitoredModelInteractiveChart.Settings.bin_methods.
+        bin_number: Number of bins for the fixedNumber bin method.
+
+    Returns:
+        Number of bins, at least 1.
+    """
+    return bins_from_statistics(len(values), bin_method, bin_number,
+                                std=lambda: np.std(values),
+                                quartiles=lambda: np.quantile(values, [0.25, 0.75]),
+                                value_range=lambda: values.max() - values.min())
+
+
+def bins_from_statistics(n: int, bin_method: str, bin_number: Optional[int], std: Callable[[], float],
+                         quartiles: Callable[[], Tuple[float, float]], value_range: Callable[[], float]) -> int:
+    """
+    Calculate number of histogram bins from statistics of column values. Statistics are callables, so only
+    the statistics needed by the bin method are computed.
+
+    Args:
+        n: Number of values.
+        bin_method: Bin method, one of MonitoredModelInteractiveChart.Settings.bin_methods.
+        bin_number: Number of bins for the fixedNumber bin method.
+        std: Standard deviation of values.
+        quartiles: First and third quartile of values.
+        value_range: Difference of maximum and minimum value.
+
+    Returns:
+        Number of bins, at least 1.
+    """
+    if n == 0:
+        return 1
+
+    if bin_method == 'fixedNumber':
+        bins = bin_number
+    elif bin_method == 'squareRoot':
+        bins = math.ceil(math.sqrt(n))
+    elif bin_method == 'sturges':
+        bins = math.ceil(math.log2(n) + 1)
+    else:
+        if bin_method == 'scott':
+            bin_width = 3.5 * std() / n ** (1 / 3)
+        elif bin_method == 'freedmanDiaconis':
+            q1, q3 = quartiles()
+            bin_width = 2 * (q3 - q1) / n ** (1 / 3)
+        else:
+            raise ValueError(f"Unknown bin method: {bin_method}")
+        bins = math.ceil(value_range() / bin_width) if bin_width > 0 else 1
+
+    if bins is None or not np.isfinite(bins):
+        return 1
+    return max(int(bins), 1)
+
+
+def histogram_bins(values: np.ndarray, bin_method: str, bin_number: Optional[int] = None,
+                   rollup: Optional[ColumnRollup] = None) -> dict:
+    """
+    Calculate histogram of column values.
+
+    Args:
+        values: Column values.
+        bin_method: Bin method, one of MonitoredModelInteractiveChart.Settings.bin_methods.
+        bin_number: Number of bins for the fixedNumber bin method.
+        rollup: Summary of compacted values of the column, counted in the histogram together with values.
+            Count, minimum, maximum and standard deviation are exact, quartiles and bins of compacted values
+            are estimated from the quantile sketch.
+
+    Returns:
+        Dictionary with number of values, min and max value and list of
+        [bin start, bin end, bin center, number of values] for every bin.
+    """
+    values = np.asarray(values, dtype=float)
+    if rollup is not None and rollup.count > 0:
+        return rollup_histogram_bins(values, rollup, bin_method, bin_number)
+    if len(values) == 0:
+        return {'count': 0, 'min': None, 'max': None, 'bins': []}
+
+    counts, edges = np.histogram(values, bins=number_of_bins(values, bin_method, bin_number))
+    return histogram_result(len(values), float(values.min()), float(values.max()), counts, edges)
+
+
+def rollup_histogram_bins(values: np.ndarray, rollup: ColumnRollup, bin_method: str,
+                          bin_number: Optional[int] = None) -> dict:
+    n = len(values) + rollup.count
+    minimum = min(rollup.min, values.min()) if len(values) else rollup.min
+    maximum = max(rollup.max, values.max()) if len(values) else rollup.max
+
+    def std() -> float:
+        mean = (rollup.sum + values.sum()) / n
+        return math.sqrt(max((rollup.sum_squared + np.square(values).sum()) / n - mean * mean, 0.0))
+
+    def quartiles() -> Tuple[float, float]:
+        sketch = defaultdict(int, rollup.sketch)
+        for value in values:
+            sketch[signed_sketch_bucket(value)] += 1
+        return tuple(sketch_quantile(sketch, q, signed_sketch_bucket_value) for q in (0.25, 0.75))
+
+    bins = bins_from_statistics(n, bin_method, bin_number, std, quartiles, lambda: maximum - minimum)
+    counts, edges = np.histogram(values, bins=bins, range=(minimum, maximum))
+
+    # every compacted value is counted in the bin of the representative value of its sketch bucket
+    buckets = list(rollup.sketch.items())
+    bucket_values = np.clip([signed_sketch_bucket_value(bucket) for bucket, _ in buckets], minimum, maximum)
+    rollup_counts, _ = np.histogram(bucket_values, bins=edges, weights=[count for _, count in buckets])
+
+    return histogram_result(n, float(minimum), float(maximum), counts + rollup_counts.astype(int), edges)
+
+
+def histogram_result(n: int, minimum: float, maximum: float, counts: np.ndarray, edges: np.ndarray) -> dict:
+    centers = (edges[:-1] + edges[1:]) / 2
+    return {
+        'count': int(n),
+        'min': minimum,
+        'max': maximum,
+        'bins': [[float(start), float(end), float(center), int(count)]
+                 for start, end, center, count in zip(edges[:-1], edges[1:], centers, counts)]
+    }
+
+
+def lttb_indices(x: np.ndarray, y: np.ndarray, threshold: int) -> np.ndarray:
+    """
+    Select points of a series with Largest-Triangle-Three-Buckets downsampling. The first and the last point
+    are always kept, from every bucket in between the point forming the largest triangle with the point selected
+    from the previous bucket and the average of the next bucket is kept, which preserves peaks and visual shape.
+    Triangle areas of a bucket are computed in one vectorized pass.
+
+    Args:
+        x: Sorted x values.
+        y: Y values.
+        threshold: Maximum number of selected points, at least 3.
+
+    Returns:
+        Sorted indices of selected points.
+    """
+    n = len(x)
+    if threshold >= n or threshold < 3:
+        return np.arange(n)
+
+    edges = np.linspace(1, n - 1, threshold - 1).astype(int)
+    selected = np.empty(threshold, dtype=int)
+    selected[0] = 0
+    selected[-1] = n - 1
+
+    previous = 0
+    for bucket in range(threshold - 2):
+        start, end = edges[bucket], edges[bucket + 1]
+        next_start, next_end = end, edges[bucket + 2] if bucket + 2 < len(edges) else n
+        next_x = x[next_start:next_end].mean()
+        next_y = y[next_start:next_end].mean()
+
+        areas = np.abs((x[previous] - next_x) * (y[start:end] - y[previous]) -
+                       (x[previous] - x[start:end]) * (next_y - y[previous]))
+        previous = start + int(np.argmax(areas))
+        selected[bucket + 1] = previous
+
+    return selected
+
+
+def min_max_indices(y: np.ndarray, threshold: int) -> np.ndarray:
+    """
+    Select minimum and maximum point of every bucket of a series in one vectorized pass.
+
+    Args:
+        y: Y values.
+        threshold: Maximum number of selected points, at least 2.
+
+    Returns:
+        Sorted indices of selected points.
+    """
+    n = len(y)
+    if threshold >= n or threshold < 2:
+        return np.arange(n)
+
+    bucket_size = math.ceil(n / (threshold // 2))
+    buckets = math.ceil(n / bucket_size)
+    padded = np.full(buckets * bucket_size, np.nan)
+    padded[:n] = y
+    padded = padded.reshape(buckets, bucket_size)
+
+    offsets = np.arange(buckets) * bucket_size
+    indices = np.concatenate([offsets + np.nanargmin(padded, axis=1), offsets + np.nanargmax(padded, axis=1)])
+    return np.unique(indices)
+
+
+def downsample_series(x: np.ndarray, y: np.ndarray, width: Optional[int], method: str = 'lttb') -> list:
+    """
+    Downsample series to at most width points.
+
+    Args:
+        x: Sorted x values.
+        y: Y values, points with value which is not finite are skipped.
+        width: Maximum number of points, all points if None.
+        method: Downsampling method, 'lttb' or 'minmax'.
+
+    Returns:
+        List of [x, y] points.
+    """
+    finite = np.isfinite(y)
+    x, y = x[finite], y[finite]
+
+    if width is None:
+        indices = np.arange(len(x))
+    elif method == 'lttb':
+        indices = lttb_indices(x.astype(float), y, width)
+    elif method == 'minmax':
+        indices = min_max_indices(y, width)
+    else:
+        raise ValueError(f"Unknown downsampling method: {method}")
+
+    return [[x_value, float(y_value)] for x_value, y_value in zip(x[indices].tolist(), y[indices])]
+
+
+def scatter_points(x: np.ndarray, y: np.ndarray) -> list:
+    """
+    Get scatter chart points.
+
+    Args:
+        x: X values.
+        y: Y values, points with x or y value which is not finite are skipped.
+
+    Returns:
+        List of [x, y] points.
+    """
+    finite = np.isfinite(x) & np.isfinite(y)
+    return [[float(x_value), float(y_value)] for x_value, y_value in zip(x[finite], y[finite])]
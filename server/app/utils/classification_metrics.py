@@ -0,0 +1,142 @@
+import math
+from collections import defaultdict
+from typing import Iterable, Optional, Tuple, Union
+
+from app.models.monitored_model_metrics import ClassificationMetricsState
+from app.utils.field_names import escape_field_name, unescape_field_name
+
+
+def is_class_label(value) -> bool:
+    """
+    Check if value can be a class label. Only integral numbers, strings and booleans are class labels,
+    so predictions of regression models do not fill the confusion matrix with one label per value.
+
+    Args:
+        value: Prediction or actual value.
+
+    Returns:
+        True if value is a class label.
+    """
+    if isinstance(value, (bool, str, int)):
+        return True
+    return isinstance(value, float) and math.isfinite(value) and value.is_integer()
+
+
+def encode_label(label: Union[int, float, str, bool]) -> str:
+    """
+    Encode class label as MongoDB field name. Integral floats are encoded as integers, so 1 and 1.0 are
+    the same class as in the client.
+
+    Args:
+        label: Class label.
+
+    Returns:
+        Escaped label.
+    """
+    if isinstance(label, float):
+        label = int(label)
+    return escape_field_name(str(label))
+
+
+def decode_label(key: str) -> Union[int, str]:
+    """
+    Decode class label encoded with encode_label.
+
+    Args:
+        key: Escaped label.
+
+    Returns:
+        Class label, as a number if it is one.
+    """
+    key = unescape_field_name(key)
+    try:
+        return int(key)
+    except ValueError:
+        return key
+
+
+def classification_state_increments(changes: Iterable[Tuple[object, Optional[object], Optional[object]]]) -> dict:
+    """
+    Get increments of confusion matrix counts for changed actual values.
+
+    Args:
+        changes: Tuples of prediction, previous actual value and new actual value, None if there is no actual.
+
+    Returns:
+        Dictionary of count increments under '<actual label>.<predicted label>', without zero increments.
+    """
+    increments = defaultdict(int)
+    for prediction, old_actual, new_actual in changes:
+        if old_actual == new_actual or not is_class_label(prediction):
+            continue
+        if old_actual is not None and is_class_label(old_actual):
+            increments[f'{encode_label(old_actual)}.{encode_label(prediction)}'] -= 1
+        if new_actual is not None and is_class_label(new_actual):
+            increments[f'{encode_label(new_actual)}.{encode_label(prediction)}'] += 1
+
+    return {field: value for field, value in increments.items() if value != 0}
+
+
+def confusion_matrix(state: ClassificationMetricsState) -> Tuple[list, list[list[int]]]:
+    """
+    Build dense confusion matrix from sparse counts. Rows are actual labels, columns are predicted labels.
+
+    Args:
+        state: Confusion matrix counts.
+
+    Returns:
+        Sorted class labels and confusion matrix.
+    """
+    cells = {(decode_label(actual), decode_label(predicted)): count
+             for actual, row in state.counts.items() for predicted, count in row.items() if count > 0}
+    labels = sorted({label for cell in cells for label in cell}, key=lambda label: (isinstance(label, str), label))
+    index = {label: i for i, label in enumerate(labels)}
+
+    matrix = [[0] * len(labels) for _ in labels]
+    for (actual, predicted), count in cells.items():
+        matrix[index[actual]][index[predicted]] = count
+
+    return labels, matrix
+
+
+def compute_classification_metrics(state: ClassificationMetricsState) -> dict:
+    """
+    Compute classification metrics from confusion matrix counts, the same metrics as classification metrics chart
+    of the client. Precision, recall and f1score are macro averages over classes.
+
+    Args:
+        state: Confusion matrix counts.
+
+    Returns:
+        Dictionary of metrics, all 0 if there is no prediction with actual value.
+    """
+    labels, matrix = confusion_matrix(state)
+    n = sum(map(sum, matrix))
+    if n == 0:
+        return {'count': 0, 'accuracy': 0.0, 'precision': 0.0, 'recall': 0.0, 'f1score': 0.0, 'mmc': 0.0}
+
+    correct = sum(matrix[i][i] for i in range(len(labels)))
+    actual_counts = [sum(row) for row in matrix]
+    predicted_counts = [sum(row[k] for row in matrix) for k in range(len(labels))]
+
+    precisions, recalls, f1scores = [], [], []
+    for i in range(len(labels)):
+        true_positive = matrix[i][i]
+        precision = true_positive / predicted_counts[i] if predicted_counts[i] else 0.0
+        recall = true_positive / actual_counts[i] if actual_counts[i] else 0.0
+        precisions.append(precision)
+        recalls.append(recall)
+        f1scores.append(2 * precision * recall / (precision + recall) if precision + recall else 0.0)
+
+    numerator = correct * n - sum(t * p for t, p in zip(predicted_counts, actual_counts))
+    denominator = math.sqrt(n * n - sum(p * p for p in actual_counts)) * \
+        math.sqrt(n * n - sum(t * t for t in predicted_counts))
+
+    return {
+        'count': n,
+        'accuracy': correct / n,
+        'precision': sum(precisions) / len(labels),
+        'recall': sum(recalls) / len(labels),
+        'f1score': sum(f1scores) / len(labels),
+        'mmc': numerator / denominator if denominator else 0.0
+    }
@@ -0,0 +1,82 @@
+from typing import Dict, List
+
+from app.models.column_schema import ColumnSchema
+from app.utils.arrow_export import value_type
+from app.utils.field_names import escape_field_name, unescape_field_name
+
+column_kinds = ['numeric', 'string', 'categorical', 'mixed']
+
+
+def column_kind(types: List[str]) -> str:
+    """
+    Get kind of a column from type families of its values.
+
+    Args:
+        types: Type families of the column values.
+
+    Returns:
+        'numeric' for integers and floats, 'string' for strings, 'categorical' for booleans and 'mixed' for
+        any other combination, nested values or a column without values.
+    """
+    types = set(types)
+    if types and types <= {'int', 'float'}:
+        return 'numeric'
+    if types == {'string'}:
+        return 'string'
+    if types == {'bool'}:
+        return 'categorical'
+    return 'mixed'
+
+
+def column_schema_update(samples: List[dict]) -> dict:
+    """
+    Build update of the column schema of monitored model with input data of new predictions.
+
+    Args:
+        samples: Input data of new predictions.
+
+    Returns:
+        MongoDB update with $inc of row and value counts and $addToSet of value types, empty if there are no samples.
+    """
+    if not samples:
+        return {}
+
+    counts: Dict[str, int] = {}
+    types: Dict[str, set] = {}
+    for sample in samples:
+        for column, value in sample.items():
+            column_type = value_type(value)
+            if column_type == 'null':
+                types.setdefault(column, set())
+                continue
+            counts[column] = counts.get(column, 0) + 1
+            types.setdefault(column, set()).add(column_type)
+
+    increments = {"column_schema.rows": len(samples)}
+    new_types = {}
+    for column, column_types in types.items():
+        field = f"column_schema.columns.{escape_field_name(column)}"
+        increments[f"{field}.count"] = counts.get(column, 0)
+        new_types[f"{field}.types"] = {"$each": sorted(column_types)}
+
+    return {"$inc": increments, "$addToSet": new_types}
+
+
+def describe_column_schema(column_schema: ColumnSchema) -> Dict[str, dict]:
+    """
+    Describe kind and nullability of every column of monitored model predictions, including prediction and actual.
+
+    Args:
+        column_schema: Column schema of monitored model.
+
+    Returns:
+        Dictionary of column name and its kind and nullable flag.
+    """
+    description = {
+        unescape_field_name(column): {'kind': column_kind(stats.types), 'nullable': stats.count < column_schema.rows}
+        for column, stats in column_schema.columns.items()
+    }
+    if column_schema.rows:
+        description['prediction'] = {'kind': 'numeric', 'nullable': False}
+        description['actual'] = {'kind': 'numeric', 'nullable': True}
+    return description
@@ -0,0 +1,185 @@
+import math
+from collections import defaultdict
+from typing import Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from app.models.drift import DriftColumnReference, DriftReference, DriftWindow
+from app.utils.field_names import escape_field_name, unescape_field_name
+
+# bin of values which are missing or do not fit the kind of the column
+MISSING_BIN = "missing"
+# proportion used instead of 0, so PSI and chi-square are defined for bins empty on one side
+_EPSILON = 1e-4
+
+
+def _is_number(value) -> bool:
+    return isinstance(value, (int, float)) and not isinstance(value, bool) and math.isfinite(value)
+
+
+def build_column_reference(values: list, bins: int) -> DriftColumnReference:
+    """
+    Build reference distribution of column. Columns with only numbers are binned by quantiles of the reference
+    values, other columns are counted per category.
+
+    Args:
+        values: Reference values of the column.
+        bins: Maximum number of bins of numeric column.
+
+    Returns:
+        Column reference.
+    """
+    present = [value for value in values if value is not None]
+    if present and all(_is_number(value) for value in present):
+        quantiles = np.quantile(np.asarray(present, dtype=float), np.linspace(0, 1, bins + 1)[1:-1])
+        reference = DriftColumnReference(kind='numeric', edges=np.unique(quantiles).tolist())
+    else:
+        reference = DriftColumnReference(kind='categorical')
+
+    reference.counts = dict(bin_counts(reference, values))
+    return reference
+
+
+def bin_key(reference: DriftColumnReference, value) -> str:
+    """
+    Get bin of value.
+
+    Args:
+        reference: Column reference.
+        value: Column value.
+
+    Returns:
+        Bin index of numeric column or escaped category, MISSING_BIN if value is missing.
+    """
+    if value is None:
+        return MISSING_BIN
+    if reference.kind == 'numeric':
+        if not _is_number(value):
+            return MISSING_BIN
+        return str(int(np.searchsorted(reference.edges, value, side='right')))
+    return escape_field_name(str(value))
+
+
+def bin_counts(reference: DriftColumnReference, values: Iterable) -> dict:
+    """
+    Count values per bin. Numeric values are binned in one vectorized pass.
+
+    Args:
+        reference: Column reference.
+        values: Column values.
+
+    Returns:
+        Dictionary of number of values per bin.
+    """
+    counts = defaultdict(int)
+    if reference.kind == 'numeric':
+        values = list(values)
+        numbers = np.asarray([value if _is_number(value) else np.nan for value in values], dtype=float)
+        finite = np.isfinite(numbers)
+        indices, index_counts = np.unique(np.searchsorted(reference.edges, numbers[finite], side='right'),
+                                          return_counts=True)
+        for index, count in zip(indices, index_counts):
+            counts[str(int(index))] = int(count)
+        if (~finite).any():
+            counts[MISSING_BIN] = int((~finite).sum())
+    else:
+        for value in values:
+            counts[bin_key(reference, value)] += 1
+    return counts
+
+
+def drift_statistics(reference: DriftColumnReference, window_counts: dict, psi_threshold: float) -> dict:
+    """
+    Compare binned window counts with reference distribution.
+
+    Args:
+        reference: Column reference.
+        window_counts: Number of window values per bin.
+        psi_threshold: PSI above which the column is considered drifted.
+
+    Returns:
+        Dictionary with psi (population stability index), ks (largest distance of cumulative distributions
+        over bin edges, numeric columns only), chi2 (chi-square statistic of window counts against counts
+        expected from reference), chi2_dof (degrees of freedom) and drifted.
+    """
+    keys = sorted(set(reference.counts) | {key for key, count in window_counts.items() if count > 0})
+    reference_counts = np.array([reference.counts.get(key, 0) for key in keys], dtype=float)
+    window = np.array([window_counts.get(key, 0) for key in keys], dtype=float)
+    if reference_counts.sum() == 0 or window.sum() == 0:
+        return {'psi': None, 'ks': None, 'chi2': None, 'chi2_dof': None, 'drifted': None}
+
+    expected_proportions = np.maximum(reference_counts / reference_counts.sum(), _EPSILON)
+    actual_proportions = np.maximum(window / window.sum(), _EPSILON)
+    psi = float(np.sum((actual_proportions - expected_proportions) *
+                       np.log(actual_proportions / expected_proportions)))
+
+    expected = expected_proportions / expected_proportions.sum() * window.sum()
+    chi2 = float(np.sum((window - expected) ** 2 / expected))
+
+    ks = None
+    if reference.kind == 'numeric':
+        ordered = sorted((key for key in keys if key != MISSING_BIN), key=int)
+        reference_cdf = np.cumsum([reference.counts.get(key, 0) for key in ordered], dtype=float)
+        window_cdf = np.cumsum([window_counts.get(key, 0) for key in ordered], dtype=float)
+        if reference_cdf.size and reference_cdf[-1] > 0 and window_cdf[-1] > 0:
+            ks = float(np.max(np.abs(reference_cdf / reference_cdf[-1] - window_cdf / window_cdf[-1])))
+
+    return {'psi': psi, 'ks': ks, 'chi2': chi2, 'chi2_dof': len(keys) - 1, 'drifted': psi > psi_threshold}
+
+
+def add_to_drift_window(reference: DriftReference, window: DriftWindow,
+                        records: list[dict]) -> Tuple[List[DriftWindow], DriftWindow]:
+    """
+    Add predictions to tumbling drift windows. Predictions are split at window boundaries, so every closed window
+    has exactly window_size predictions no matter how predictions are batched.
+
+    Args:
+        reference: Drift reference.
+        window: Drift window which is not closed yet.
+        records: Predictions ordered by prediction date, with input_data and prediction_date.
+
+    Returns:
+        Windows closed by the predictions and the drift window which is not closed yet.
+    """
+    closed = []
+    window = window.copy(deep=True)
+    position = 0
+    while position < len(records):
+        if window.count >= reference.window_size:
+            closed.append(window)
+            window = DriftWindow()
+        chunk = records[position:position + reference.window_size - window.count]
+        position += len(chunk)
+
+        dates = [record["prediction_date"] for record in chunk]
+        window.start = min(dates) if window.start is None else min(window.start, *dates)
+        window.end = max(dates) if window.end is None else max(window.end, *dates)
+        window.count += len(chunk)
+        for column, column_reference in reference.columns.items():
+            counts = window.counts.setdefault(column, {})
+            values = (record["input_data"].get(unescape_field_name(column)) for record in chunk)
+            for key, count in bin_counts(column_reference, values).items():
+                counts[key] = counts.get(key, 0) + count
+
+    if window.count >= reference.window_size:
+        closed.append(window)
+        window = DriftWindow()
+    return closed, window
+
+
+def build_references(samples: list[dict], bins: int, columns: Optional[list] = None) -> dict:
+    """
+    Build reference distributions of all columns of samples.
+
+    Args:
+        samples: Reference samples.
+        bins: Maximum number of bins of numeric columns.
+        columns: Columns to build references of, all columns of samples if None.
+
+    Returns:
+        Column references per escaped column name.
+    """
+    if columns is None:
+        columns = list(dict.fromkeys(column for sample in samples for column in sample))
+    return {escape_field_name(str(column)): build_column_reference([sample.get(column) for sample in samples], bins)
+            for column in columns}
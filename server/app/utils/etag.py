@@ -0,0 +1,116 @@
+import hashlib
+from typing import Hashable, Iterable, Optional, Tuple, Type
+
+from beanie import Document
+from fastapi import HTTPException, Request, Response, status
+
+
+def document_etag(document_id: Hashable, version: int) -> str:
+    """
+    Build entity tag of a versioned document.
+
+    Args:
+        document_id: Document id.
+        version: Document version, bumped on every write.
+
+    Returns:
+        Quoted entity tag.
+    """
+    return f'"{document_id}-{version}"'
+
+
+def documents_etag(versions: Iterable[Tuple[Hashable, int]]) -> str:
+    """
+    Build entity tag of a list of versioned documents, which changes when a document is added, removed,
+    reordered or written.
+
+    Args:
+        versions: Ids and versions of the documents in the order of the list.
+
+    Returns:
+        Quoted entity tag.
+    """
+    digest = hashlib.sha1()
+    for document_id, version in versions:
+        digest.update(f"{document_id}-{version};".encode("utf-8"))
+    return f'"{digest.hexdigest()}"'
+
+
+def etag_matches(request: Request, etag: str) -> bool:
+    """
+    Check if If-None-Match header of request matches entity tag, with the weak comparison used for GET.
+
+    Args:
+        request: Request.
+        etag: Current entity tag.
+
+    Returns:
+        True if the client already has the current representation.
+    """
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    return any(tag.strip().removeprefix("W/") == etag.removeprefix("W/") for tag in header.split(","))
+
+
+def check_etag(request: Request, response: Response, etag: str) -> None:
+    """
+    Set ETag header of response, or respond with 304 Not Modified if the client already has the representation.
+
+    Args:
+        request: Request.
+        response: Response whose headers are sent with the returned representation.
+        etag: Current entity tag.
+    """
+    if etag_matches(request, etag):
+        raise not_modified_exception(etag)
+    response.headers["ETag"] = etag
+
+
+async def check_document_etag(request: Request, response: Response, document_class: Type[Document],
+                              query: dict) -> Optional[int]:
+    """
+    Read only the version of a document and check it against If-None-Match header of request, so the document
+    itself is not read if the client already has it.
+
+    Args:
+        request: Request.
+        response: Response whose headers are sent with the returned representation.
+        document_class: Document class.
+        query: Query matching one document.
+
+    Returns:
+        Version of the document, None if there is no such document.
+    """
+    document = await document_class.get_motor_collection().find_one(query, {"version": 1})
+    if document is None:
+        return None
+    version = document.get("version", 0)
+    check_etag(request, response, document_etag(document["_id"], version))
+    return version
+
+
+async def check_documents_etag(request: Request, response: Response, document_class: Type[Document],
+                               *queries) -> None:
+    """
+    Read only ids and versions of the documents of a list and check them against If-None-Match header of request.
+
+    Args:
+        request: Request.
+        response: Response whose headers are sent with the returned representation.
+        document_class: Document class.
+        queries: Beanie queries of the list, all documents if not given.
+    """
+    cursor = document_class.get_motor_collection().find(document_class.find(*queries).get_filter_query(),
+                                                        {"version": 1})
+    check_etag(request, response, documents_etag([(document["_id"], document.get("version", 0))
+                                                  async for document in cursor]))
+
+
+def not_modified_exception(etag: str):
+    return HTTPException(
+        status_code=status.HTTP_304_NOT_MODIFIED,
+        headers={"ETag": etag}
+    )
@@ -0,0 +1,32 @@
+# characters which cannot be used in MongoDB field names, '%' first so escapes are not escaped again
+_FIELD_NAME_ESCAPES = [('%', '%25'), ('.', '%2E'), ('$', '%24')]
+
+
+def escape_field_name(name: str) -> str:
+    """
+    Escape value used as MongoDB field name, e.g. class label or category.
+
+    Args:
+        name: Field name.
+
+    Returns:
+        Field name without '.' and '$'.
+    """
+    for character, escape in _FIELD_NAME_ESCAPES:
+        name = name.replace(character, escape)
+    return name
+
+
+def unescape_field_name(name: str) -> str:
+    """
+    Reverse escape_field_name.
+
+    Args:
+        name: Escaped field name.
+
+    Returns:
+        Original field name.
+    """
+    for character, escape in reversed(_FIELD_NAME_ESCAPES):
+        name = name.replace(escape, character)
+    return name
@@ -0,0 +1,249 @@
+import asyncio
+import io
+import multiprocessing
+import pickle
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+from typing import Optional, Tuple
+
+import pandas as pd
+
+from app.config.config import settings
+from app.models.prediction_data import PredictionData, PredictionError
+from app.utils.artifact_store import artifact_store
+from app.utils.metrics import predict_phase_duration
+
+
+class CustomUnpickler(pickle.Unpickler):
+    def find_class(self, module, name):
+        if name == 'MonitoredModelWrapper':
+            from app.models.monitored_model_wrapper import MonitoredModelWrapper
+            return MonitoredModelWrapper
+        if name == 'BaselineNN':
+            from app.models.monitored_model_wrapper import BaselineNN
+            return BaselineNN
+        return super().find_class(module, name)
+
+
+def predict_samples(ml_model: object, data: list[dict]) -> Tuple[list[PredictionData], list[PredictionError]]:
+    """
+    Predict all samples with one vectorized predict call. If the vectorized call fails, samples are predicted
+    one by one to find out which of them cannot be predicted.
+
+    Args:
+        ml_model: Ml model complied with scikit-learn API.
+        data: List of samples to make prediction on.
+
+    Returns:
+        Predictions data of predicted samples and errors of failed samples, both in the order of samples.
+    """
+    if not data:
+        return [], []
+
+    try:
+        predictions = ml_model.predict(pd.DataFrame(data))
+        if len(predictions) != len(data):
+            raise ValueError(f"Expected {len(data)} predictions, got {len(predictions)}")
+        predictions_data = [PredictionData(input_data=sample, prediction=prediction)
+                            for sample, prediction in zip(data, predictions)]
+        return predictions_data, []
+    except Exception:
+        pass
+
+    predictions_data = []
+    errors = []
+    for index, sample in enumerate(data):
+        try:
+            prediction = ml_model.predict(pd.DataFrame([sample]))[0]
+            predictions_data.append(PredictionData(input_data=sample, prediction=prediction))
+        except Exception as e:
+            errors.append(PredictionError(index=index, input_data=sample, detail=str(e)))
+
+    return predictions_data, errors
+
+
+class _ModelNotLoaded:
+    """
+    Marker returned by a process pool worker which has no decoded ml model for given cache key yet.
+    """
+
+
+# decoded ml models of the current process pool worker, keyed by model cache key
+_worker_models: OrderedDict = OrderedDict()
+
+
+def _predict_in_worker(cache_key: Tuple, ml_model_hash: Optional[str], data: list[dict]):
+    """
+    Process pool task. Predict samples with the ml model preloaded in the worker, reading it from the artifact
+    store first if the ml model hash is sent along.
+    """
+    started_at = time.monotonic()
+    ml_model = _worker_models.get(cache_key)
+    if ml_model is None:
+        if ml_model_hash is None:
+            return _ModelNotLoaded, started_at, time.monotonic()
+        ml_model = CustomUnpickler(io.BytesIO(artifact_store.get(ml_model_hash))).load()
+        _worker_models[cache_key] = ml_model
+        while len(_worker_models) > max(settings.MODEL_CACHE_SIZE, 1):
+            _worker_models.popitem(last=False)
+    else:
+        _worker_models.move_to_end(cache_key)
+
+    result = predict_samples(ml_model, data)
+    return result, started_at, time.monotonic()
+
+
+def _predict_in_thread(ml_model: object, data: list[dict]):
+    """
+    Thread pool task. Predict samples with already decoded ml model.
+    """
+    started_at = time.monotonic()
+    result = predict_samples(ml_model, data)
+    return result, started_at, time.monotonic()
+
+
+class InferenceEngine:
+    """
+    Runs ml model predictions outside the event loop.
+
+    Models that release the GIL while predicting (most of numpy, scikit-learn and torch code) run in a thread pool.
+    Other models run in a process pool, where every worker keeps its own LRU of decoded ml models, so a worker
+    reads the ml model from the artifact store only the first time it sees it.
+
+    Attributes:
+    - **thread_pool_size (int)**: Number of threads used for predictions.
+    - **process_pool_size (int)**: Number of processes used for predictions.
+    """
+
+    executors = ['thread', 'process']
+
+    def __init__(self, thread_pool_size: int, process_pool_size: int):
+        self.thread_pool_size = thread_pool_size
+        self.process_pool_size = process_pool_size
+        self._thread_pool: Optional[ThreadPoolExecutor] = None
+        self._process_pool: Optional[ProcessPoolExecutor] = None
+        self._pools_lock = threading.Lock()
+        self._stats: dict = {}
+        self._stats_lock = threading.Lock()
+
+    def _get_thread_pool(self) -> ThreadPoolExecutor:
+        with self._pools_lock:
+            if self._thread_pool is None:
+                self._thread_pool = ThreadPoolExecutor(max_workers=self.thread_pool_size,
+                                                       thread_name_prefix="inference")
+            return self._thread_pool
+
+    def _get_process_pool(self) -> ProcessPoolExecutor:
+        with self._pools_lock:
+            if self._process_pool is None:
+                self._process_pool = ProcessPoolExecutor(max_workers=self.process_pool_size,
+                                                         mp_context=multiprocessing.get_context("spawn"))
+            return self._process_pool
+
+    async def predict_in_thread(self, model_id: str, ml_model: object,
+                                data: list[dict]) -> Tuple[list[PredictionData], list[PredictionError]]:
+        """
+        Predict samples in the thread pool.
+
+        Args:
+            model_id: Monitored model id, used for statistics.
+            ml_model: Decoded ml model.
+            data: List of samples to make prediction on.
+
+        Returns:
+            Predictions data of predicted samples and errors of failed samples.
+        """
+        loop = asyncio.get_running_loop()
+        submitted_at = time.monotonic()
+        result, started_at, finished_at = await loop.run_in_executor(self._get_thread_pool(), _predict_in_thread,
+                                                                     ml_model, data)
+        self._record(model_id, 'thread', started_at - submitted_at, finished_at - started_at)
+        return result
+
+    async def predict_in_process(self, model_id: str, cache_key: Tuple, ml_model_hash: str,
+                                 data: list[dict]) -> Tuple[list[PredictionData], list[PredictionError]]:
+        """
+        Predict samples in the process pool.
+
+        Args:
+            model_id: Monitored model id, used for statistics.
+            cache_key: Model cache key identifying the ml model in the workers.
+            ml_model_hash: Artifact store hash of the ml model, sent to a worker which has not loaded it yet.
+            data: List of samples to make prediction on.
+
+        Returns:
+            Predictions data of predicted samples and errors of failed samples.
+        """
+        loop = asyncio.get_running_loop()
+        process_pool = self._get_process_pool()
+        submitted_at = time.monotonic()
+        result, started_at, finished_at = await loop.run_in_executor(process_pool, _predict_in_worker,
+                                                                     cache_key, None, data)
+        if result is _ModelNotLoaded:
+            result, started_at, finished_at = await loop.run_in_executor(process_pool, _predict_in_worker,
+                                                                         cache_key, ml_model_hash, data)
+        self._record(model_id, 'process', started_at - submitted_at, finished_at - started_at)
+        return result
+
+    def _record(self, model_id: str, executor: str, queue_wait: float, execution: float) -> None:
+        predict_phase_duration.observe(max(queue_wait, 0.0), model_id, 'queue_wait')
+        predict_phase_duration.observe(execution, model_id, 'predict')
+        with self._stats_lock:
+            model_stats = self._stats.setdefault(model_id, {
+                'executor': executor,
+                'predictions': 0,
+                'queue_wait_total': 0.0,
+                'queue_wait_max': 0.0,
+                'execution_total': 0.0,
+                'execution_max': 0.0
+            })
+            model_stats['executor'] = executor
+            model_stats['predictions'] += 1
+            model_stats['queue_wait_total'] += max(queue_wait, 0.0)
+            model_stats['queue_wait_max'] = max(model_stats['queue_wait_max'], queue_wait)
+            model_stats['execution_total'] += execution
+            model_stats['execution_max'] = max(model_stats['execution_max'], execution)
+
+    def stats(self) -> dict:
+        """
+        Get queue wait and execution time statistics per monitored model, in seconds.
+
+        Returns:
+            Dictionary with pool sizes and statistics of every monitored model.
+        """
+        with self._stats_lock:
+            models = {}
+            for model_id, model_stats in self._stats.items():
+                count = model_stats['predictions']
+                models[model_id] = {
+                    'executor': model_stats['executor'],
+                    'predictions': count,
+                    'queue_wait_avg': model_stats['queue_wait_total'] / count,
+                    'queue_wait_max': model_stats['queue_wait_max'],
+                    'execution_avg': model_stats['execution_total'] / count,
+                    'execution_max': model_stats['execution_max']
+                }
+
+        return {
+            'thread_pool_size': self.thread_pool_size,
+            'process_pool_size': self.process_pool_size,
+            'models': models
+        }
+
+    def shutdown(self) -> None:
+        """
+        Shut down thread and process pools.
+        """
+        with self._pools_lock:
+            if self._thread_pool is not None:
+                self._thread_pool.shutdown(wait=False)
+                self._thread_pool = None
+            if self._process_pool is not None:
+                self._process_pool.shutdown(wait=False, cancel_futures=True)
+                self._process_pool = None
+
+
+inference_engine = InferenceEngine(thread_pool_size=settings.INFERENCE_THREAD_POOL_SIZE,
+                                   process_pool_size=settings.INFERENCE_PROCESS_POOL_SIZE)
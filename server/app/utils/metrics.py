@@ -0,0 +1,274 @@
+import bisect
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterator, List, Sequence, Tuple
+
+from pymongo import monitoring
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# seconds, from sub-millisecond database commands to slow predictions of large batches
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+SIZE_BUCKETS = (1, 2, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+
+
+def _format_labels(labelnames: Sequence[str], labelvalues: Sequence[str], extra: str = "") -> str:
+    labels = [f'{name}="{escape_label_value(value)}"' for name, value in zip(labelnames, labelvalues)]
+    if extra:
+        labels.append(extra)
+    return "{" + ",".join(labels) + "}" if labels else ""
+
+
+def escape_label_value(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Counter:
+    """
+    Monotonically increasing counter with labels.
+
+    Attributes:
+    - **name (str)**: Metric name.
+    - **documentation (str)**: Help text.
+    - **labelnames (Tuple[str, ...])**: Label names.
+    """
+
+    metric_type = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values: Dict[Tuple[str, ...], float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, *labelvalues: str, amount: float = 1) -> None:
+        with self._lock:
+            self._values[labelvalues] = self._values.get(labelvalues, 0) + amount
+
+    def samples(self) -> List[str]:
+        with self._lock:
+            values = list(self._values.items())
+        return [f"{self.name}{_format_labels(self.labelnames, labelvalues)} {_format_value(value)}"
+                for labelvalues, value in values]
+
+
+class Histogram:
+    """
+    Histogram of observed values with labels. Only the bucket of an observation is incremented, cumulative
+    bucket counts are computed when the metric is rendered.
+
+    Attributes:
+    - **name (str)**: Metric name.
+    - **documentation (str)**: Help text.
+    - **labelnames (Tuple[str, ...])**: Label names.
+    - **buckets (Tuple[float, ...])**: Upper bounds of the buckets, without +Inf.
+    """
+
+    metric_type = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                 buckets: Sequence[float] = LATENCY_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(sorted(buckets))
+        self._values: Dict[Tuple[str, ...], list] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, *labelvalues: str) -> None:
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            state = self._values.get(labelvalues)
+            if state is None:
+                # bucket counts including +Inf, sum
+                state = self._values[labelvalues] = [[0] * (len(self.buckets) + 1), 0.0]
+            state[0][index] += 1
+            state[1] += value
+
+    @contextmanager
+    def time(self, *labelvalues: str) -> Iterator[None]:
+        """
+        Observe duration of the block in seconds.
+        """
+        started_at = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started_at, *labelvalues)
+
+    def remove(self, **labels: str) -> int:
+        """
+        Remove all series with given label values, e.g. series of a deleted monitored model.
+
+        Returns:
+            Number of removed series.
+        """
+        indexes = {self.labelnames.index(name): str(value) for name, value in labels.items()}
+        with self._lock:
+            removed = [labelvalues for labelvalues in self._values
+                       if all(labelvalues[index] == value for index, value in indexes.items())]
+            for labelvalues in removed:
+                del self._values[labelvalues]
+        return len(removed)
+
+    def samples(self) -> List[str]:
+        with self._lock:
+            values = [(labelvalues, list(counts), total) for labelvalues, (counts, total) in self._values.items()]
+
+        lines = []
+        for labelvalues, counts, total in values:
+            cumulative = 0
+            for upper_bound, count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += count
+                le = f'le="{_format_value(upper_bound)}"'
+                lines.append(f"{self.name}_bucket{_format_labels(self.labelnames, labelvalues, le)} {cumulative}")
+            labels = _format_labels(self.labelnames, labelvalues)
+            lines.append(f"{self.name}_sum{labels} {_format_value(total)}")
+            lines.append(f"{self.name}_count{labels} {cumulative}")
+        return lines
+
+
+class CallbackGauge:
+    """
+    Gauge or counter whose values are read from a callback when the metric is rendered, so keeping it up
+    to date costs nothing on the hot path.
+
+    Attributes:
+    - **name (str)**: Metric name.
+    - **documentation (str)**: Help text.
+    - **labelnames (Tuple[str, ...])**: Label names.
+    - **metric_type (str)**: 'gauge' or 'counter'.
+    """
+
+    def __init__(self, name: str, documentation: str, callback: Callable[[], Dict[Tuple[str, ...], float]],
+                 labelnames: Sequence[str] = (), metric_type: str = "gauge"):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.metric_type = metric_type
+        self.callback = callback
+
+    def samples(self) -> List[str]:
+        return [f"{self.name}{_format_labels(self.labelnames, labelvalues)} {_format_value(value)}"
+                for labelvalues, value in self.callback().items()]
+
+
+class MetricsRegistry:
+    """
+    In-process registry of metrics rendered in the Prometheus text exposition format.
+    """
+
+    def __init__(self):
+        self._metrics: list = []
+
+    def register(self, metric):
+        self._metrics.append(metric)
+        return metric
+
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self.register(Counter(name, documentation, labelnames))
+
+    def histogram(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                  buckets: Sequence[float] = LATENCY_BUCKETS) -> Histogram:
+        return self.register(Histogram(name, documentation, labelnames, buckets))
+
+    def callback(self, name: str, documentation: str, callback: Callable[[], Dict[Tuple[str, ...], float]],
+                 labelnames: Sequence[str] = (), metric_type: str = "gauge") -> CallbackGauge:
+        return self.register(CallbackGauge(name, documentation, callback, labelnames, metric_type))
+
+    def render(self) -> str:
+        """
+        Render all metrics.
+
+        Returns:
+            Metrics in the Prometheus text exposition format.
+        """
+        lines = []
+        for metric in self._metrics:
+            lines.append(f"# HELP {metric.name} {metric.documentation}")
+            lines.append(f"# TYPE {metric.name} {metric.metric_type}")
+            lines.extend(metric.samples())
+        return "\n".join(lines) + "\n"
+
+
+metrics_registry = MetricsRegistry()
+
+http_request_duration = metrics_registry.histogram(
+    "mlops_http_request_duration_seconds", "HTTP request latency by route.", ["method", "route", "status"])
+predict_phase_duration = metrics_registry.histogram(
+    "mlops_predict_phase_duration_seconds",
+    "Predict latency of monitored models split into db_load, decode, unpickle, queue_wait, predict and persist "
+    "phases. Series of a monitored model are removed when it is deleted.", ["model_id", "phase"])
+predict_batch_rows = metrics_registry.histogram(
+    "mlops_predict_batch_rows", "Number of samples predicted by one merged batch.", buckets=SIZE_BUCKETS)
+predict_batch_requests = metrics_registry.histogram(
+    "mlops_predict_batch_requests", "Number of requests merged into one batch.", buckets=SIZE_BUCKETS)
+predictions_compacted = metrics_registry.counter(
+    "mlops_predictions_compacted_total", "Number of predictions compacted into rollups after retention.")
+predictions_compaction_failures = metrics_registry.counter(
+    "mlops_predictions_compaction_failures_total", "Number of failed compactions of monitored model predictions.")
+mongodb_command_duration = metrics_registry.histogram(
+    "mlops_mongodb_command_duration_seconds", "MongoDB command latency.", ["command"])
+mongodb_command_failures = metrics_registry.counter(
+    "mlops_mongodb_command_failures_total", "Number of failed MongoDB commands.", ["command"])
+
+
+class MetricsMiddleware:
+    """
+    ASGI middleware observing latency of every HTTP request, labelled with route path template, so requests
+    of all monitored models share the same series.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        started_at = time.perf_counter()
+        response_status = [500]
+
+        async def send_with_status(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                response_status[0] = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            route = scope.get("route")
+            route_path = getattr(route, "path", None) or "unmatched"
+            http_request_duration.observe(time.perf_counter() - started_at, scope["method"], route_path,
+                                          str(response_status[0]))
+
+
+class MongoCommandListener(monitoring.CommandListener):
+    """
+    Pymongo command listener observing latency of every MongoDB command.
+    """
+
+    def started(self, event: monitoring.CommandStartedEvent) -> None:
+        pass
+
+    def succeeded(self, event: monitoring.CommandSucceededEvent) -> None:
+        mongodb_command_duration.observe(event.duration_micros / 1e6, event.command_name)
+
+    def failed(self, event: monitoring.CommandFailedEvent) -> None:
+        mongodb_command_duration.observe(event.duration_micros / 1e6, event.command_name)
+        mongodb_command_failures.inc(event.command_name)
+
+
+mongo_command_listener = MongoCommandListener()
+
@@ -0,0 +1,136 @@
+import threading
+from collections import OrderedDict
+from typing import Hashable, Optional, Tuple
+
+from app.config.config import settings
+from app.utils.metrics import metrics_registry
+
+
+class ModelCache:
+    """
+    Bounded LRU cache of decoded ml models.
+
+    Entries are keyed by (monitored model id, iteration id, blob hash), so a model whose encoded blob changes
+    is never served from a stale entry even before it is explicitly invalidated.
+
+    Attributes:
+    - **max_size (int)**: Maximum number of decoded models kept in memory.
+    - **hits (int)**: Number of lookups served from the cache.
+    - **misses (int)**: Number of lookups that were not in the cache.
+    - **evictions (int)**: Number of entries removed because the cache was full.
+    """
+
+    def __init__(self, max_size: int):
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def make_key(monitored_model_id: Hashable, iteration_id: Hashable, ml_model_hash: str) -> Tuple:
+        """
+        Build cache key for given monitored model, iteration and ml model.
+
+        Args:
+            monitored_model_id: Monitored model id.
+            iteration_id: Iteration id.
+            ml_model_hash: SHA-256 of the pickled ml model.
+
+        Returns:
+            Cache key.
+        """
+        return str(monitored_model_id), str(iteration_id), ml_model_hash
+
+    def get(self, key: Tuple) -> Optional[object]:
+        """
+        Get decoded ml model from cache and mark it as recently used.
+
+        Args:
+            key: Cache key.
+
+        Returns:
+            Decoded ml model or None if not cached.
+        """
+        with self._lock:
+            ml_model = self._entries.get(key)
+            if ml_model is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return ml_model
+
+    def put(self, key: Tuple, ml_model: object) -> None:
+        """
+        Put decoded ml model into cache, evicting the least recently used entries if needed.
+
+        Args:
+            key: Cache key.
+            ml_model: Decoded ml model.
+        """
+        if self.max_size <= 0:
+            return
+
+        with self._lock:
+            self._entries[key] = ml_model
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate(self, monitored_model_id: Hashable) -> int:
+        """
+        Remove all cached ml models of given monitored model.
+
+        Args:
+            monitored_model_id: Monitored model id.
+
+        Returns:
+            Number of removed entries.
+        """
+        monitored_model_id = str(monitored_model_id)
+        with self._lock:
+            keys = [key for key in self._entries if key[0] == monitored_model_id]
+            for key in keys:
+                del self._entries[key]
+            return len(keys)
+
+    def clear(self) -> None:
+        """
+        Remove all entries and reset counters.
+        """
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+            self.evictions = 0
+
+    def stats(self) -> dict:
+        """
+        Get cache statistics.
+
+        Returns:
+            Dictionary with cache size, size limit and hit/miss/eviction counters.
+        """
+        with self._lock:
+            return {
+                'size': len(self._entries),
+                'max_size': self.max_size,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions
+            }
+
+
+model_cache = ModelCache(max_size=settings.MODEL_CACHE_SIZE)
+
+metrics_registry.callback("mlops_model_cache_hits_total", "Number of ml model lookups served from the model cache.",
+                          lambda: {(): model_cache.hits}, metric_type="counter")
+metrics_registry.callback("mlops_model_cache_misses_total", "Number of ml model lookups missing the model cache.",
+                          lambda: {(): model_cache.misses}, metric_type="counter")
+metrics_registry.callback("mlops_model_cache_evictions_total", "Number of ml models evicted from the model cache.",
+                          lambda: {(): model_cache.evictions}, metric_type="counter")
+metrics_registry.callback("mlops_model_cache_size", "Number of decoded ml models in the model cache.",
+                          lambda: {(): model_cache.stats()['size']})
@@ -0,0 +1,69 @@
+import json
+from typing import AsyncIterator, Optional, Tuple
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import StreamingResponse
+from starlette.types import Receive, Scope, Send
+
+
+class NDJSONResponse(StreamingResponse):
+    """
+    Streaming response with one JSON document per line.
+
+    The content iterator may read the request body while the response is streamed, so unlike StreamingResponse
+    it does not listen for the client disconnect, which would consume request body messages.
+    """
+    media_type = "application/x-ndjson"
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        await self.stream_response(send)
+
+        if self.background is not None:
+            await self.background()
+
+
+def ndjson_line(item: object) -> bytes:
+    """
+    Encode item as one line of newline-delimited JSON.
+
+    Args:
+        item: Pydantic model or JSON compatible object.
+
+    Returns:
+        Encoded line ending with newline.
+    """
+    return (json.dumps(jsonable_encoder(item)) + "\n").encode("utf-8")
+
+
+async def iter_ndjson_samples(chunks: AsyncIterator[bytes]) -> AsyncIterator[Tuple[Optional[dict], Optional[str]]]:
+    """
+    Parse newline-delimited JSON samples as the chunks of the request body arrive. Only the current incomplete
+    line is buffered, empty lines are skipped.
+
+    Args:
+        chunks: Chunks of the request body.
+
+    Returns:
+        Async iterator of (sample, None) for every valid line and (None, error detail) for every line which
+        is not a JSON object.
+    """
+    buffer = b""
+    async for chunk in chunks:
+        buffer += chunk
+        *lines, buffer = buffer.split(b"\n")
+        for line in lines:
+            if line.strip():
+                yield parse_ndjson_sample(line)
+
+    if buffer.strip():
+        yield parse_ndjson_sample(buffer)
+
+
+def parse_ndjson_sample(line: bytes) -> Tuple[Optional[dict], Optional[str]]:
+    try:
+        sample = json.loads(line)
+    except ValueError as e:
+        return None, f"Invalid JSON: {e}"
+    if not isinstance(sample, dict):
+        return None, "Sample has to be a JSON object"
+    return sample, None
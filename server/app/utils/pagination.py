@@ -0,0 +1,41 @@
+import base64
+import json
+from datetime import datetime
+from typing import Tuple
+
+from beanie import PydanticObjectId
+
+
+def encode_cursor(prediction_date: datetime, prediction_id: PydanticObjectId) -> str:
+    """
+    Encode keyset pagination cursor pointing after given prediction.
+
+    Args:
+        prediction_date: Prediction date of the last prediction of the page.
+        prediction_id: Id of the last prediction of the page.
+
+    Returns:
+        Opaque URL safe cursor.
+    """
+    payload = json.dumps([prediction_date.isoformat(), str(prediction_id)])
+    return base64.urlsafe_b64encode(payload.encode("utf-8")).decode("utf-8")
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, PydanticObjectId]:
+    """
+    Decode keyset pagination cursor.
+
+    Args:
+        cursor: Cursor returned with the previous page.
+
+    Returns:
+        Prediction date and id of the last prediction of the previous page.
+
+    Raises:
+        ValueError: If the cursor is not valid.
+    """
+    try:
+        prediction_date, prediction_id = json.loads(base64.urlsafe_b64decode(cursor.encode("utf-8")))
+        return datetime.fromisoformat(prediction_date), PydanticObjectId(prediction_id)
+    except Exception as e:
+        raise ValueError(f"Invalid cursor: {cursor}") from e
@@ -0,0 +1,206 @@
+import math
+from collections import defaultdict
+from typing import Callable, Iterable, Optional, Tuple
+
+from app.models.monitored_model_metrics import RegressionMetricsState
+
+# relative accuracy of the absolute errors quantile sketch, medae is within 1% of the exact median
+SKETCH_RELATIVE_ACCURACY = 0.01
+_SKETCH_GAMMA = (1 + SKETCH_RELATIVE_ACCURACY) / (1 - SKETCH_RELATIVE_ACCURACY)
+_SKETCH_LOG_GAMMA = math.log(_SKETCH_GAMMA)
+_SKETCH_ZERO_BUCKET = "zero"
+# total sum of squares smaller than this fraction of the sum of squared shifted actual values is rounding error
+TOTAL_SUM_OF_SQUARES_RELATIVE_EPSILON = 1e-9
+
+
+def sketch_bucket(value: float) -> str:
+    """
+    Get quantile sketch bucket of non-negative value. Bucket i holds values from gamma^(i-1) to gamma^i.
+
+    Args:
+        value: Non-negative value.
+
+    Returns:
+        Bucket key.
+    """
+    if value <= 0:
+        return _SKETCH_ZERO_BUCKET
+    return str(math.ceil(math.log(value) / _SKETCH_LOG_GAMMA))
+
+
+def sketch_bucket_value(bucket: str) -> float:
+    """
+    Get representative value of quantile sketch bucket.
+
+    Args:
+        bucket: Bucket key.
+
+    Returns:
+        Value within relative accuracy of every value of the bucket.
+    """
+    if bucket == _SKETCH_ZERO_BUCKET:
+        return 0.0
+    return 2 * _SKETCH_GAMMA ** int(bucket) / (_SKETCH_GAMMA + 1)
+
+
+def sketch_quantile(sketch: dict, q: float,
+                    bucket_value: Callable[[str], float] = sketch_bucket_value) -> Optional[float]:
+    """
+    Estimate q-quantile from quantile sketch, interpolating between the two closest ranks like numpy does.
+
+    Args:
+        sketch: Quantile sketch, bucket key to count.
+        q: Quantile.
+        bucket_value: Function getting representative value of bucket key.
+
+    Returns:
+        Estimated q-quantile or None if the sketch is empty.
+    """
+    buckets = sorted(((bucket_value(bucket), count) for bucket, count in sketch.items() if count > 0))
+    total = sum(count for _, count in buckets)
+    if total == 0:
+        return None
+
+    def value_at(rank: int) -> float:
+        seen = 0
+        for value, count in buckets:
+            seen += count
+            if seen > rank:
+                return value
+        return buckets[-1][0]
+
+    rank = q * (total - 1)
+    lower = math.floor(rank)
+    fraction = rank - lower
+    if fraction == 0:
+        return value_at(lower)
+    return (1 - fraction) * value_at(lower) + fraction * value_at(lower + 1)
+
+
+def regression_contribution(prediction: float, actual: float, actual_shift: float = 0.0) -> dict:
+    """
+    Get contribution of one prediction with actual value to regression metrics accumulators.
+
+    Args:
+        prediction: Predicted value.
+        actual: Actual value.
+        actual_shift: Value subtracted from actual value in sums of actual values.
+
+    Returns:
+        Dictionary of accumulator increments, absolute error sketch bucket under 'absolute_error_sketch.<bucket>'.
+    """
+    error = actual - prediction
+    absolute_error = abs(error)
+    denominator = (abs(actual) + abs(prediction)) / 2
+
+    shifted_actual = actual - actual_shift
+    contribution = {
+        'count': 1,
+        'sum_actual': shifted_actual,
+        'sum_actual_squared': shifted_actual * shifted_actual,
+        'sum_squared_error': error * error,
+        'sum_absolute_error': absolute_error,
+        'sum_smape': absolute_error / denominator if denominator != 0 else 0.0,
+        f'absolute_error_sketch.{sketch_bucket(absolute_error)}': 1
+    }
+    if actual > -1 and prediction > -1:
+        contribution['sum_squared_log_error'] = (math.log1p(actual) - math.log1p(prediction)) ** 2
+    else:
+        contribution['log_error_undefined_count'] = 1
+
+    return contribution
+
+
+def regression_actual_shift(changes: Iterable[Tuple[float, Optional[float], Optional[float]]]) -> Optional[float]:
+    """
+    Get actual shift of empty regression metrics accumulators, the first new actual value of changes.
+
+    Args:
+        changes: Tuples of prediction, previous actual value and new actual value, None if there is no actual.
+
+    Returns:
+        First new actual value or None if no actual value is set.
+    """
+    return next((float(new_actual) for _, _, new_actual in changes if new_actual is not None), None)
+
+
+def regression_state_increments(changes: Iterable[Tuple[float, Optional[float], Optional[float]]],
+                                actual_shift: Optional[float] = None) -> dict:
+    """
+    Get increments of regression metrics accumulators for changed actual values.
+
+    Args:
+        changes: Tuples of prediction, previous actual value and new actual value, None if there is no actual.
+        actual_shift: Actual shift of the accumulators, None for accumulators summing actual values unshifted.
+
+    Returns:
+        Dictionary of accumulator increments, without zero increments.
+    """
+    actual_shift = actual_shift or 0.0
+    increments = defaultdict(float)
+    for prediction, old_actual, new_actual in changes:
+        if old_actual == new_actual:
+            continue
+        if old_actual is not None:
+            for field, value in regression_contribution(prediction, old_actual, actual_shift).items():
+                increments[field] -= value
+        if new_actual is not None:
+            for field, value in regression_contribution(prediction, new_actual, actual_shift).items():
+                increments[field] += value
+
+    return {field: (int(value) if field in ('count', 'log_error_undefined_count') or
+                    field.startswith('absolute_error_sketch.') else value)
+            for field, value in increments.items() if value != 0}
+
+
+def regression_state_update(changes: Iterable[Tuple[float, Optional[float], Optional[float]]]) -> dict:
+    """
+    Get update of empty regression metrics accumulators adding changed actual values, with the first new actual
+    value as actual shift.
+
+    Args:
+        changes: Tuples of prediction, previous actual value and new actual value, None if there is no actual.
+
+    Returns:
+        Dictionary of update operators, actual shift under '$set' and accumulator increments under '$inc'.
+    """
+    changes = list(changes)
+    actual_shift = regression_actual_shift(changes)
+    return {'$set': {'actual_shift': actual_shift}, '$inc': regression_state_increments(changes, actual_shift)}
+
+
+def compute_regression_metrics(state: RegressionMetricsState) -> dict:
+    """
+    Compute regression metrics from accumulators, the same metrics as regression metrics chart of the client.
+    Actual values are summed shifted by the first actual value, which keeps the total sum of squares of r2
+    precise for large actual values, and a total sum of squares within rounding error of zero is zero.
+
+    Args:
+        state: Regression metrics accumulators.
+
+    Returns:
+        Dictionary of metrics, all 0 if there is no prediction with actual value. r2 is None if all actual values
+        are the same and msle and rmsle are None if an actual value or prediction is not greater than -1.
+    """
+    n = state.count
+    if n <= 0:
+        return {'count': 0, 'r2': 0.0, 'mse': 0.0, 'rmse': 0.0, 'mae': 0.0, 'msle': 0.0, 'rmsle': 0.0,
+                'medae': 0.0, 'smape': 0.0}
+
+    mse = max(state.sum_squared_error, 0.0) / n
+    total_sum_of_squares = state.sum_actual_squared - state.sum_actual * state.sum_actual / n
+    if total_sum_of_squares <= TOTAL_SUM_OF_SQUARES_RELATIVE_EPSILON * state.sum_actual_squared:
+        total_sum_of_squares = 0.0
+    msle = max(state.sum_squared_log_error, 0.0) / n if state.log_error_undefined_count == 0 else None
+
+    return {
+        'count': n,
+        'r2': 1 - state.sum_squared_error / total_sum_of_squares if total_sum_of_squares > 0 else None,
+        'mse': mse,
+        'rmse': math.sqrt(mse),
+        'mae': state.sum_absolute_error / n,
+        'msle': msle,
+        'rmsle': math.sqrt(msle) if msle is not None else None,
+        'medae': sketch_quantile(state.absolute_error_sketch, 0.5),
+        'smape': state.sum_smape / n
+    }
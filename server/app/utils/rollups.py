@@ -0,0 +1,189 @@
+import math
+from collections import defaultdict
+from datetime import datetime, timedelta
+from typing import Dict, Iterable
+
+from app.models.prediction_rollup import ColumnRollup
+from app.utils.classification_metrics import classification_state_increments
+from app.utils.field_names import escape_field_name
+from app.utils.regression_metrics import sketch_bucket, sketch_bucket_value
+
+rollup_granularities = {
+    'hour': timedelta(hours=1),
+    'day': timedelta(days=1)
+}
+
+_NEGATIVE_SKETCH_PREFIX = "n"
+
+
+def bucket_floor(date: datetime, granularity: str) -> datetime:
+    """
+    Get start of the rollup bucket of a date.
+
+    Args:
+        date: Prediction date.
+        granularity: 'hour' or 'day'.
+
+    Returns:
+        Start of the hour or day.
+    """
+    if granularity not in rollup_granularities:
+        raise ValueError(f"Unknown rollup granularity: {granularity}")
+    date = date.replace(minute=0, second=0, microsecond=0)
+    return date.replace(hour=0) if granularity == 'day' else date
+
+
+def retention_cutoff(now: datetime, retention_days: int, granularity: str) -> datetime:
+    """
+    Get date before which predictions are compacted. The cutoff is aligned to the start of a bucket, so only
+    complete buckets are compacted.
+
+    Args:
+        now: Current date.
+        retention_days: Number of days raw predictions are kept.
+        granularity: 'hour' or 'day'.
+
+    Returns:
+        Start of the bucket containing the date retention_days before now.
+    """
+    return bucket_floor(now - timedelta(days=retention_days), granularity)
+
+
+def signed_sketch_bucket(value: float) -> str:
+    """
+    Get quantile sketch bucket of a value of any sign. Negative values are kept in the bucket of their absolute
+    value prefixed with 'n'.
+
+    Args:
+        value: Value.
+
+    Returns:
+        Bucket key.
+    """
+    if value < 0:
+        return _NEGATIVE_SKETCH_PREFIX + sketch_bucket(-value)
+    return sketch_bucket(value)
+
+
+def signed_sketch_bucket_value(bucket: str) -> float:
+    """
+    Get representative value of a bucket of signed_sketch_bucket.
+
+    Args:
+        bucket: Bucket key.
+
+    Returns:
+        Value within relative accuracy of every value of the bucket.
+    """
+    if bucket.startswith(_NEGATIVE_SKETCH_PREFIX):
+        return -sketch_bucket_value(bucket[len(_NEGATIVE_SKETCH_PREFIX):])
+    return sketch_bucket_value(bucket)
+
+
+def is_number(value) -> bool:
+    return isinstance(value, (int, float)) and not isinstance(value, bool) and math.isfinite(value)
+
+
+class RollupAccumulator:
+    """
+    In-memory aggregate of predictions of one rollup bucket, written to the database as one update, so only
+    the aggregate is held in memory while predictions of the bucket are read.
+
+    Attributes:
+    - **count (int)**: Number of added predictions.
+    - **actuals_count (int)**: Number of added predictions with actual value.
+    """
+
+    def __init__(self):
+        self.count = 0
+        self.actuals_count = 0
+        self._columns: Dict[str, dict] = {}
+        self._confusion_counts: Dict[str, int] = defaultdict(int)
+
+    def add(self, record: dict) -> None:
+        """
+        Add prediction to the aggregate.
+
+        Args:
+            record: Document of the prediction_data collection.
+        """
+        self.count += 1
+        prediction = record.get("prediction")
+        actual = record.get("actual")
+
+        self._add_value("prediction", prediction)
+        if actual is not None:
+            self.actuals_count += 1
+            self._add_value("actual", actual)
+            for field, increment in classification_state_increments([(prediction, None, actual)]).items():
+                self._confusion_counts[field] += increment
+        for column, value in (record.get("input_data") or {}).items():
+            self._add_value(f"input_data.{escape_field_name(column)}", value)
+
+    def _add_value(self, path: str, value) -> None:
+        if not is_number(value):
+            return
+        column = self._columns.get(path)
+        if column is None:
+            column = self._columns[path] = {'count': 0, 'sum': 0.0, 'sum_squared': 0.0, 'min': value, 'max': value,
+                                            'sketch': defaultdict(int)}
+        column['count'] += 1
+        column['sum'] += value
+        column['sum_squared'] += value * value
+        column['min'] = min(column['min'], value)
+        column['max'] = max(column['max'], value)
+        column['sketch'][signed_sketch_bucket(value)] += 1
+
+    def update(self) -> dict:
+        """
+        Build update of the rollup document merging the aggregate into what is already stored in it.
+
+        Returns:
+            MongoDB update with $inc of counts, sums and sketches and $min and $max of column values.
+        """
+        increments = {"predictions_count": self.count, "actuals_count": self.actuals_count}
+        minimums = {}
+        maximums = {}
+        for path, column in self._columns.items():
+            increments[f"{path}.count"] = column['count']
+            increments[f"{path}.sum"] = column['sum']
+            increments[f"{path}.sum_squared"] = column['sum_squared']
+            for bucket, count in column['sketch'].items():
+                increments[f"{path}.sketch.{bucket}"] = count
+            minimums[f"{path}.min"] = column['min']
+            maximums[f"{path}.max"] = column['max']
+        for field, count in self._confusion_counts.items():
+            if count:
+                increments[f"confusion_counts.{field}"] = count
+
+        update = {"$inc": increments}
+        if minimums:
+            update["$min"] = minimums
+            update["$max"] = maximums
+        return update
+
+
+def merge_column_rollups(rollups: Iterable[ColumnRollup]) -> ColumnRollup:
+    """
+    Merge summaries of one column of several rollup buckets.
+
+    Args:
+        rollups: Column summaries.
+
+    Returns:
+        Summary of all values of the column.
+    """
+    merged = ColumnRollup()
+    sketch = defaultdict(int)
+    for rollup in rollups:
+        if rollup.count == 0:
+            continue
+        merged.count += rollup.count
+        merged.sum += rollup.sum
+        merged.sum_squared += rollup.sum_squared
+        merged.min = rollup.min if merged.min is None else min(merged.min, rollup.min)
+        merged.max = rollup.max if merged.max is None else max(merged.max, rollup.max)
+        for bucket, count in rollup.sketch.items():
+            sketch[bucket] += count
+    merged.sketch = dict(sketch)
+    return merged
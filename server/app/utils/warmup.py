@@ -0,0 +1,95 @@
+import asyncio
+import time
+from typing import Optional
+
+
+class ModelWarmup:
+    """
+    Tracks preloading of active monitored models into the model cache after startup.
+
+    The server is ready once the preload task finished, whether every monitored model could be loaded or not,
+    so one broken ml model does not keep the whole server out of the load balancer.
+
+    Attributes:
+    - **state (str)**: One of 'pending', 'running' or 'ready'.
+    - **started_at (Optional[float])**: Monotonic time of the preload start.
+    - **finished_at (Optional[float])**: Monotonic time of the preload end.
+    """
+
+    states = ['pending', 'running', 'ready']
+
+    def __init__(self):
+        self.state = 'pending'
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+        self._models: dict = {}
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def is_ready(self) -> bool:
+        return self.state == 'ready'
+
+    def start(self, task: Optional[asyncio.Task] = None) -> None:
+        """
+        Mark preload as running. Without a task there is nothing to preload and the server is ready at once.
+
+        Args:
+            task: Background task preloading the models, it has to call finish when done.
+        """
+        self._models = {}
+        self.started_at = time.monotonic()
+        self.finished_at = None
+        self._task = task
+        if task is None:
+            self.finish()
+        else:
+            self.state = 'running'
+
+    def record(self, monitored_model_id: str, status: str, seconds: float, detail: Optional[str] = None) -> None:
+        """
+        Record preload result of one monitored model.
+
+        Args:
+            monitored_model_id: Monitored model id.
+            status: 'loaded', 'warmed' or 'failed'.
+            seconds: Time spent on loading and warming up the ml model.
+            detail: Error message of failed preload.
+        """
+        self._models[monitored_model_id] = {'status': status, 'seconds': seconds, 'detail': detail}
+
+    def finish(self) -> None:
+        """
+        Mark preload as finished.
+        """
+        self.state = 'ready'
+        self.finished_at = time.monotonic()
+        self._task = None
+
+    def cancel(self) -> None:
+        """
+        Cancel running preload task.
+        """
+        if self._task is not None and not self._task.done():
+            self._task.cancel()
+        self._task = None
+
+    def stats(self) -> dict:
+        """
+        Get preload state.
+
+        Returns:
+            Dictionary with readiness, state, duration and preload result of every monitored model.
+        """
+        duration = None
+        if self.started_at is not None:
+            duration = (self.finished_at or time.monotonic()) - self.started_at
+
+        return {
+            'ready': self.is_ready,
+            'state': self.state,
+            'duration': duration,
+            'models': dict(self._models)
+        }
+
+
+model_warmup = ModelWarmup()
@@ -0,0 +1,325 @@
+"""
+Benchmark of the prediction path.
+
+The FastAPI app is started in-process with asgi_lifespan and driven through httpx, the same way as in tests,
+so no server has to be running. Data is stored in a dedicated database of the local MongoDB from .env, or
+in memory with --in-memory, which requires mongomock-motor. Ml models are stored in a temporary artifact store,
+so the run leaves nothing behind.
+
+For every model, scenario, concurrency and batch size, the report holds p50/p95/p99 request latency in
+milliseconds, requests and rows per second, resident set size of the process after the scenario and its change
+during the scenario, sampled from /proc/self/statm, so memory held by earlier scenarios is not attributed to later
+ones. RSS is None where /proc is not available. Results are written as JSON, so results of two versions can be
+diffed.
+
+Usage (from the server directory):
+    python -m benchmarks.predict_path --concurrency 1 8 --batch-sizes 1 100 --requests 200 --output results.json
+"""
+import argparse
+import asyncio
+import base64
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import tempfile
+import time
+import uuid
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, List, Optional
+
+import numpy as np
+from asgi_lifespan import LifespanManager
+from httpx import AsyncClient
+
+SERVER_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+REPOSITORY_DIR = os.path.dirname(SERVER_DIR)
+
+# test models with a generator of input samples, actual values and the column plotted by chart scenario
+MODELS = {
+    'linear_regression': {
+        'path': os.path.join(SERVER_DIR, "app", "tests", "routers", "test_files", "linear_regression_model.pkl"),
+        'sample': lambda rng: {"X1": rng.uniform(0, 10), "X2": rng.uniform(0, 10)},
+        'actual': lambda rng: rng.uniform(0, 40),
+        'chart_column': "X1"
+    },
+    'rf_iris': {
+        'path': os.path.join(REPOSITORY_DIR, "library", "tests", "test_files", "rf_iris.pkl"),
+        'sample': lambda rng: {"sepal-length": rng.uniform(4.3, 7.9), "sepal-width": rng.uniform(2.0, 4.4),
+                               "petal-length": rng.uniform(1.0, 6.9), "petal-width": rng.uniform(0.1, 2.5)},
+        'actual': lambda rng: rng.randint(0, 2),
+        'chart_column': "petal-length"
+    }
+}
+
+# chart scenario measures histogram and timeseries chart data
+SCENARIOS = ['predict', 'actuals', 'chart']
+
+
+def current_rss_mb() -> Optional[float]:
+    """
+    Get current resident set size of the process in megabytes, None if /proc is not available.
+    """
+    try:
+        with open("/proc/self/statm") as file:
+            resident_pages = int(file.read().split()[1])
+    except (OSError, IndexError, ValueError):
+        return None
+    return resident_pages * os.sysconf("SC_PAGE_SIZE") / 1024 ** 2
+
+
+def percentiles(latencies: List[float]) -> dict:
+    """
+    Get latency percentiles in milliseconds.
+    """
+    if not latencies:
+        return {'p50_ms': None, 'p95_ms': None, 'p99_ms': None, 'max_ms': None}
+    p50, p95, p99 = np.percentile(np.asarray(latencies) * 1000, [50, 95, 99])
+    return {'p50_ms': float(p50), 'p95_ms': float(p95), 'p99_ms': float(p99),
+            'max_ms': float(max(latencies) * 1000)}
+
+
+def git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(["git", "rev-parse", "HEAD"], cwd=SERVER_DIR, capture_output=True, text=True,
+                              check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def use_in_memory_database() -> None:
+    """
+    Back the app with mongomock-motor instead of MongoDB.
+    """
+    try:
+        import mongomock
+        from mongomock_motor import AsyncMongoMockClient
+    except ImportError:
+        sys.exit("--in-memory requires mongomock-motor: pip install mongomock-motor")
+
+    import app.database.init_mongo_db as init_mongo_db
+
+    store = mongomock.store.ServerStore()
+    init_mongo_db.AsyncIOMotorClient = lambda *args, **kwargs: AsyncMongoMockClient(_store=store)
+
+
+async def run_requests(count: int, concurrency: int, send: Callable) -> dict:
+    """
+    Send count requests from concurrency workers and measure latency of every request.
+
+    Args:
+        count: Number of requests.
+        concurrency: Number of requests in flight.
+        send: Coroutine function sending request of given index and returning its response.
+
+    Returns:
+        Latencies, number of failed requests, wall time and resident set size before and after the requests.
+    """
+    queue = asyncio.Queue()
+    for index in range(count):
+        queue.put_nowait(index)
+
+    latencies = []
+    errors = []
+
+    async def worker():
+        while not queue.empty():
+            index = queue.get_nowait()
+            started_at = time.perf_counter()
+            response = await send(index)
+            latencies.append(time.perf_counter() - started_at)
+            if response.status_code >= 400:
+                errors.append(response.status_code)
+
+    rss_before = current_rss_mb()
+    started_at = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    wall_time = time.perf_counter() - started_at
+    return {'latencies': latencies, 'errors': len(errors), 'wall_time': wall_time, 'rss_before': rss_before,
+            'rss_after': current_rss_mb()}
+
+
+async def create_monitored_model(client: AsyncClient, model: str, run_id: str) -> str:
+    """
+    Create project, experiment, iteration and active monitored model with the ml model of given test model.
+
+    Returns:
+        Monitored model id.
+    """
+    path = MODELS[model]['path']
+    with open(path, 'rb') as file:
+        encoded_ml_model = base64.b64encode(file.read()).decode("utf-8")
+
+    response = await client.post("/projects/", json={"title": f"Benchmark {model} {run_id}"})
+    project_id = response.json()["_id"]
+    response = await client.post(f"/projects/{project_id}/experiments/", json={"name": "Benchmark"})
+    experiment_id = response.json()["id"]
+    response = await client.post(f"/projects/{project_id}/experiments/{experiment_id}/iterations/",
+                                 json={"iteration_name": model, "path_to_model": path,
+                                       "encoded_ml_model": encoded_ml_model})
+    response = await client.post("/monitored-models/", json={"model_name": f"Benchmark {model} {run_id}",
+                                                             "model_status": "active",
+                                                             "iteration": response.json()})
+    response.raise_for_status()
+    return response.json()["_id"]
+
+
+async def benchmark_model(client: AsyncClient, model: str, args: argparse.Namespace, run_id: str) -> List[dict]:
+    """
+    Run all scenarios of one test model for every concurrency and batch size.
+    """
+    rng = random.Random(args.seed)
+    spec = MODELS[model]
+    monitored_model_id = await create_monitored_model(client, model, run_id)
+    base_url = f"/monitored-models/{monitored_model_id}"
+    prediction_ids = []
+    results = []
+
+    # load the ml model before measuring
+    response = await client.post(f"{base_url}/predict", json=[spec['sample'](rng)])
+    response.raise_for_status()
+    prediction_ids.append(response.json()[0]["id"])
+
+    def record(scenario: str, concurrency: int, batch_size: int, measurement: dict) -> None:
+        requests = len(measurement['latencies'])
+        results.append({
+            'model': model,
+            'scenario': scenario,
+            'concurrency': concurrency,
+            'batch_size': batch_size,
+            'requests': requests,
+            'errors': measurement['errors'],
+            **percentiles(measurement['latencies']),
+            'requests_per_sec': requests / measurement['wall_time'],
+            'rows_per_sec': requests * batch_size / measurement['wall_time'],
+            'rss_mb': measurement['rss_after'],
+            'rss_delta_mb': (measurement['rss_after'] - measurement['rss_before']
+                             if measurement['rss_before'] is not None and measurement['rss_after'] is not None
+                             else None)
+        })
+
+    for batch_size in args.batch_sizes:
+        for concurrency in args.concurrency:
+            if 'predict' in args.scenarios or 'actuals' in args.scenarios:
+                batches = [[spec['sample'](rng) for _ in range(batch_size)] for _ in range(args.requests)]
+
+                async def send_predict(index: int):
+                    response = await client.post(f"{base_url}/predict", json=batches[index])
+                    if response.status_code == 200:
+                        prediction_ids.extend(prediction["id"] for prediction in response.json())
+                    return response
+
+                measurement = await run_requests(args.requests, concurrency, send_predict)
+                if 'predict' in args.scenarios:
+                    record('predict', concurrency, batch_size, measurement)
+
+            if 'actuals' in args.scenarios and prediction_ids:
+                def send_actuals(index: int):
+                    ids = rng.sample(prediction_ids, min(batch_size, len(prediction_ids)))
+                    return client.put(f"{base_url}/predictions/actuals",
+                                      json=[{"prediction_id": prediction_id, "actual": spec['actual'](rng)}
+                                            for prediction_id in ids])
+
+                record('actuals', concurrency, batch_size, await run_requests(args.requests, concurrency,
+                                                                              send_actuals))
+
+    if 'chart' in args.scenarios:
+        charts = {
+            'histogram': {"chart_type": "histogram", "x_axis_column": spec['chart_column'],
+                          "bin_method": "squareRoot"},
+            'timeseries': {"chart_type": "timeseries", "y_axis_columns": ["prediction"]}
+        }
+        for chart_type, chart in charts.items():
+            response = await client.post(f"{base_url}/charts", json=chart)
+            chart_id = response.json()["id"]
+            for concurrency in args.concurrency:
+                def send_chart(index: int):
+                    return client.get(f"{base_url}/charts/{chart_id}/data", params={"width": args.chart_width})
+
+                # batch size of chart scenarios is the number of charted predictions
+                record(f"chart_{chart_type}", concurrency, len(prediction_ids),
+                       await run_requests(args.requests, concurrency, send_chart))
+
+    await client.delete(base_url)
+    return results
+
+
+async def run(args: argparse.Namespace) -> dict:
+    from app.config.config import settings
+
+    # never touch the development or test database
+    settings.TESTING = True
+    settings.MONGODB_TEST_DB_NAME = args.database
+    if args.in_memory:
+        use_in_memory_database()
+    if args.executor:
+        settings.INFERENCE_EXECUTOR = args.executor
+    settings.PREDICT_BATCHING = args.batching
+
+    from app.app import app
+    from app.database.init_mongo_db import drop_database
+    from app.utils.artifact_store import artifact_store
+
+    run_id = uuid.uuid4().hex[:8]
+    results = []
+    # ml models of the run are stored in a temporary artifact store, removed with the directory,
+    # the environment passes it to inference worker processes
+    with tempfile.TemporaryDirectory(prefix="mlops-benchmark-artifacts-") as artifacts:
+        os.environ["ARTIFACT_STORE_PATH"] = settings.ARTIFACT_STORE_PATH = artifacts
+        artifact_store.root = Path(artifacts)
+        async with LifespanManager(app):
+            async with AsyncClient(app=app, base_url="http://benchmark", timeout=None) as client:
+                for model in args.models:
+                    results.extend(await benchmark_model(client, model, args, run_id))
+
+    if not args.in_memory:
+        drop_database()
+
+    return {
+        'meta': {
+            'created_at': datetime.now().isoformat(),
+            'git_commit': git_commit(),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'database': 'in-memory' if args.in_memory else 'mongodb',
+            'executor': settings.INFERENCE_EXECUTOR,
+            'batching': settings.PREDICT_BATCHING,
+            'requests': args.requests,
+            'seed': args.seed
+        },
+        'results': results
+    }
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Benchmark of the prediction path.")
+    parser.add_argument("--models", nargs="+", choices=list(MODELS), default=list(MODELS))
+    parser.add_argument("--scenarios", nargs="+", choices=SCENARIOS, default=SCENARIOS)
+    parser.add_argument("--concurrency", nargs="+", type=int, default=[1, 8])
+    parser.add_argument("--batch-sizes", nargs="+", type=int, default=[1, 100])
+    parser.add_argument("--requests", type=int, default=200, help="Number of requests of every measurement.")
+    parser.add_argument("--chart-width", type=int, default=800, help="Width of charts in points.")
+    parser.add_argument("--executor", choices=["thread", "process"], default=None)
+    parser.add_argument("--batching", action="store_true", help="Merge concurrent predict requests.")
+    parser.add_argument("--in-memory", action="store_true", help="Use mongomock-motor instead of MongoDB.")
+    parser.add_argument("--database", default="mlops_benchmark", help="MongoDB database, dropped afterwards.")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", default=None, help="JSON file, standard output if not given.")
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    args = parse_args(argv)
+    report = json.dumps(asyncio.run(run(args)), indent=2)
+    if args.output:
+        with open(args.output, 'w') as file:
+            file.write(report + "\n")
+    else:
+        print(report)
+
+
+if __name__ == "__main__":
+    main()